@@ -0,0 +1,213 @@
+"""
+arXiv API Atom 响应回放工具
+
+按照 export.arxiv.org/api/query 的真实响应格式生成论文语料，
+并提供一个可替换 requests 会话的回放会话，用于离线测试和基准测试。
+"""
+import random
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any, Optional
+from urllib.parse import urlparse, parse_qs
+from xml.sax.saxutils import escape
+
+KEYWORDS = ["Biologically", "Spiking", "SNN", "Neuromorphic", "Event"]
+
+FEED_HEADER = """<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom" xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/" xmlns:arxiv="http://arxiv.org/schemas/atom">
+  <id>https://arxiv.org/api/replay</id>
+  <title>arXiv Query: {query}</title>
+  <updated>{updated}</updated>
+  <link href="https://arxiv.org/api/query" type="application/atom+xml"/>
+  <opensearch:itemsPerPage>{page_size}</opensearch:itemsPerPage>
+  <opensearch:totalResults>{total}</opensearch:totalResults>
+  <opensearch:startIndex>{start}</opensearch:startIndex>
+"""
+
+ENTRY_TEMPLATE = """  <entry>
+    <id>http://arxiv.org/abs/{arxiv_id}</id>
+    <title>{title}</title>
+    <updated>{updated}</updated>
+    <link href="https://arxiv.org/abs/{arxiv_id}" rel="alternate" type="text/html"/>
+    <link href="https://arxiv.org/pdf/{arxiv_id}" rel="related" type="application/pdf" title="pdf"/>
+    <summary>{summary}</summary>
+    {categories}
+    <published>{published}</published>
+    <arxiv:comment>{comment}</arxiv:comment>
+    <arxiv:primary_category term="{primary_category}"/>
+    {authors}
+  </entry>
+"""
+
+
+def _timestamp(dt: datetime) -> str:
+    return dt.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def make_corpus(categories: List[str], papers_per_category: int = 100,
+                seed: int = 0, start: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """
+    生成确定性的论文语料，按提交时间从新到旧排序
+
+    每篇论文有一个主分类，并以一定概率跨类别到另一个分类，
+    标题和摘要中包含若干默认查询关键词。
+    """
+    rng = random.Random(seed)
+    start = start or datetime(2025, 1, 31, 18, 0, tzinfo=timezone.utc)
+    corpus = []
+    total = papers_per_category * len(categories)
+    for i in range(total):
+        primary = categories[i % len(categories)]
+        cats = [primary]
+        if len(categories) > 1 and rng.random() < 0.3:
+            cats.append(rng.choice([cat for cat in categories if cat != primary]))
+        published = start - timedelta(minutes=7 * i)
+        keyword = rng.choice(KEYWORDS)
+        words = " ".join(rng.choice(["network", "neuron", "plasticity", "learning", "dynamics",
+                                      "cortex", "vision", "sensor", "energy", "model"])
+                         for _ in range(60))
+        corpus.append({
+            'arxiv_id': f"2501.{i:05d}v{1 + (i % 3 == 0)}",
+            'title': f"{keyword} Paper {i} on {primary}",
+            'summary': f"We study {keyword.lower()} systems. {words}.",
+            'authors': [f"Author {i}-{j}" for j in range(1 + i % 4)],
+            'published': published,
+            'updated': published + timedelta(hours=i % 5),
+            'primary_category': primary,
+            'categories': cats,
+            'comment': f"{10 + i % 20} pages",
+        })
+    return corpus
+
+
+def render_feed(entries: List[Dict[str, Any]], total: int, start: int,
+                page_size: int, query: str = "") -> bytes:
+    """将论文列表渲染为一页 arXiv Atom 响应"""
+    parts = [FEED_HEADER.format(query=escape(query), updated=_timestamp(datetime.now(timezone.utc)),
+                                page_size=page_size, total=total, start=start)]
+    for paper in entries:
+        parts.append(ENTRY_TEMPLATE.format(
+            arxiv_id=paper['arxiv_id'],
+            title=escape(paper['title']),
+            updated=_timestamp(paper['updated']),
+            published=_timestamp(paper['published']),
+            summary=escape(paper['summary']),
+            categories="\n    ".join(
+                f'<category term="{cat}" scheme="http://arxiv.org/schemas/atom"/>'
+                for cat in paper['categories']),
+            comment=escape(paper['comment']),
+            primary_category=paper['primary_category'],
+            authors="\n    ".join(f"<author><name>{escape(name)}</name></author>"
+                                   for name in paper['authors']),
+        ))
+    parts.append("</feed>\n")
+    return "".join(parts).encode('utf-8')
+
+
+def _split_top_level(text: str, operator: str) -> List[str]:
+    """按不在括号内的运算符拆分查询"""
+    parts, depth, current = [], 0, ""
+    tokens = re.split(r'(\(|\)|\s+' + operator + r'\s+)', text)
+    for token in tokens:
+        if token == '(':
+            depth += 1
+        elif token == ')':
+            depth -= 1
+        if depth == 0 and token.strip() == operator:
+            parts.append(current)
+            current = ""
+        else:
+            current += token
+    parts.append(current)
+    return [part.strip() for part in parts if part.strip()]
+
+
+def _strip_parens(text: str) -> str:
+    text = text.strip()
+    while text.startswith('(') and text.endswith(')'):
+        text = text[1:-1].strip()
+    return text
+
+
+def matches_query(paper: Dict[str, Any], query: str) -> bool:
+    """对回放语料执行简化的 arXiv 查询语法（AND / OR / cat: / 关键词）"""
+    query = _strip_parens(query)
+    if not query or query == '*:*':
+        return True
+    and_parts = _split_top_level(query, 'AND')
+    if len(and_parts) > 1:
+        return all(matches_query(paper, part) for part in and_parts)
+    or_parts = _split_top_level(query, 'OR')
+    if len(or_parts) > 1:
+        return any(matches_query(paper, part) for part in or_parts)
+
+    term = query
+    if term.startswith('cat:'):
+        return term[4:] in paper['categories']
+    if term.startswith('primary_cat:'):
+        return term[12:] == paper['primary_category']
+    range_match = re.match(r'submittedDate:\[(\d{12}) TO (\d{12})\]', term)
+    if range_match:
+        published = paper['published'].strftime('%Y%m%d%H%M')
+        return range_match.group(1) <= published <= range_match.group(2)
+    field_match = re.match(r'(ti|abs|all):(.*)', term)
+    if field_match:
+        field, term = field_match.groups()
+        text = {'ti': paper['title'], 'abs': paper['summary']}.get(
+            field, paper['title'] + " " + paper['summary'])
+    else:
+        text = paper['title'] + " " + paper['summary']
+    return term.strip('"').lower() in text.lower()
+
+
+class FakeResponse:
+    """模拟 requests.Response 的最小接口"""
+
+    def __init__(self, content: bytes, status_code: int = 200, headers: Optional[Dict[str, str]] = None):
+        self.content = content
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    @property
+    def text(self) -> str:
+        return self.content.decode('utf-8')
+
+    def iter_content(self, chunk_size: int = 65536):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i:i + chunk_size]
+
+    def close(self):
+        pass
+
+
+class ReplaySession:
+    """
+    按查询参数从语料中回放 Atom 分页响应的会话
+
+    Args:
+        corpus: make_corpus 生成的论文语料（按时间从新到旧）
+        latency: 每次请求模拟的网络延迟（秒）
+    """
+
+    def __init__(self, corpus: List[Dict[str, Any]], latency: float = 0.0):
+        self.corpus = corpus
+        self.latency = latency
+        self.requests = []
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None, **kwargs) -> FakeResponse:
+        self.requests.append(url)
+        if self.latency:
+            time.sleep(self.latency)
+        params = parse_qs(urlparse(url).query)
+        query = params.get('search_query', [''])[0]
+        start = int(params.get('start', ['0'])[0])
+        page_size = int(params.get('max_results', ['100'])[0])
+        sort_by = params.get('sortBy', ['submittedDate'])[0]
+        ascending = params.get('sortOrder', ['descending'])[0] == 'ascending'
+
+        matched = [paper for paper in self.corpus if matches_query(paper, query)]
+        sort_field = 'updated' if sort_by == 'lastUpdatedDate' else 'published'
+        matched.sort(key=lambda paper: paper[sort_field], reverse=not ascending)
+        page = matched[start:start + page_size]
+        return FakeResponse(render_feed(page, len(matched), start, page_size, query))
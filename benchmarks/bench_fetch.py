@@ -0,0 +1,65 @@
+"""
+论文获取基准测试：单个合并查询 vs 按分类拆分的并发子查询
+
+使用回放的 Atom 响应，不访问网络。默认使用生产配置的请求间隔（arXiv 要求不低于3秒）和 max_total_results，
+完整运行需要数分钟；只比较相对开销时可以调小 --delay。
+
+所有请求共享同一个最小请求间隔，请求发起已经是串行的；拆分后每个子查询各自分页，请求数只增不减，
+因此在单页响应延迟小于请求间隔时，拆分的耗时不低于单个合并查询（例如 --delay 0.3 --latency 0.15 时，
+4 个分类 1.4s vs 2.3s）。拆分默认关闭（split_by=None），本基准用于确认这一点。示例:
+    python -m benchmarks.bench_fetch
+    python -m benchmarks.bench_fetch --latency 0.5 --delay 0.2
+"""
+import argparse
+import contextlib
+import io
+import time
+from typing import Dict, Any
+
+from benchmarks.atom_fixtures import make_corpus, ReplaySession
+from config.settings import SEARCH_CONFIG, QUERY
+from src.arxiv_client import ArxivClient
+
+ALL_CATEGORIES = ["cs.NE", "cs.AI", "cs.LG", "cs.CV", "cs.CL", "q-bio.NC"]
+
+
+def run_fetch(config: Dict[str, Any], categories, corpus, latency: float):
+    """执行一次获取，返回 (耗时, 论文数, 请求数)"""
+    session = ReplaySession(corpus, latency=latency)
+    client = ArxivClient(config, session=session)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = client.search_papers(categories=categories, query=QUERY)
+    return time.perf_counter() - start, len(results), len(session.requests)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='arXiv 获取并发基准测试')
+    parser.add_argument('--papers-per-category', type=int, default=120, help='每个分类的论文数量')
+    parser.add_argument('--page-size', type=int, default=SEARCH_CONFIG.get('page_size', 100), help='每页论文数量')
+    parser.add_argument('--latency', type=float, default=1.5, help='模拟的单次请求延迟（秒）')
+    parser.add_argument('--delay', type=float, default=SEARCH_CONFIG.get('delay_seconds', 3.0),
+                        help='共享的最小请求间隔（秒）')
+    parser.add_argument('--max-results', type=int, default=SEARCH_CONFIG['max_total_results'],
+                        help='总共获取的最大论文数量')
+    parser.add_argument('--max-workers', type=int, default=6, help='并发子查询数')
+    args = parser.parse_args()
+
+    print(f"{'分类数':>6} {'模式':>10} {'耗时(s)':>9} {'论文数':>7} {'请求数':>7}")
+    for n in range(1, len(ALL_CATEGORIES) + 1):
+        categories = ALL_CATEGORIES[:n]
+        corpus = make_corpus(categories, args.papers_per_category)
+        for split_by in (None, 'category'):
+            config = dict(SEARCH_CONFIG,
+                          max_total_results=args.max_results,
+                          page_size=args.page_size,
+                          delay_seconds=args.delay,
+                          max_workers=args.max_workers,
+                          split_by=split_by)
+            elapsed, count, requests = run_fetch(config, categories, corpus, args.latency)
+            mode = split_by or 'serial'
+            print(f"{n:>6} {mode:>10} {elapsed:>9.2f} {count:>7} {requests:>7}")
+
+
+if __name__ == '__main__':
+    main()
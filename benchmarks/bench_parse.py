@@ -0,0 +1,61 @@
+"""
+Atom 解析基准测试：arxiv 库解析 + 转换为元数据 vs 流式解析直接生成 PaperRecord
+
+预先渲染好所有分页，请求不产生延迟，只比较解析与转换的开销。示例:
+    python -m benchmarks.bench_parse --pages 20 --page-size 200
+"""
+import argparse
+import contextlib
+import io
+import time
+from urllib.parse import urlparse, parse_qs
+
+from benchmarks.atom_fixtures import make_corpus, render_feed, FakeResponse
+from config.settings import SEARCH_CONFIG
+from src.arxiv_client import ArxivClient
+
+
+class StaticSession:
+    """按 start 参数返回预先渲染好的分页"""
+
+    def __init__(self, pages, page_size, total):
+        self.pages = pages
+        self.page_size = page_size
+        self.total = total
+
+    def get(self, url, headers=None, **kwargs):
+        start = int(parse_qs(urlparse(url).query)['start'][0])
+        return FakeResponse(self.pages[start // self.page_size])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Atom 解析基准测试')
+    parser.add_argument('--pages', type=int, default=20, help='分页数量')
+    parser.add_argument('--page-size', type=int, default=200, help='每页论文数量')
+    parser.add_argument('--repeat', type=int, default=3, help='重复次数，取最快一次')
+    args = parser.parse_args()
+
+    total = args.pages * args.page_size
+    corpus = make_corpus(["cs.NE"], total)
+    pages = [render_feed(corpus[i:i + args.page_size], total, i, args.page_size)
+             for i in range(0, total, args.page_size)]
+    size_mb = sum(len(page) for page in pages) / 1e6
+    print(f"{args.pages} 页 x {args.page_size} 篇，共 {size_mb:.1f} MB")
+
+    for backend in ('arxiv', 'direct'):
+        config = dict(SEARCH_CONFIG, max_total_results=total, page_size=args.page_size,
+                      delay_seconds=0, split_by=None, backend=backend)
+        best = None
+        for _ in range(args.repeat):
+            client = ArxivClient(config, session=StaticSession(pages, args.page_size, total))
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                results = client.search_papers(query="")
+            elapsed = time.perf_counter() - start
+            assert len(results) == total, f"{backend} 只返回了 {len(results)} 篇"
+            best = elapsed if best is None else min(best, elapsed)
+        print(f"{backend:>8}: {best:.3f} s, {total / best:,.0f} 篇/秒")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+"""
+摘要流水线基准测试：检索 → 摘要生成 → 报告写入
+
+arXiv 响应由 ReplaySession 回放，语言模型由本地模拟服务（benchmarks.fake_gemini）提供，
+不访问网络、不需要 API 密钥。输出吞吐量（篇/秒）、每篇论文的模型调用次数、
+单篇备选比例以及模型调用延迟的 p50/p95。示例:
+    python -m benchmarks.bench_pipeline --papers 300 --latency lognormal:0.8:0.4 --truncate-rate 0.1
+"""
+import argparse
+import contextlib
+import io
+import math
+import os
+import tempfile
+import time
+from typing import Dict, Any, List
+from unittest import mock
+
+from benchmarks.atom_fixtures import make_corpus, ReplaySession
+from benchmarks.fake_gemini import FakeGeminiServer
+from config.settings import SEARCH_CONFIG, LLM_CONFIG, QUERY
+from src.arxiv_client import ArxivClient
+from src.paper_summarizer import PaperSummarizer
+from src.streaming import background_iter
+
+CATEGORIES = ["cs.NE"]
+MODEL = "fake-model"
+
+
+def percentile(values: List[float], q: float) -> float:
+    """最近秩法计算分位数"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def run_pipeline(papers: int, server: FakeGeminiServer, output_dir: str, fetch_latency: float = 0.0,
+                 page_size: int = 100, concurrency: int = 4, max_papers: int = 30,
+                 output_format: str = 'markdown', stream: bool = True) -> Dict[str, Any]:
+    """
+    运行一次完整流水线，返回统计指标
+
+    单篇备选比例 = 只包含一篇论文的模型请求数 / 论文数（max_papers 为 1 时无意义）。
+    """
+    corpus = make_corpus(CATEGORIES, papers)
+    search_config = dict(SEARCH_CONFIG, max_total_results=len(corpus), page_size=page_size,
+                         delay_seconds=0, split_by=None, cache_dir=None, date_window=False)
+    arxiv_client = ArxivClient(search_config, session=ReplaySession(corpus, latency=fetch_latency))
+
+    # 连接池和同时进行的请求数在创建客户端时按 LLM_CONFIG['concurrency'] 确定
+    with mock.patch.dict(LLM_CONFIG, {'concurrency': concurrency}):
+        summarizer = PaperSummarizer("fake-key", MODEL)
+    summarizer.client.api_url = server.model_url(MODEL)
+    summarizer.client.stream = stream
+    summarizer.max_papers_per_batch = max_papers
+    summarizer.output_format = output_format
+
+    # 记录每次模型调用（包括重试和限流等待）的耗时
+    latencies = []
+    chat_completion = summarizer.client.chat_completion
+
+    def timed_chat_completion(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return chat_completion(*args, **kwargs)
+        finally:
+            latencies.append(time.perf_counter() - start)
+
+    summarizer.client.chat_completion = timed_chat_completion
+
+    fake = server.fake
+    requests_before = fake.requests
+    served_before = len(fake.papers_per_request)
+    output_file = os.path.join(output_dir, "summary_bench.md")
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        stream_papers = background_iter(arxiv_client.iter_papers(categories=CATEGORIES, query=QUERY),
+                                        maxsize=page_size * 2)
+        success = summarizer.summarize_papers(stream_papers, output_file)
+    elapsed = time.perf_counter() - start
+
+    with open(output_file, 'r', encoding='utf-8') as f:
+        report = f.read()
+    summarized = report.count("\n### ")
+    served = fake.papers_per_request[served_before:]
+    return {
+        'papers': summarized,
+        'seconds': elapsed,
+        'papers_per_sec': summarized / elapsed if elapsed else 0.0,
+        'calls': len(latencies),
+        'http_requests': fake.requests - requests_before,
+        'calls_per_paper': len(latencies) / summarized if summarized else 0.0,
+        'fallback_rate': sum(1 for count in served if count == 1) / summarized if summarized else 0.0,
+        'p50': percentile(latencies, 50),
+        'p95': percentile(latencies, 95),
+        'errors': report.count("**错误信息**"),
+        'success': success,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='摘要流水线基准测试（本地模拟服务）')
+    parser.add_argument('--papers', type=int, default=200, help='论文数量')
+    parser.add_argument('--latency', default="lognormal:0.5:0.4", help='模型延迟分布，见 benchmarks.fake_gemini')
+    parser.add_argument('--fetch-latency', type=float, default=0.0, help='模拟的 arXiv 单次请求延迟（秒）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='返回 500 错误的比例')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='返回 429 限流的比例')
+    parser.add_argument('--truncate-rate', type=float, default=0.0, help='输出被截断的比例')
+    parser.add_argument('--malformed-rate', type=float, default=0.0, help='包含一篇格式错误章节的比例')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4], help='要比较的并发批次数')
+    parser.add_argument('--max-papers', type=int, default=30, help='每批论文数上限')
+    parser.add_argument('--format', choices=['markdown', 'json'], nargs='+', default=['markdown', 'json'],
+                        help='要比较的输出模式')
+    parser.add_argument('--no-stream', action='store_true', help='使用 generateContent 而不是流式接口')
+    parser.add_argument('--retry-delay', type=float, default=0.1, help='重试间隔（秒），覆盖 LLM_CONFIG')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'模式':>8} {'并发':>4} {'论文':>5} {'耗时(s)':>8} {'篇/秒':>7} {'调用/篇':>7} "
+          f"{'单篇比例':>8} {'p50(s)':>7} {'p95(s)':>7} {'错误':>4}")
+    with mock.patch.dict(LLM_CONFIG, {'retry_delay': args.retry_delay}):
+        for output_format in args.format:
+            for concurrency in args.concurrency:
+                # 每次运行使用新的模拟服务，注入的故障只取决于 seed
+                with FakeGeminiServer(latency=args.latency, error_rate=args.error_rate,
+                                      rate_limit_rate=args.rate_limit_rate, truncate_rate=args.truncate_rate,
+                                      malformed_rate=args.malformed_rate, seed=args.seed) as server, \
+                        tempfile.TemporaryDirectory() as output_dir:
+                    result = run_pipeline(args.papers, server, output_dir, fetch_latency=args.fetch_latency,
+                                          concurrency=concurrency, max_papers=args.max_papers,
+                                          output_format=output_format, stream=not args.no_stream)
+                print(f"{output_format:>8} {concurrency:>4} {result['papers']:>5} {result['seconds']:>8.2f} "
+                      f"{result['papers_per_sec']:>7.1f} {result['calls_per_paper']:>7.3f} "
+                      f"{result['fallback_rate']:>8.1%} {result['p50']:>7.2f} {result['p95']:>7.2f} "
+                      f"{result['errors']:>4}")
+
+
+if __name__ == '__main__':
+    main()
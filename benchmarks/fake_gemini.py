@@ -0,0 +1,330 @@
+"""
+本地 Gemini 接口模拟服务
+
+实现 generateContent、streamGenerateContent（alt=sse）和 cachedContents（系统指令的缓存上下文）协议。它根据提示词中的论文信息生成确定性的摘要，
+Markdown 模式和 responseSchema 指定的 JSON 模式都支持。延迟分布可以配置，
+并能按比例注入服务器错误、429 限流、输出截断和格式错误的章节，也可以让指定模型始终返回 429（测试模型路由）。
+它用于离线测试和摘要生成基准测试，不需要 API 密钥。示例:
+    python -m benchmarks.fake_gemini --port 8765 --latency lognormal:0.8:0.4 --rate-limit-rate 0.05
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+# Markdown 模式提示词中单篇论文的信息（见 PaperSummarizer._paper_block）
+MARKDOWN_PAPER_PATTERN = re.compile(
+    r'^- 标题: (.*)\n- 作者: (.*)\n- 发布日期: (\S+)\n- arXiv链接: (\S+)', re.MULTILINE
+)
+# JSON 模式提示词中的论文ID
+JSON_PAPER_PATTERN = re.compile(r'^- ID: (\S+)', re.MULTILINE)
+# 请求路径中的模型名
+MODEL_PATH_PATTERN = re.compile(r'/models/([^/:?]+):')
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """
+    解析延迟分布
+
+    "0.5" 表示固定 0.5 秒；"uniform:0.2:1.0" 表示 0.2~1.0 秒均匀分布；
+    "lognormal:0.8:0.4" 表示中位数 0.8 秒、对数标准差 0.4 的对数正态分布。
+    """
+    kind, *params = spec.split(':')
+    if kind == 'uniform':
+        low, high = float(params[0]), float(params[1])
+        return lambda rng: rng.uniform(low, high)
+    if kind == 'lognormal':
+        median, sigma = float(params[0]), float(params[1])
+        return lambda rng: median * rng.lognormvariate(0.0, sigma)
+    value = float(kind)
+    return lambda rng: value
+
+
+class FakeGemini:
+    """
+    模拟服务的响应逻辑，与 HTTP 传输无关
+
+    每个请求的随机决策由 (seed, 请求体哈希, 相同请求的第几次) 决定。并发请求的到达顺序
+    不影响结果，重试同一请求时会重新抽样。
+    """
+
+    def __init__(self, latency: str = "0", error_rate: float = 0.0, rate_limit_rate: float = 0.0,
+                 truncate_rate: float = 0.0, malformed_rate: float = 0.0,
+                 retry_delay: float = 0.05, unavailable_models: Tuple[str, ...] = (),
+                 min_cache_tokens: int = 0, seed: int = 0):
+        self.latency = parse_latency(latency)
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.truncate_rate = truncate_rate
+        self.malformed_rate = malformed_rate
+        self.retry_delay = retry_delay
+        self.unavailable_models = set(unavailable_models)
+        # 缓存上下文的最小 token 数，内容更少时拒绝创建（与真实接口一致）
+        self.min_cache_tokens = min_cache_tokens
+        self.caches: Dict[str, str] = {}
+        self.cache_hits = 0
+        self.seed = seed
+        self._lock = threading.Lock()
+        self._occurrences = Counter()
+        self.statuses = Counter()
+        self.models = Counter()
+        self.papers_per_request: List[int] = []
+        self.truncated = 0
+        self.malformed = 0
+
+    @property
+    def requests(self) -> int:
+        return sum(self.statuses.values())
+
+    def _rng(self, body: bytes) -> random.Random:
+        digest = hashlib.sha256(body).hexdigest()
+        with self._lock:
+            self._occurrences[digest] += 1
+            occurrence = self._occurrences[digest]
+        return random.Random(f"{self.seed}:{digest}:{occurrence}")
+
+    def create_cache(self, body: bytes) -> Tuple[int, Dict[str, Any]]:
+        """创建缓存上下文，返回 (状态码, 响应JSON)"""
+        request = json.loads(body)
+        text = "".join(part.get("text", "") for part in request.get("systemInstruction", {}).get("parts", []))
+        if len(text) // 4 < self.min_cache_tokens:
+            return 400, {"error": {"code": 400, "status": "INVALID_ARGUMENT", "message": (
+                f"Cached content is too small. total_token_count={len(text) // 4}, "
+                f"min_total_token_count={self.min_cache_tokens}")}}
+        with self._lock:
+            name = f"cachedContents/fake-{len(self.caches) + 1}"
+            self.caches[name] = text
+        return 200, {"name": name, "model": request.get("model"), "usageMetadata": {"totalTokenCount": len(text) // 4}}
+
+    def delete_cache(self, name: str) -> int:
+        with self._lock:
+            return 200 if self.caches.pop(name, None) is not None else 404
+
+    def respond(self, body: bytes, model: Optional[str] = None) -> Tuple[int, Dict[str, Any], float]:
+        """返回 (状态码, 响应JSON, 模拟延迟秒数)"""
+        rng = self._rng(body)
+        delay = max(0.0, self.latency(rng))
+        draw = rng.random()
+        if model:
+            with self._lock:
+                self.models[model] += 1
+        if draw < self.error_rate:
+            return self._record(500, 0), {"error": {"code": 500, "message": "Internal error encountered.",
+                                                     "status": "INTERNAL"}}, delay
+        if model in self.unavailable_models or draw < self.error_rate + self.rate_limit_rate:
+            return self._record(429, 0), {"error": {
+                "code": 429, "message": "Resource has been exhausted (e.g. check quota).",
+                "status": "RESOURCE_EXHAUSTED",
+                "details": [{"@type": "type.googleapis.com/google.rpc.RetryInfo",
+                             "retryDelay": f"{self.retry_delay}s"}],
+            }}, 0.0
+
+        request = json.loads(body)
+        prompt = request["contents"][-1]["parts"][0]["text"]
+        cached_tokens = 0
+        if "cachedContent" in request:
+            with self._lock:
+                system = self.caches.get(request["cachedContent"])
+                if system is not None:
+                    self.cache_hits += 1
+            if system is None:
+                return self._record(404, 0), {"error": {"code": 404, "status": "NOT_FOUND",
+                                                         "message": "CachedContent not found."}}, 0.0
+            cached_tokens = len(system) // 4
+        else:
+            system = "".join(part.get("text", "") for part in request.get("systemInstruction", {}).get("parts", []))
+        if "responseSchema" in request.get("generationConfig", {}):
+            items = self._json_items(prompt, rng)
+            paper_count = len(items)
+            text = json.dumps(items, ensure_ascii=False)
+        else:
+            sections = self._markdown_sections(prompt, rng)
+            paper_count = len(sections)
+            text = "\n\n".join(sections)
+
+        finish_reason = "STOP"
+        if rng.random() < self.truncate_rate:
+            text = text[:int(len(text) * rng.uniform(0.4, 0.9))]
+            finish_reason = "MAX_TOKENS"
+            with self._lock:
+                self.truncated += 1
+        self._record(200, paper_count)
+        return 200, {
+            "candidates": [{"content": {"parts": [{"text": text}], "role": "model"},
+                            "finishReason": finish_reason}],
+            "usageMetadata": {"promptTokenCount": (len(system) + len(prompt)) // 4,
+                              "cachedContentTokenCount": cached_tokens,
+                              "candidatesTokenCount": len(text) // 4,
+                              "totalTokenCount": (len(system) + len(prompt) + len(text)) // 4},
+        }, delay
+
+    def _record(self, status: int, paper_count: int) -> int:
+        with self._lock:
+            self.statuses[status] += 1
+            if status == 200:
+                self.papers_per_request.append(paper_count)
+        return status
+
+    def _corrupt(self, count: int, rng: random.Random) -> Optional[int]:
+        """按 malformed_rate 选出一篇格式错误的论文"""
+        if count and rng.random() < self.malformed_rate:
+            with self._lock:
+                self.malformed += 1
+            return rng.randrange(count)
+        return None
+
+    def _markdown_sections(self, prompt: str, rng: random.Random) -> List[str]:
+        papers = MARKDOWN_PAPER_PATTERN.findall(prompt)
+        corrupt = self._corrupt(len(papers), rng)
+        sections = []
+        for i, (title, authors, published, link) in enumerate(papers):
+            # 格式错误：标题缺少链接，且缺少主要发现
+            heading = f"### {title}" if i == corrupt else f"### [{title}]({link})"
+            findings = "" if i == corrupt else f"\n* **⭐ 主要发现**: 模拟的主要发现 {i + 1}。"
+            sections.append(f"{heading}\n<!-- {published} -->\n**📅 发布日期**: {published}\n\n"
+                            f"* **👥 作者**: {authors}\n* **🎯 研究目的**: 模拟的研究目的 {i + 1}。{findings}\n\n---")
+        return sections
+
+    def _json_items(self, prompt: str, rng: random.Random) -> List[Dict[str, str]]:
+        ids = JSON_PAPER_PATTERN.findall(prompt)
+        corrupt = self._corrupt(len(ids), rng)
+        return [{"id": arxiv_id, "purpose": f"模拟的研究目的 {i + 1}。",
+                 "findings": "" if i == corrupt else f"模拟的主要发现 {i + 1}。"}
+                for i, arxiv_id in enumerate(ids)]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # HTTP/1.1 才会保持长连接
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        if self.headers.get('Content-Encoding') == 'gzip':
+            body = gzip.decompress(body)
+        if self.path.split('?')[0].endswith('/cachedContents'):
+            status, payload = self.server.fake.create_cache(body)
+            self._send(status, 'application/json', [json.dumps(payload, ensure_ascii=False).encode('utf-8')])
+            return
+        model = MODEL_PATH_PATTERN.search(self.path)
+        status, payload, delay = self.server.fake.respond(body, model.group(1) if model else None)
+        stream = ':streamGenerateContent' in self.path and status == 200
+        if not stream:
+            time.sleep(delay)
+            self._send(status, 'application/json', [json.dumps(payload, ensure_ascii=False).encode('utf-8')])
+            return
+        # 流式响应把文本拆成若干片段，延迟平均分配在片段之间
+        candidate = payload["candidates"][0]
+        text = candidate["content"]["parts"][0]["text"]
+        pieces = [text[i:i + 400] for i in range(0, len(text), 400)] or [""]
+        events = []
+        for i, piece in enumerate(pieces):
+            event = {"candidates": [{"content": {"parts": [{"text": piece}], "role": "model"}}]}
+            if i == len(pieces) - 1:
+                event["candidates"][0]["finishReason"] = candidate["finishReason"]
+                event["usageMetadata"] = payload["usageMetadata"]
+            events.append(f"data: {json.dumps(event, ensure_ascii=False)}\r\n\r\n".encode('utf-8'))
+        self._send(status, 'text/event-stream', events, delay / len(events))
+
+    def do_DELETE(self):
+        name = re.search(r'(cachedContents/[^/?]+)', self.path)
+        status = self.server.fake.delete_cache(name.group(1)) if name else 404
+        self._send(status, 'application/json', [b"{}"])
+
+    def _send(self, status: int, content_type: str, chunks: List[bytes], pause: float = 0.0):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(sum(len(chunk) for chunk in chunks)))
+        self.end_headers()
+        for chunk in chunks:
+            if pause:
+                time.sleep(pause)
+            self.wfile.write(chunk)
+            self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeGeminiServer:
+    """
+    在后台线程中运行的模拟服务
+
+    用法:
+        with FakeGeminiServer(latency="uniform:0.1:0.3", truncate_rate=0.1) as server:
+            client.api_url = server.model_url("fake-model")
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, **options):
+        self.fake = FakeGemini(**options)
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.fake = self.fake
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1beta/models"
+
+    def model_url(self, model: str) -> str:
+        """ModelClient.api_url 使用的 generateContent 地址"""
+        return f"{self.url}/{model}:generateContent"
+
+    def start(self) -> 'FakeGeminiServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def serve_forever(self):
+        """在当前线程中运行，供命令行使用"""
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='本地 Gemini 接口模拟服务')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', default="0.5", help='延迟分布，例如 0.5、uniform:0.2:1.0、lognormal:0.8:0.4')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='返回 500 错误的比例')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='返回 429 限流的比例')
+    parser.add_argument('--truncate-rate', type=float, default=0.0, help='输出被截断的比例')
+    parser.add_argument('--malformed-rate', type=float, default=0.0, help='包含一篇格式错误章节的比例')
+    parser.add_argument('--unavailable-models', nargs='*', default=[], help='始终返回 429 限流的模型')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    server = FakeGeminiServer(args.host, args.port, latency=args.latency, error_rate=args.error_rate,
+                              rate_limit_rate=args.rate_limit_rate, truncate_rate=args.truncate_rate,
+                              malformed_rate=args.malformed_rate, unavailable_models=tuple(args.unavailable_models),
+                              seed=args.seed)
+    print(f"模拟服务已启动: {server.url}  （将 LLM_CONFIG['api_url'] 设置为该地址）")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"共处理 {server.fake.requests} 次请求: {dict(server.fake.statuses)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -13,7 +13,35 @@ SEARCH_CONFIG = {
     'title_only': False,              # 是否仅在标题中搜索
     'author_only': False,             # 是否仅搜索作者
     'abstract_only': False,           # 是否仅搜索摘要
-    'search_mode': 'all'             # 搜索模式：'all'(任意关键词匹配), 'any'(所有关键词都要匹配)
+    'search_mode': 'all',            # 搜索模式：'all'(任意关键词匹配), 'any'(所有关键词都要匹配)
+    'split_by': None,                 # 子查询拆分方式: None(单个合并查询), 'category'(按分类), 'keyword'(按关键词)
+                                      # 受共享请求间隔限制，拆分只会增加请求页数、不会加快检索（见 benchmarks/bench_fetch.py），默认不拆分
+    'max_workers': 4,                 # 并发执行子查询的线程数
+    'page_size': 100,                 # 每次API请求获取的论文数量
+    'delay_seconds': 3.0,             # 所有API请求共享的最小请求间隔（秒），arXiv要求不低于3秒
+    'num_retries': 3,                 # 单页请求失败时的重试次数
+    'connect_timeout': 10,            # 直接请求API时的连接超时时间（秒）
+    'read_timeout': 60,               # 直接请求API时两次收到数据之间的最长等待时间（秒），超时后重试
+    'stop_after_known': 50,           # 增量检索时连续遇到多少篇已总结的论文后停止（0表示不提前停止，按时间窗口检索时不生效）
+    'date_window': False,             # 是否按提交时间窗口增量检索（从上次成功运行的时间到现在）
+    'window_overlap_hours': 96,       # 时间窗口与上次窗口重叠的小时数，需覆盖提交到公布的延迟（1–3天，周末和假期更久）
+    'initial_window_days': 3,         # 没有运行记录时时间窗口回溯的天数
+    'backend': 'arxiv',               # 获取方式: 'arxiv'(使用arxiv库), 'direct'(直接请求API并流式解析)
+    'cache_dir': None,                # arXiv API 响应缓存目录，None表示不缓存
+    'cache_ttl': 6 * 3600,            # 缓存有效期（秒），过期后发送条件请求重新验证
+    'cache_mode': 'default',          # 缓存模式: 'default', 'refresh'(总是重新请求), 'offline'(只使用缓存)
+}
+
+# OAI-PMH 批量收割配置（python -m src.oai_harvester，用于回填历史论文元数据）
+HARVEST_CONFIG = {
+    'base_url': "https://oaipmh.arxiv.org/oai",  # arXiv OAI-PMH 接口地址
+    'metadata_prefix': 'arXiv',       # 元数据格式，arXiv 格式包含分类、摘要、DOI和备注
+    'delay_seconds': 3.0,             # 请求之间的最小间隔（秒）
+    'num_retries': 5,                 # 请求失败时的重试次数
+    'max_retry_after': 600,           # 503 响应 Retry-After 的最长等待时间（秒）
+    'timeout': 60,                    # 单次请求超时时间（秒）
+    'output_file': "harvest.jsonl.gz",            # 收割结果文件（位于状态目录）
+    'checkpoint_file': "harvest_checkpoint.json",  # 收割检查点文件（位于状态目录）
 }
 
 # 固定搜索查询 - 领域
@@ -31,6 +59,69 @@ CATEGORIES = [
 # 最终确定的关键词组合
 QUERY = "Biologically OR Spiking OR SNN OR Neuromorphic OR Event"
 
+# 多主题配置：每个主题有自己的分类和查询，一次运行只检索所有主题的并集，每篇论文只生成一次摘要，
+# 再按主题分发到 <输出目录>/<主题名>/ 下的报告和网站栏目；为空时只使用上面的 CATEGORIES 和 QUERY
+PROFILES = {
+    # 'snn': {
+    #     'title': "脉冲神经网络",              # 报告标题和网站栏目名称，默认为主题名
+    #     'categories': ["cs.NE", "cs.LG", "cs.AI"],
+    #     'query': "Spiking OR SNN OR Neuromorphic",
+    #     'keywords': None,                   # 判断论文是否属于该主题的关键词及权重，None表示从 query 中提取
+    #     'min_score': 0,                     # 关键词得分阈值，0表示命中任意关键词即可
+    # },
+    # 'event-camera': {
+    #     'title': "事件相机",
+    #     'categories': ["cs.CV", "cs.RO"],
+    #     'query': '"event camera" OR "event-based vision" OR "dynamic vision sensor"',
+    # },
+    # 'comp-neuro': {
+    #     'title': "计算神经科学",
+    #     'categories': ["q-bio.NC", "cs.NE"],
+    #     'query': "Biologically OR Hippocampus OR Dendritic OR Plasticity",
+    # },
+}
+
+# 相关性评分配置：在调用语言模型之前按关键词加权命中对论文进行本地评分、过滤和排序
+# 默认关闭。启用后低于 min_score 或超出 top_n 的论文不生成摘要，只在已见论文存储中记录为被过滤，
+# 下次检索时按当时的配置重新评分，修改阈值、关键词或 top_n 后可以重新入选
+RELEVANCE_CONFIG = {
+    'enabled': False,                 # 是否启用本地相关性评分
+    'keywords': {                     # 关键词及权重，None表示从 QUERY 中提取（权重均为1）；末尾 * 表示前缀匹配
+        'spiking neural network*': 3.0,
+        'spiking': 2.0,
+        'SNN*': 2.0,
+        'neuromorphic': 3.0,
+        'brain-inspired': 3.0,
+        'biologically plausible': 2.0,
+        'biologically inspired': 2.0,
+        'bio-inspired': 1.5,
+        'spike-timing-dependent plasticity': 2.0,
+        'STDP': 2.0,
+        'leaky integrate-and-fire': 2.0,
+        'dendritic': 1.5,
+        'hippocamp*': 1.5,
+        'neuroscience': 1.0,
+        'event camera*': 1.5,
+        'event-based': 1.5,
+        'dynamic vision sensor*': 1.5,
+        'Hebbian': 1.5,
+    },
+    'title_weight': 3.0,              # 标题命中的权重倍数
+    'abstract_weight': 1.0,           # 摘要命中的权重倍数（同一关键词重复命中按对数递减计分）
+    'min_score': 2.0,                 # 启用时，得分低于该阈值的论文不交给语言模型（0表示不过滤）
+    'top_n': None,                    # 最多保留得分最高的论文数量，None表示不限制
+    'rank': False,                    # 是否按得分从高到低排序后再生成摘要；需要先检索完所有论文，检索与摘要生成不再并行（设置 top_n 时同样如此）
+}
+
+# 近似重复检测配置：基于标题和摘要的 MinHash/LSH 索引，跳过与此前已总结论文高度相似的新论文
+DEDUP_CONFIG = {
+    'enabled': True,                  # 是否启用近似重复检测
+    'threshold': 0.7,                 # 估计的 Jaccard 相似度不低于该值视为重复
+    'num_perm': 128,                  # MinHash 签名长度，越长越准确但计算越慢
+    'shingle_size': 3,                # 词级 shingle 的长度
+    'link_in_report': True,           # 是否在报告末尾列出重复论文及其此前摘要所在的报告
+}
+
 # 语言模型API配置
 LLM_CONFIG = {
     'api_key': "YOUR_API_HERE",                                             # 在这里输入API密钥
@@ -44,8 +135,81 @@ LLM_CONFIG = {
     'retry_count': 3,                                                       # API调用失败时的重试次数
     'retry_delay': 2,                                                       # 重试间隔（秒）
     'timeout': 300,                                                         # API请求超时时间（秒）
+    'stream': True,                                                         # 使用 streamGenerateContent 流式接收输出
+    'connect_timeout': 10,                                                  # 流式请求的连接超时时间（秒）
+    'idle_timeout': 60,                                                     # 流式响应两次数据之间的最长等待时间（秒），替代 timeout
+    'output_format': 'markdown',                                            # 'markdown' 由模型输出Markdown；'json' 按JSON Schema只输出研究目的和主要发现，标题/链接/日期/作者由本地元数据渲染
+    'concurrency': 4,                                                       # 同时进行的API请求（批次）数量
+    'request_interval': 0.0,                                                # 两次API请求发起时间的最小间隔（秒），配额由 rate_limits 控制
+    'rate_limits': {                                                        # 各模型的配额: 每分钟请求数(rpm)和每分钟输入token数(tpm)，按实际账号等级填写
+        'gemini-2.5-flash': {'rpm': 10, 'tpm': 250000},
+        'gemini-2.5-flash-lite': {'rpm': 15, 'tpm': 250000},
+        'gemini-2.5-pro': {'rpm': 5, 'tpm': 250000},
+    },
+    'fallback_models': [],                                                  # 备用模型，按顺序优先：主模型限流、返回5xx、超时、响应过慢或批次超出其输入预算时改用，例如 ['gemini-2.5-flash-lite', 'gemini-2.5-pro']
+    'model_budgets': {                                                      # 模型路由的各模型预算: 单次请求输入token上限(max_input_tokens，超出时交给后面的模型)和延迟阈值(max_latency，秒)，None表示不限
+        'gemini-2.5-flash': {'max_input_tokens': None, 'max_latency': 180},
+        'gemini-2.5-flash-lite': {'max_input_tokens': 16000, 'max_latency': 90},
+        'gemini-2.5-pro': {'max_input_tokens': None, 'max_latency': 300},
+    },
+    'route_cooldown': 60,                                                   # 模型被跳过后恢复使用前的等待时间（秒），限流时至少为服务器要求的等待时间
+    'context_cache': True,                                                  # 将固定的系统指令注册为缓存上下文(cachedContents)，各次调用只引用缓存；后端拒绝时（例如少于最小 token 数）改为每次发送
+    'context_cache_ttl': 3600,                                              # 缓存上下文的有效期（秒），运行结束时删除
+    'chars_per_token': 4.0,                                                 # 预估请求 token 数时每个 token 对应的字符数
+    'max_rate_limit_waits': 10,                                             # 单次调用遇到限流(429/503)时最多等待的次数，不消耗 retry_count
+    'max_retry_after': 120,                                                 # 服务器要求的等待时间超过该值（秒）时放弃，例如每日配额用尽
+    'pool_size': None,                                                      # 保持的长连接数量，None表示与concurrency一致
+    'gzip': True,                                                           # 是否请求gzip压缩的响应
+    'gzip_requests': False,                                                 # 是否gzip压缩请求体（需要API端支持）
+}
+
+# 批次打包配置：按估计的输入/输出 token 数而不是固定篇数组织批次，估计系数用API返回的 usageMetadata 校准
+BATCH_CONFIG = {
+    'max_papers': 30,                 # 每批论文数量上限
+    'max_input_tokens': 24000,        # 每批提示词的输入 token 预算
+    'output_budget_ratio': 0.8,       # 每批预期输出占 max_output_tokens 的比例上限，留出余量避免输出被截断
+    'abstract_max_chars': 2000,       # 提示词中摘要原文的最大字符数，None表示不截断
+    'initial_chars_per_token': 4.0,   # 未校准时每个输入 token 对应的字符数
+    'initial_output_tokens_per_paper': 450,  # 未校准时每篇论文预期的输出 token 数（含思考 token）
+    'calibration_smoothing': 0.3,     # 校准系数的指数滑动平均权重
+    'salvage_retries': 1,             # 批量响应中缺失或格式不完整的论文合并重新请求的轮数，之后才逐篇生成
+}
+
+# 摘要缓存配置：按 (论文ID, 摘要原文, 模型, 提示词版本, 生成参数) 缓存每篇论文的摘要，重新运行时只为未命中的论文调用模型
+SUMMARY_CACHE_CONFIG = {
+    'enabled': True,                  # 是否启用摘要缓存
+    'max_entries': 20000,             # 最多保留的条目数，超出时按最近最少使用淘汰
+    'max_age_days': 90,               # 条目的最长保留天数
+    'purge_old_prompts': True,        # 启动时删除旧提示词版本生成的条目
+}
+
+# 运行指标配置：每次运行在摘要报告旁写入 summary_<时间>.metrics.json，记录各阶段耗时、模型调用延迟、token 用量、重试和缓存命中
+METRICS_CONFIG = {
+    'enabled': True,                  # 是否写入运行指标文件
+    'prometheus': False,              # 是否同时写入 Prometheus 文本格式（summary_<时间>.metrics.prom）
+}
+
+# 运行流水线配置：检索、过滤（近似重复检测和相关性评分）、摘要生成、报告写入和网站更新各阶段在各自的线程中运行，
+# 通过有界队列连接，队列满时上游阶段暂停，内存占用由队列容量决定
+PIPELINE_CONFIG = {
+    'fetch_queue': 200,               # 检索阶段与过滤阶段之间的队列容量（篇）
+    'filter_queue': 100,              # 过滤阶段与摘要生成阶段之间的队列容量（篇）
+    'render_queue': 50,               # 摘要生成阶段与报告写入阶段之间的队列容量（篇），0表示在同一线程中写入
+    'fetch_workers': None,            # 并发执行的检索子查询数量，None表示沿用 SEARCH_CONFIG['max_workers']
+    'summarize_workers': None,        # 同时生成摘要的批次数量，None表示沿用 LLM_CONFIG['concurrency']
+    'update_site': False,             # 报告写入后是否更新网站（清理旧文件、更新首页和归档页面），与单独运行 arxivsite 相同
+    'site_days': 30,                  # 更新网站时摘要文件的保留天数
+    'github_dir': "./.github",        # 网站配置文件（_config.yml、_layouts 等）所在目录
 }
 
 # 输出配置
-OUTPUT_DIR = "data"
+OUTPUT_DIR = "data"  # 报告和网站页面，整个目录发布到网站
+# 运行状态目录：以下各文件需要在两次运行之间保留，但不应随网站发布，与 OUTPUT_DIR 分开存放
+STATE_DIR = "state"
 LAST_RUN_FILE = "last_run.json"  # 存储上次运行的信息
+METADATA_FILE = "metadata.jsonl.gz"  # 追加保存所有检索到的论文元数据（JSONL，.gz结尾时压缩）
+SEEN_STORE_FILE = "seen_papers.db"  # 记录所有见过和已总结论文的SQLite数据库
+DEDUP_INDEX_FILE = "dedup_index.db"  # 已总结论文的 MinHash/LSH 近似重复索引
+SUMMARY_CACHE_FILE = "summary_cache.db"  # 论文摘要缓存
+TOKEN_CALIBRATION_FILE = "token_calibration.json"  # 各模型的 token 估计校准结果
+RUN_JOURNAL_FILE = "run_journal.jsonl"  # 摘要生成的检查点日志，运行中断后用 --resume 恢复，成功后删除
@@ -5,7 +5,7 @@ setup(
     version="0.1.0",
     packages=find_packages(),
     install_requires=[
-        "arxiv",
+        "arxiv>=2.0.0,<5",  # ArxivClient 替换 arxiv.Client 的私有属性 _session
         "python-dotenv",
     ],
     entry_points={
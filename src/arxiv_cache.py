@@ -0,0 +1,172 @@
+"""
+arXiv API 响应缓存模块 - 将原始 Atom 分页响应缓存到磁盘，支持过期重验证和离线回放
+"""
+import hashlib
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+from urllib.parse import urlparse, parse_qsl, urlencode
+
+# 缓存模式：default 在有效期内直接使用缓存，过期后条件重验证；
+# refresh 总是请求网络并更新缓存；offline 只使用缓存，未命中时报错
+CACHE_MODES = ('default', 'refresh', 'offline')
+
+# 分页参数不参与查询归一化，单独作为缓存键的一部分
+PAGE_PARAMS = ('start', 'max_results')
+
+
+class CacheMissError(Exception):
+    """离线模式下请求的页面不在缓存中"""
+
+
+class CachedResponse:
+    """从缓存中读取的响应，提供与 requests.Response 相同的常用属性"""
+
+    def __init__(self, content: bytes, status_code: int = 200, headers: Optional[Dict[str, str]] = None):
+        self.content = content
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.from_cache = True
+
+    @property
+    def text(self) -> str:
+        return self.content.decode('utf-8')
+
+    def iter_content(self, chunk_size: int = 65536):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i:i + chunk_size]
+
+    def close(self):
+        pass
+
+
+class ResponseCache:
+    """
+    以归一化查询和分页偏移为键的磁盘缓存
+
+    每个查询对应一个子目录，每页保存为 <start>_<max_results>.xml，
+    同名 .json 文件记录请求URL、获取时间以及用于条件请求的 ETag / Last-Modified。
+    """
+
+    def __init__(self, cache_dir: str, ttl: float = 6 * 3600, mode: str = 'default'):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"未知的缓存模式: {mode}，可选: {', '.join(CACHE_MODES)}")
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.mode = mode
+
+    def cache_key(self, url: str) -> Tuple[str, str]:
+        """返回 (查询哈希, 分页标识)，查询参数排序并压缩空白，与参数顺序和多余空格无关"""
+        parsed = urlparse(url)
+        params = {}
+        for name, value in parse_qsl(parsed.query, keep_blank_values=True):
+            value = re.sub(r'\s+', ' ', value.strip())
+            if name == 'id_list' and value:
+                value = ",".join(sorted(value.split(',')))
+            params[name] = value
+        page = f"{params.pop('start', '0')}_{params.pop('max_results', '')}"
+        normalized = f"{parsed.netloc}{parsed.path}?{urlencode(sorted(params.items()))}"
+        query_hash = hashlib.sha256(normalized.encode('utf-8')).hexdigest()[:24]
+        return query_hash, page
+
+    def _paths(self, url: str) -> Tuple[Path, Path]:
+        query_hash, page = self.cache_key(url)
+        base = self.cache_dir / query_hash / page
+        return base.with_suffix('.xml'), base.with_suffix('.json')
+
+    def load(self, url: str) -> Optional[Tuple[bytes, Dict[str, Any]]]:
+        """读取缓存的页面内容和元信息，不存在时返回None"""
+        content_path, meta_path = self._paths(url)
+        try:
+            meta = json.loads(meta_path.read_text(encoding='utf-8'))
+            return content_path.read_bytes(), meta
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def is_fresh(self, meta: Dict[str, Any]) -> bool:
+        return time.time() - meta.get('fetched_at', 0) < self.ttl
+
+    def store(self, url: str, content: bytes, headers: Optional[Dict[str, str]] = None):
+        """写入页面内容和元信息，先写临时文件再替换，避免并发读取到不完整的文件"""
+        content_path, meta_path = self._paths(url)
+        content_path.parent.mkdir(parents=True, exist_ok=True)
+        headers = headers or {}
+        meta = {
+            'url': url,
+            'fetched_at': time.time(),
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+        }
+        for path, data in ((content_path, content),
+                           (meta_path, json.dumps(meta, ensure_ascii=False, indent=2).encode('utf-8'))):
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+
+    def touch(self, url: str, meta: Dict[str, Any]):
+        """条件请求返回304时刷新缓存的获取时间"""
+        meta = dict(meta, fetched_at=time.time())
+        _, meta_path = self._paths(url)
+        meta_path.write_text(json.dumps(meta, ensure_ascii=False, indent=2), encoding='utf-8')
+
+
+class CachedSession:
+    """
+    带磁盘缓存的会话，包装实际发起网络请求的会话（通常是限速会话）
+
+    缓存命中的请求不经过底层会话，因此也不占用限速配额。
+    """
+
+    def __init__(self, cache: ResponseCache, session):
+        self.cache = cache
+        self.session = session
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None, **kwargs):
+        cached = self.cache.load(url) if self.cache.mode != 'refresh' else None
+
+        if self.cache.mode == 'offline':
+            if cached is None:
+                raise CacheMissError(f"离线模式下缓存未命中: {url}")
+            self.hits += 1
+            return CachedResponse(cached[0])
+
+        if cached is not None and self.cache.is_fresh(cached[1]):
+            self.hits += 1
+            return CachedResponse(cached[0])
+
+        # 缓存过期时发送条件请求，服务端未修改则直接复用缓存
+        request_headers = dict(headers or {})
+        if cached is not None:
+            if cached[1].get('etag'):
+                request_headers['If-None-Match'] = cached[1]['etag']
+            if cached[1].get('last_modified'):
+                request_headers['If-Modified-Since'] = cached[1]['last_modified']
+
+        self.misses += 1
+        try:
+            response = self.session.get(url, headers=request_headers, **kwargs)
+        except Exception as e:
+            if cached is None:
+                raise
+            print(f"请求失败，使用过期的缓存响应: {e}")
+            return CachedResponse(cached[0])
+
+        if response.status_code == 304 and cached is not None:
+            self.cache.touch(url, cached[1])
+            return CachedResponse(cached[0])
+        if response.status_code == 200 and not self._is_transient(url, response.content):
+            self.cache.store(url, response.content, response.headers)
+        return response
+
+    def _is_transient(self, url: str, content: bytes) -> bool:
+        """
+        非首页的空响应多为 arXiv 的临时故障，调用方会重试该页，不能缓存，否则重试会一直命中这个空页面
+        """
+        _, page = self.cache.cache_key(url)
+        return not page.startswith('0_') and b'<entry' not in content
@@ -2,17 +2,81 @@
 ArXiv API 客户端模块
 """
 import arxiv
+import heapq
 import json
 import os
-from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+import re
+import requests
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from pathlib import Path
 from config.settings import SEARCH_CONFIG, QUERY
+from src.rate_limit import IntervalRateLimiter, ThrottledSession
+from src.paper_store import PaperStore
+from src.arxiv_cache import ResponseCache, CachedSession
+from src.streaming import background_iter
+from src.records import PaperRecord, JsonlWriter, to_json_dict
+from src.atom_parser import AtomFeedParser
+from src.metrics import RunMetrics
+from urllib.parse import urlencode
+
+# arXiv 查询API地址，direct 后端直接请求该地址
+QUERY_URL = "https://export.arxiv.org/api/query?{}"
+
+# 排序方式对应的元数据字段，用于合并多个子查询的结果
+SORT_FIELDS = {
+    'SubmittedDate': 'published',
+    'LastUpdatedDate': 'updated',
+}
+
+def _interleave(streams: List[Iterator]) -> Iterator:
+    """轮流从各个迭代器中取出元素，跳过已耗尽的迭代器"""
+    iterators = [iter(stream) for stream in streams]
+    while iterators:
+        remaining = []
+        for iterator in iterators:
+            try:
+                yield next(iterator)
+            except StopIteration:
+                continue
+            remaining.append(iterator)
+        iterators = remaining
 
 class ArxivClient:
-    def __init__(self, config=None):
-        self.client = arxiv.Client()
+    def __init__(self, config=None, session=None, metrics: Optional[RunMetrics] = None):
         self.config = config or SEARCH_CONFIG
+        self.metrics = metrics or RunMetrics()
+        # 出错的子查询，非空时本次检索结果不完整，调用方不应据此更新运行记录
+        self.failed_queries: List[str] = []
+        # 所有请求（包括并发子查询）共享同一个限速器，保证对 arXiv 的总请求频率不变
+        self.rate_limiter = IntervalRateLimiter(self.config.get('delay_seconds', 3.0))
+        self.session = ThrottledSession(session or requests.Session(), self.rate_limiter,
+                                        max_concurrent=self.config.get('max_workers', 4))
+        # 缓存位于限速之前，命中缓存的请求不需要等待
+        if self.config.get('cache_dir'):
+            cache = ResponseCache(self.config['cache_dir'],
+                                  ttl=self.config.get('cache_ttl', 6 * 3600),
+                                  mode=self.config.get('cache_mode', 'default'))
+            self.session = CachedSession(cache, self.session)
+        self.client = self._make_client()
+
+    def _make_client(self) -> arxiv.Client:
+        """
+        创建使用共享限速会话的 arxiv 客户端
+
+        arxiv 库没有公开注入会话的接口，这里替换其私有属性 _session（2.x 至 4.x 版本均存在，
+        requirements.txt 中固定了版本范围）；属性不存在时报错，可改用 backend='direct'。
+        """
+        client = arxiv.Client(
+            page_size=self.config.get('page_size', 100),
+            delay_seconds=0,  # 请求间隔由共享限速器控制
+            num_retries=self.config.get('num_retries', 3)
+        )
+        if not hasattr(client, '_session'):
+            raise RuntimeError(f"arxiv {getattr(arxiv, '__version__', '')} 不支持替换会话，请使用 backend='direct'")
+        client._session = self.session
+        return client
 
     def _safe_get_categories(self, paper: arxiv.Result) -> List[str]:
         """安全地获取论文分类"""
@@ -27,16 +91,49 @@ class ArxivClient:
             print(f"调试 - 获取分类出错: {e}")
             return [paper.primary_category] if paper.primary_category else []
 
-    def _load_last_run_info(self, last_run_file: str) -> Optional[str]:
-        """加载上次运行的最新文章ID"""
+    def _load_last_run_data(self, last_run_file: str) -> Dict[str, Any]:
+        """加载上次运行的完整记录"""
         try:
             with open(last_run_file, 'r') as f:
-                data = json.load(f)
-                return data.get('latest_entry_id')
+                return json.load(f)
         except (FileNotFoundError, json.JSONDecodeError):
-            return None
+            return {}
+
+    def _load_last_run_info(self, last_run_file: str) -> Optional[str]:
+        """加载上次运行的最新文章ID"""
+        return self._load_last_run_data(last_run_file).get('latest_entry_id')
 
-    def save_last_run_info(self, latest_entry_id: str, last_run_file: str, total_results: int = 0):
+    def get_date_window(self, last_run_file: Optional[str] = None,
+                        now: Optional[datetime] = None) -> Tuple[datetime, datetime]:
+        """
+        根据上次成功运行的时间计算本次检索的提交时间窗口（UTC）
+
+        窗口起点为上次窗口终点减去 window_overlap_hours，没有运行记录时回溯 initial_window_days 天。
+        submittedDate 是提交时间，论文通常在提交 1–3 天后才公布（周末和假期更久），
+        重叠时间需要覆盖这段延迟，重叠部分中已总结的论文由已见论文存储跳过；
+        终点为当前时间向下取整到整点，使同一小时内的重跑（例如失败后重试）生成相同的查询URL、能够命中响应缓存；
+        终点之后提交的论文由下次运行的窗口覆盖。运行失败时不更新记录，下次运行会自动覆盖遗漏的时间段。
+        """
+        end = (now or datetime.now(timezone.utc)).replace(minute=0, second=0, microsecond=0)
+        data = self._load_last_run_data(last_run_file) if last_run_file else {}
+
+        last_end = None
+        if data.get('window_end'):
+            last_end = datetime.fromisoformat(data['window_end'])
+        elif data.get('timestamp'):
+            # 旧版记录只有本地时间的运行时间戳
+            last_end = datetime.fromisoformat(data['timestamp'])
+        if last_end is not None and last_end.tzinfo is None:
+            last_end = last_end.astimezone()
+
+        if last_end is None:
+            start = end - timedelta(days=self.config.get('initial_window_days', 3))
+        else:
+            start = last_end.astimezone(timezone.utc) - timedelta(hours=self.config.get('window_overlap_hours', 96))
+        return start, end
+
+    def save_last_run_info(self, latest_entry_id: str, last_run_file: str, total_results: int = 0,
+                           window_end: Optional[datetime] = None):
         """
         保存本次运行的最新文章ID
         
@@ -44,22 +141,32 @@ class ArxivClient:
             latest_entry_id: 最新文章的ID
             last_run_file: 存储运行信息的文件路径
             total_results: 本次获取的结果数量
+            window_end: 本次检索的提交时间窗口终点（可选）
         """
         try:
             os.makedirs(os.path.dirname(last_run_file), exist_ok=True)
+            data = {
+                'latest_entry_id': latest_entry_id,
+                'timestamp': datetime.now().isoformat(),
+                'total_results': total_results
+            }
+            if window_end is not None:
+                data['window_end'] = window_end.astimezone(timezone.utc).isoformat()
             with open(last_run_file, 'w') as f:
-                json.dump({
-                    'latest_entry_id': latest_entry_id,
-                    'timestamp': datetime.now().isoformat(),
-                    'total_results': total_results
-                }, f, indent=2)
+                json.dump(data, f, indent=2)
             print(f"已更新运行记录，最新文章 ID: {latest_entry_id}")
         except Exception as e:
             print(f"保存运行记录时出错: {e}")
 
+    def _create_date_clause(self, date_range: Tuple[datetime, datetime]) -> str:
+        """构建提交时间范围查询，arXiv 使用 GMT 时间，精确到分钟"""
+        start, end = (dt.astimezone(timezone.utc) for dt in date_range)
+        return f"submittedDate:[{start.strftime('%Y%m%d%H%M')} TO {end.strftime('%Y%m%d%H%M')}]"
+
     def _create_search_query(self, query: str = "", 
                            categories: Optional[List[str]] = None,
-                           keywords: Optional[Dict[str, List[str]]] = None) -> str:
+                           keywords: Optional[Dict[str, List[str]]] = None,
+                           date_range: Optional[Tuple[datetime, datetime]] = None) -> str:
         """构建高级搜索查询"""
         search_parts = []
         
@@ -92,13 +199,298 @@ class ArxivClient:
             except Exception as e:
                 print(f"调试 - 构建分类查询出错: {e}")
 
+        # 添加提交时间窗口
+        if date_range:
+            search_parts.append(self._create_date_clause(date_range))
+
         final_query = " AND ".join(search_parts) if search_parts else "*:*"
         return final_query
 
+    def _split_keywords(self, query: str) -> List[str]:
+        """将纯 OR 连接的关键词查询拆分为单个关键词，其他形式的查询保持不变"""
+        if not query or re.search(r'[()]|\bAND(NOT)?\b', query):
+            return [query]
+        keywords = [kw.strip() for kw in re.split(r'\s+OR\s+', query) if kw.strip()]
+        return keywords or [query]
+
+    def _build_sub_queries(self, query: str = "",
+                           categories: Optional[List[str]] = None,
+                           date_range: Optional[Tuple[datetime, datetime]] = None) -> List[str]:
+        """
+        根据 split_by 配置将查询拆分为多个子查询
+
+        split_by 为 'category' 时每个分类一个子查询，为 'keyword' 时每个关键词一个子查询，
+        否则返回单个合并查询。
+        """
+        split_by = self.config.get('split_by')
+        if split_by == 'category' and categories:
+            cats = [cat for cat in categories if cat]
+            if len(cats) > 1:
+                return [self._create_search_query(query, [cat], date_range=date_range) for cat in cats]
+        elif split_by == 'keyword' and query:
+            keywords = self._split_keywords(query)
+            if len(keywords) > 1:
+                return [self._create_search_query(kw, categories, date_range=date_range) for kw in keywords]
+        return [self._create_search_query(query, categories, date_range=date_range)]
+
+    def _result_to_metadata(self, paper: arxiv.Result) -> PaperRecord:
+        """将 arxiv.Result 转换为论文元数据记录"""
+        return PaperRecord(
+            title=paper.title,
+            authors=[author.name for author in paper.authors],
+            published=paper.published.isoformat(),
+            updated=paper.updated.isoformat(),
+            summary=paper.summary,
+            doi=paper.doi,
+            primary_category=paper.primary_category,
+            categories=self._safe_get_categories(paper),
+            links=[link.href for link in paper.links],
+            pdf_url=paper.pdf_url,
+            entry_id=paper.entry_id,
+            comment=getattr(paper, 'comment', '')
+        )
+
+    def _iter_query(self, search_query: str,
+                    client: Optional[arxiv.Client] = None) -> Iterator[PaperRecord]:
+        """逐页执行单个查询并逐篇产出元数据"""
+        search_kwargs = {
+            'query': search_query,
+            'max_results': self.config['max_total_results'],
+            'sort_by': getattr(arxiv.SortCriterion, self.config['sort_by']),
+            'sort_order': getattr(arxiv.SortOrder, self.config['sort_order'])
+        }
+
+        # 只在 id_list 不为 None 时添加到参数中
+        if self.config['id_list'] is not None:
+            search_kwargs['id_list'] = self.config['id_list']
+
+        search = arxiv.Search(**search_kwargs)
+        for paper in (client or self.client).results(search):
+            try:
+                metadata = self._result_to_metadata(paper)
+            except Exception as e:
+                print(f"处理单篇文章时出错: {e}")
+                continue
+            yield metadata
+
+    def _format_query_url(self, search_query: str, start: int, page_size: int) -> str:
+        """构建一页查询的URL，参数与 arxiv 库一致，因此两种后端可以共用响应缓存"""
+        id_list = self.config['id_list'] or []
+        return QUERY_URL.format(urlencode({
+            'search_query': search_query,
+            'id_list': ",".join(id_list),
+            'sortBy': getattr(arxiv.SortCriterion, self.config['sort_by']).value,
+            'sortOrder': getattr(arxiv.SortOrder, self.config['sort_order']).value,
+            'start': str(start),
+            'max_results': str(page_size),
+        }))
+
+    def _fetch_page(self, url: str, first_page: bool) -> Tuple[List[PaperRecord], int]:
+        """
+        请求并增量解析一页响应，失败、超时、响应中断或非首页意外为空时重试
+
+        连接超时和读取超时分别由 connect_timeout / read_timeout 配置，读取超时限制的是两次收到数据之间的等待时间，
+        服务器停止发送数据时不会无限等待并一直占用并发请求名额。
+
+        Returns:
+            (本页论文记录, 结果总数)
+        """
+        num_retries = self.config.get('num_retries', 3)
+        timeout = (self.config.get('connect_timeout', 10), self.config.get('read_timeout', 60))
+        for attempt in range(num_retries + 1):
+            start = time.perf_counter()
+            response = None
+            try:
+                self.metrics.incr('arxiv.requests')
+                response = self.session.get(url, headers={'user-agent': 'arxivsummary'}, stream=True,
+                                            timeout=timeout)
+                if response.status_code != 200:
+                    raise requests.HTTPError(f"HTTP错误 {response.status_code}: {url}")
+                parser = AtomFeedParser()
+                records = []
+                for chunk in response.iter_content(chunk_size=65536):
+                    records.extend(parser.feed(chunk))
+                records.extend(parser.close())
+                if not records and not first_page:
+                    raise ValueError(f"意外的空页面: {url}")
+                self.metrics.observe('arxiv.page', time.perf_counter() - start)
+                return records, parser.total_results
+            except (requests.HTTPError, requests.ConnectionError, requests.Timeout,
+                    requests.exceptions.ChunkedEncodingError, ValueError) as e:
+                if attempt >= num_retries:
+                    self.metrics.incr('arxiv.failures')
+                    raise
+                self.metrics.incr('arxiv.retries')
+                print(f"获取页面失败，正在重试({attempt + 1}/{num_retries}): {e}")
+            finally:
+                # 失败时同样关闭响应，释放连接和并发请求名额
+                if response is not None:
+                    response.close()
+
+    def _iter_query_direct(self, search_query: str) -> Iterator[PaperRecord]:
+        """直接请求 export API 并用流式解析器逐页产出论文记录，不经过 arxiv 库"""
+        max_results = self.config['max_total_results']
+        page_size = self.config.get('page_size', 100)
+        start = 0
+        while start < max_results:
+            url = self._format_query_url(search_query, start, min(page_size, max_results - start))
+            records, total_results = self._fetch_page(url, first_page=start == 0)
+            yield from records[:max_results - start]
+            start += len(records)
+            if not records or start >= total_results:
+                return
+
+    def _skip_known(self, papers: Iterator[Dict[str, Any]],
+                    store: Optional[PaperStore] = None,
+                    stop_on_known: bool = True) -> Iterator[Dict[str, Any]]:
+        """
+        跳过已总结过的论文（任意版本）
+
+        此前被过滤（重复或未达到相关性阈值）的论文仍然产出，由下游按当前配置重新过滤，但与已总结的论文一样计入连续已处理的篇数；
+        按时间倒序检索时，连续遇到 stop_after_known 篇已处理的论文说明更早的论文都已处理，停止检索。
+        按提交时间窗口检索时 stop_on_known=False：延迟公布的论文夹在已处理的论文之间，检索范围由窗口限定。
+        """
+        if store is None:
+            yield from papers
+            return
+
+        stop_after = self.config.get('stop_after_known', 50)
+        if not stop_on_known or self.config['sort_by'] not in SORT_FIELDS or self.config['sort_order'] != 'Descending':
+            stop_after = 0
+
+        known_streak = 0
+        for paper in papers:
+            summarized = store.is_summarized(paper['entry_id'])
+            if summarized or store.is_rejected(paper['entry_id']):
+                known_streak += 1
+                if stop_after and known_streak >= stop_after:
+                    print(f"连续遇到 {known_streak} 篇已处理的论文，停止检索")
+                    return
+                if summarized:
+                    continue
+            else:
+                known_streak = 0
+            yield paper
+
+    def _iter_sub_query(self, search_query: str,
+                        last_entry_id: Optional[str] = None,
+                        store: Optional[PaperStore] = None,
+                        stop_on_known: bool = True) -> Iterator[Tuple[Dict[str, Any], bool]]:
+        """
+        执行一个子查询，逐篇产出 (元数据, 是否为上次处理过的文章)
+
+        遇到上次处理过的文章（last_entry_id）时将其产出后停止，由合并步骤据此截断其他子查询。
+        子查询不单独限制结果数：各子查询的论文数量可能相差很大，只有每个子查询都能取到 max_total_results 篇，
+        归并结果才与单个合并查询的前 max_total_results 篇相同。结果流按需逐页获取，
+        归并达到上限后其余子查询随之停止，多获取的页数不超过每个子查询的预取量。
+        出错时停止该子查询并记录到 failed_queries 和运行指标，其他子查询的结果仍然产出。
+        """
+        try:
+            if self.config.get('backend', 'arxiv') == 'direct':
+                papers = self._iter_query_direct(search_query)
+            else:
+                # 每个子查询使用独立的 arxiv 客户端，限速器仍然共享
+                papers = self._iter_query(search_query, self._make_client())
+            for metadata in self._skip_known(papers, store, stop_on_known):
+                if last_entry_id and metadata['entry_id'] == last_entry_id:
+                    yield metadata, True
+                    return
+                yield metadata, False
+        except Exception as e:
+            self.failed_queries.append(search_query)
+            self.metrics.incr('arxiv.failed_queries')
+            print(f"子查询出错 ({search_query}): {e}")
+
+    def _merge_streams(self, streams: List[Iterator[Tuple[Dict[str, Any], bool]]]) -> Iterator[Dict[str, Any]]:
+        """
+        合并多个子查询的结果流，按 entry_id 去重并保持原有排序
+
+        按提交/更新时间排序时做多路归并；按相关度排序时轮流取各子查询结果。
+        按时间倒序归并时遇到上次处理过的文章即停止，更早的文章都已处理过。
+        """
+        sort_field = SORT_FIELDS.get(self.config['sort_by'])
+        descending = self.config['sort_order'] == 'Descending'
+        if sort_field:
+            merged = heapq.merge(*streams, key=lambda item: item[0][sort_field], reverse=descending)
+        else:
+            merged = _interleave(streams)
+
+        seen_ids = set()
+        for paper, is_last_entry in merged:
+            if is_last_entry:
+                if sort_field and descending:
+                    print(f"遇到上次处理过的文章（ID: {paper['entry_id']}），停止检索")
+                    return
+                continue
+            if paper['entry_id'] in seen_ids:
+                continue
+            seen_ids.add(paper['entry_id'])
+            yield paper
+            if len(seen_ids) >= self.config['max_total_results']:
+                return
+
+    def iter_papers(self,
+                    categories: Optional[List[str]] = None,
+                    query: str = QUERY,
+                    last_run_file: Optional[str] = None,
+                    store: Optional[PaperStore] = None,
+                    date_range: Optional[Tuple[datetime, datetime]] = None) -> Iterator[PaperRecord]:
+        """
+        逐篇产出论文元数据，每页响应到达后即可被下游处理
+
+        参数同 search_papers。拆分为多个子查询时，每个子查询在后台线程中预取，
+        通过有界队列归并，内存占用与结果总数无关。
+        """
+        # 加载上次运行的最新文章ID；已见论文存储为空（如升级后首次运行）时仍以其作为检索终点
+        last_entry_id = None
+        if date_range is not None:
+            print(f"使用提交时间窗口检索: {date_range[0].isoformat()} 至 {date_range[1].isoformat()}")
+        elif store is not None and len(store):
+            print(f"使用已见论文存储进行增量检索，已记录 {len(store)} 篇论文")
+        elif last_run_file and os.path.exists(last_run_file):
+            last_entry_id = self._load_last_run_info(last_run_file)
+            if last_entry_id:
+                print(f"找到上次运行记录，将从文章 ID: {last_entry_id} 开始检索新论文")
+            else:
+                print(f"找到上次运行记录文件，但无法获取有效的entry_id")
+
+        # 构建查询
+        search_query = self._create_search_query(query, categories, date_range=date_range)
+        print(f"使用查询: {search_query}")
+
+        sub_queries = self._build_sub_queries(query, categories, date_range)
+        if len(sub_queries) > 1:
+            print(f"将查询拆分为 {len(sub_queries)} 个子查询，最大并发请求数: {self.config.get('max_workers', 4)}")
+            page_size = self.config.get('page_size', 100)
+            streams = [background_iter(self._iter_sub_query(q, last_entry_id, store, date_range is None),
+                                       maxsize=page_size)
+                       for q in sub_queries]
+        else:
+            streams = [self._iter_sub_query(search_query, last_entry_id, store, date_range is None)]
+
+        # 已见论文按页批量写入存储
+        # 检索阶段耗时从开始检索到结果流耗尽（或被关闭），下游边检索边处理时包含等待下游的时间
+        unsaved = []
+        with self.metrics.stage('fetch'):
+            try:
+                for paper in self._merge_streams(streams):
+                    self.metrics.incr('arxiv.papers')
+                    if store is not None:
+                        unsaved.append(paper)
+                        if len(unsaved) >= self.config.get('page_size', 100):
+                            store.mark_seen(unsaved)
+                            unsaved = []
+                    yield paper
+            finally:
+                if store is not None and unsaved:
+                    store.mark_seen(unsaved)
+
     def search_papers(self, 
                      categories: Optional[List[str]] = None,
                      query: str = QUERY,
-                     last_run_file: Optional[str] = None) -> List[Dict[str, Any]]:
+                     last_run_file: Optional[str] = None,
+                     store: Optional[PaperStore] = None,
+                     date_range: Optional[Tuple[datetime, datetime]] = None) -> List[PaperRecord]:
         """
         搜索论文并返回元数据，支持多个分类的查询和去重
         
@@ -106,82 +498,48 @@ class ArxivClient:
             categories: arXiv分类列表
             query: 搜索关键词
             last_run_file: 存储上次运行信息的文件路径（可选）
+            store: 已见论文存储（可选），提供时跳过已总结的论文，代替 last_run_file 中的单个文章ID
+            date_range: 提交时间窗口 (起点, 终点)（可选），提供时只检索该窗口内提交的论文，
+                参见 get_date_window
         """
         all_results = []
         
-        # 加载上次运行的最新文章ID
-        last_entry_id = None
-        if last_run_file and os.path.exists(last_run_file):
-            last_entry_id = self._load_last_run_info(last_run_file)
-            if last_entry_id:
-                print(f"找到上次运行记录，将从文章 ID: {last_entry_id} 开始检索新论文")
-            else:
-                print(f"找到上次运行记录文件，但无法获取有效的entry_id")
-        
-        # 构建查询
-        search_query = self._create_search_query(query, categories)
-        print(f"使用查询: {search_query}")
-        
-        # 设置排序标准
-        sort_criterion = getattr(arxiv.SortCriterion, self.config['sort_by'])
-        sort_order = getattr(arxiv.SortOrder, self.config['sort_order'])
-        
         try:
-            # 创建搜索参数字典
-            search_kwargs = {
-                'query': search_query,
-                'max_results': self.config['max_total_results'],
-                'sort_by': sort_criterion,
-                'sort_order': sort_order
-            }
-            
-            # 只在 id_list 不为 None 时添加到参数中
-            if self.config['id_list'] is not None:
-                search_kwargs['id_list'] = self.config['id_list']
-            
-            search = arxiv.Search(**search_kwargs)
-            latest_entry_id = None
-
-            for paper in self.client.results(search):
-                try:
-                    # 如果是第一篇文章，记录其ID
-                    if not latest_entry_id:
-                        latest_entry_id = paper.entry_id
-
-                    # 如果遇到上次处理过的文章，就停止查询
-                    if last_entry_id and paper.entry_id == last_entry_id:
-                        print(f"遇到上次处理过的文章（ID: {last_entry_id}），停止检索")
-                        break
-
-                    metadata = {
-                        'title': paper.title,
-                        'authors': [author.name for author in paper.authors],
-                        'published': paper.published.isoformat(),
-                        'updated': paper.updated.isoformat(),
-                        'summary': paper.summary,
-                        'doi': paper.doi,
-                        'primary_category': paper.primary_category,
-                        'categories': self._safe_get_categories(paper),
-                        'links': [link.href for link in paper.links],
-                        'pdf_url': paper.pdf_url,
-                        'entry_id': paper.entry_id,
-                        'comment': getattr(paper, 'comment', '')
-                    }
-                    all_results.append(metadata)
-                    
-                except Exception as e:
-                    print(f"处理单篇文章时出错: {e}")
-                    continue
-                
+            for metadata in self.iter_papers(categories, query, last_run_file, store, date_range):
+                all_results.append(metadata)
+
         except Exception as e:
             print(f"搜索过程出错: {e}")
             print(f"错误类型: {type(e)}")
             import traceback
             print(f"错误堆栈: {traceback.format_exc()}")
 
+        if date_range is not None and len(all_results) >= self.config['max_total_results']:
+            print(f"警告: 时间窗口内的论文数量达到上限 {self.config['max_total_results']}，"
+                  f"较早的论文可能被遗漏，请增大 max_total_results")
+
+        if self.failed_queries:
+            print(f"警告: {len(self.failed_queries)} 个子查询出错，检索结果不完整")
+
         if not all_results:
             print("未找到新的论文")
         else:
             print(f"找到 {len(all_results)} 篇新论文")
 
-        return all_results
\ No newline at end of file
+        return all_results
+
+    def save_results(self, results: List[Dict[str, Any]], output_dir: str, filename: str):
+        """
+        保存论文元数据
+
+        文件名以 .jsonl 或 .jsonl.gz 结尾时追加写入JSONL记录，否则写入JSON数组。
+        """
+        output_path = Path(output_dir) / filename
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        if output_path.name.endswith(('.jsonl', '.jsonl.gz')):
+            with JsonlWriter(output_path) as writer:
+                writer.write_many(results)
+        else:
+            with open(output_path, 'w', encoding='utf-8') as f:
+                json.dump([to_json_dict(paper) for paper in results], f, ensure_ascii=False, indent=2)
+        print(f"已保存 {len(results)} 篇论文的元数据到: {output_path}")
\ No newline at end of file
@@ -0,0 +1,132 @@
+"""
+arXiv Atom 响应流式解析模块
+
+使用 xml.etree.ElementTree.XMLPullParser 增量解析 export API 返回的 Atom 分页，
+每解析完一个 <entry> 即直接生成 PaperRecord 并释放该元素，不构建 arxiv.Result 中间对象。
+"""
+import xml.etree.ElementTree as ET
+from typing import List, Iterable, Iterator, Optional
+
+from src.records import PaperRecord
+
+ATOM = '{http://www.w3.org/2005/Atom}'
+ARXIV = '{http://arxiv.org/schemas/atom}'
+OPENSEARCH = '{http://a9.com/-/spec/opensearch/1.1/}'
+
+_ENTRY = ATOM + 'entry'
+_TOTAL_RESULTS = OPENSEARCH + 'totalResults'
+_START_INDEX = OPENSEARCH + 'startIndex'
+
+
+def _iso_timestamp(text: Optional[str]) -> str:
+    """将 Atom 时间戳转换为与 datetime.isoformat() 一致的格式"""
+    text = (text or "").strip()
+    if text.endswith('Z'):
+        return text[:-1] + '+00:00'
+    return text
+
+
+def parse_entry(entry: ET.Element) -> Optional[PaperRecord]:
+    """将 <entry> 元素转换为论文记录，缺少 <id> 时返回None"""
+    entry_id = title = summary = published = updated = None
+    doi = comment = pdf_url = None
+    primary_category = ""
+    authors, categories, links = [], [], []
+
+    # 只遍历一次子元素，按标签分派
+    for child in entry:
+        tag = child.tag
+        if tag == ATOM + 'id':
+            entry_id = child.text
+        elif tag == ATOM + 'title':
+            title = " ".join((child.text or "").split())
+        elif tag == ATOM + 'summary':
+            summary = child.text or ""
+        elif tag == ATOM + 'published':
+            published = _iso_timestamp(child.text)
+        elif tag == ATOM + 'updated':
+            updated = _iso_timestamp(child.text)
+        elif tag == ATOM + 'author':
+            authors.append(child.findtext(ATOM + 'name') or "")
+        elif tag == ATOM + 'link':
+            href = child.get('href')
+            if href is None:
+                continue
+            links.append(href)
+            if pdf_url is None and child.get('title') == 'pdf':
+                pdf_url = href
+        elif tag == ATOM + 'category':
+            term = child.get('term')
+            if term is not None:
+                categories.append(term)
+        elif tag == ARXIV + 'primary_category':
+            primary_category = child.get('term') or ""
+        elif tag == ARXIV + 'comment':
+            comment = child.text
+        elif tag == ARXIV + 'doi':
+            doi = child.text
+
+    if not entry_id:
+        return None
+    return PaperRecord(
+        title=title or "",
+        authors=authors,
+        published=published or "",
+        updated=updated or "",
+        summary=summary or "",
+        doi=doi,
+        primary_category=primary_category,
+        categories=categories,
+        links=links,
+        pdf_url=pdf_url,
+        entry_id=entry_id,
+        comment=comment,
+    )
+
+
+class AtomFeedParser:
+    """
+    增量解析一页 Atom 响应
+
+    反复调用 feed() 传入响应数据块，每次返回本块中解析完成的论文记录；
+    total_results / start_index 在解析到 opensearch 元素后可用。
+    """
+
+    def __init__(self):
+        self._parser = ET.XMLPullParser(events=('end',))
+        self.total_results = 0
+        self.start_index = 0
+        self.count = 0
+
+    def _drain(self) -> List[PaperRecord]:
+        records = []
+        for _, elem in self._parser.read_events():
+            tag = elem.tag
+            if tag == _ENTRY:
+                record = parse_entry(elem)
+                if record is not None:
+                    records.append(record)
+                # 释放已处理的元素，内存占用与页面大小无关
+                elem.clear()
+            elif tag == _TOTAL_RESULTS:
+                self.total_results = int((elem.text or "0").strip() or 0)
+            elif tag == _START_INDEX:
+                self.start_index = int((elem.text or "0").strip() or 0)
+        self.count += len(records)
+        return records
+
+    def feed(self, data: bytes) -> List[PaperRecord]:
+        self._parser.feed(data)
+        return self._drain()
+
+    def close(self) -> List[PaperRecord]:
+        self._parser.close()
+        return self._drain()
+
+
+def iter_feed(chunks: Iterable[bytes], parser: Optional[AtomFeedParser] = None) -> Iterator[PaperRecord]:
+    """逐块解析 Atom 响应并逐篇产出论文记录"""
+    parser = parser or AtomFeedParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
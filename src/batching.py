@@ -0,0 +1,125 @@
+"""
+批次打包模块 - 按 token 预算而不是固定篇数组织摘要批次
+
+TokenEstimator 根据文本长度估计每篇论文的输入 token 数和预期输出 token 数，
+并用 API 返回的 usageMetadata 持续校准；BatchPacker 按输入/输出预算贪心地将论文装入批次。
+"""
+import json
+import os
+import threading
+from typing import List, Dict, Any, Iterable, Iterator, Optional
+
+
+class TokenEstimator:
+    """
+    按模型校准的 token 估计器
+
+    输入按 “字符数 / 每token字符数” 估计；输出按 “每篇论文的输出token数” 估计，
+    其中包含思考模型的 thoughtsTokenCount（与正文共享 maxOutputTokens 上限）。
+    每次调用后按指数滑动平均更新这两个系数。
+    """
+
+    def __init__(self, model: str, chars_per_token: float = 4.0,
+                 output_tokens_per_paper: float = 450.0, smoothing: float = 0.3):
+        self.model = model
+        self.chars_per_token = chars_per_token
+        self.output_tokens_per_paper = output_tokens_per_paper
+        self.smoothing = smoothing
+        self.samples = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, model: str, config: Dict[str, Any],
+                    calibration_file: Optional[str] = None) -> 'TokenEstimator':
+        """根据 BATCH_CONFIG 创建估计器，存在校准文件时载入该模型上次运行的校准结果"""
+        estimator = cls(
+            model,
+            chars_per_token=config.get('initial_chars_per_token', 4.0),
+            output_tokens_per_paper=config.get('initial_output_tokens_per_paper', 450.0),
+            smoothing=config.get('calibration_smoothing', 0.3),
+        )
+        if calibration_file and os.path.exists(calibration_file):
+            try:
+                with open(calibration_file, 'r', encoding='utf-8') as f:
+                    saved = json.load(f).get(model)
+                if saved:
+                    estimator.chars_per_token = saved['chars_per_token']
+                    estimator.output_tokens_per_paper = saved['output_tokens_per_paper']
+                    estimator.samples = saved.get('samples', 0)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"读取token校准文件失败，使用默认估计: {e}")
+        return estimator
+
+    def save(self, calibration_file: str):
+        """将本模型的校准结果写入校准文件，保留其他模型的记录"""
+        data = {}
+        if os.path.exists(calibration_file):
+            try:
+                with open(calibration_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                data = {}
+        with self._lock:
+            data[self.model] = {
+                'chars_per_token': round(self.chars_per_token, 4),
+                'output_tokens_per_paper': round(self.output_tokens_per_paper, 1),
+                'samples': self.samples,
+            }
+        tmp_file = f"{calibration_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_file, calibration_file)
+
+    def input_tokens(self, text_chars: int) -> float:
+        return text_chars / self.chars_per_token
+
+    def observe(self, prompt_chars: int, paper_count: int, usage: Dict[str, Any]):
+        """用一次调用的 usageMetadata 校准估计系数"""
+        prompt_tokens = usage.get('promptTokenCount') or 0
+        output_tokens = (usage.get('candidatesTokenCount') or 0) + (usage.get('thoughtsTokenCount') or 0)
+        if not prompt_tokens or not output_tokens or not paper_count:
+            return
+        with self._lock:
+            alpha = self.smoothing if self.samples else 1.0
+            self.chars_per_token += alpha * (prompt_chars / prompt_tokens - self.chars_per_token)
+            self.output_tokens_per_paper += alpha * (output_tokens / paper_count - self.output_tokens_per_paper)
+            self.samples += 1
+
+
+class BatchPacker:
+    """
+    按 token 预算贪心打包论文
+
+    依次装入论文，再装入下一篇会超过输入预算、输出预算或篇数上限时产出当前批次；
+    单篇论文超出预算时单独成批。
+    """
+
+    def __init__(self, estimator: TokenEstimator, paper_chars, prompt_overhead_chars: int = 0,
+                 max_input_tokens: float = 24000, max_output_tokens: float = 8192,
+                 max_papers: int = 20):
+        self.estimator = estimator
+        self.paper_chars = paper_chars
+        self.prompt_overhead_chars = prompt_overhead_chars
+        self.max_input_tokens = max_input_tokens
+        self.max_output_tokens = max_output_tokens
+        self.max_papers = max_papers
+
+    def pack(self, papers: Iterable[Dict[str, Any]]) -> Iterator[List[Dict[str, Any]]]:
+        batch = []
+        batch_chars = self.prompt_overhead_chars
+        for paper in papers:
+            chars = self.paper_chars(paper)
+            if batch and self.estimator.input_tokens(batch_chars + chars) > self.max_input_tokens:
+                yield batch
+                batch = []
+                batch_chars = self.prompt_overhead_chars
+            batch.append(paper)
+            batch_chars += chars
+            # 篇数或输出预算已满时无需等待下一篇论文即可产出，流式输入时尽早开始生成
+            if (len(batch) >= self.max_papers
+                    or self.estimator.output_tokens_per_paper * (len(batch) + 1) > self.max_output_tokens):
+                yield batch
+                batch = []
+                batch_chars = self.prompt_overhead_chars
+        if batch:
+            yield batch
@@ -1,68 +1,93 @@
-import os
-import sys
 import argparse
-import json
-from datetime import datetime
-from .arxiv_client import ArxivClient
-from .paper_summarizer import PaperSummarizer
-from config.settings import SEARCH_CONFIG, CATEGORIES, QUERY, LLM_CONFIG, OUTPUT_DIR, LAST_RUN_FILE
+import sys
+from .pipeline import Pipeline
+from .profiles import load_profiles
+from config.settings import (
+    SEARCH_CONFIG, CATEGORIES, QUERY, PROFILES, LLM_CONFIG, RELEVANCE_CONFIG, DEDUP_CONFIG, PIPELINE_CONFIG, OUTPUT_DIR,
+    STATE_DIR
+)
 
 def main():
     parser = argparse.ArgumentParser(description='ArXiv论文摘要生成工具')
     parser.add_argument('--query', type=str, default=QUERY, help='搜索关键词')
     parser.add_argument('--categories', nargs='+', default=CATEGORIES, help='arXiv分类')
+    parser.add_argument('--profiles', nargs='*', default=None,
+                        help='只运行这些主题（默认为 PROFILES 中的所有主题）；配置了主题时 --query 和 --categories 不生效，'
+                             '不带参数时不使用主题')
     parser.add_argument('--max-results', type=int, default=SEARCH_CONFIG['max_total_results'], help='获取论文数量')
-    parser.add_argument('--output-dir', type=str, default=OUTPUT_DIR, help='输出目录')
+    parser.add_argument('--output-dir', type=str, default=OUTPUT_DIR, help='输出目录（报告和网站页面）')
+    parser.add_argument('--state-dir', type=str, default=STATE_DIR,
+                        help='状态目录（已见论文、近似重复索引、摘要缓存、运行记录等），不随网站发布')
+    parser.add_argument('--model', type=str, default=LLM_CONFIG['model'], help='主模型')
+    parser.add_argument('--fallback-models', nargs='*', default=LLM_CONFIG.get('fallback_models', []),
+                        help='备用模型，主模型限流、出错、响应过慢或批次超出其输入预算时依次改用')
+    parser.add_argument('--date-window', action='store_true', default=SEARCH_CONFIG.get('date_window', False),
+                        help='按提交时间窗口增量检索（从上次成功运行的时间到现在）')
+    
+    parser.add_argument('--cache-dir', type=str, default=SEARCH_CONFIG.get('cache_dir'),
+                        help='arXiv API 响应缓存目录')
+    parser.add_argument('--offline', action='store_true', help='离线回放模式，只使用缓存的 arXiv 响应')
+    parser.add_argument('--min-score', type=float, default=RELEVANCE_CONFIG.get('min_score', 0.0),
+                        help='相关性得分阈值，低于该得分的论文不生成摘要')
+    parser.add_argument('--top-n', type=int, default=RELEVANCE_CONFIG.get('top_n'),
+                        help='最多为得分最高的N篇论文生成摘要')
+    parser.add_argument('--no-relevance', action='store_true', help='不进行本地相关性评分，所有论文都生成摘要')
+    parser.add_argument('--no-dedup', action='store_true', help='不进行近似重复检测')
+    parser.add_argument('--no-summary-cache', action='store_true', help='不使用摘要缓存，所有论文都重新生成摘要')
+    parser.add_argument('--clear-summary-cache', action='store_true', help='运行前清空摘要缓存')
+    parser.add_argument('--resume', action='store_true',
+                        help='从上次中断运行的日志恢复：跳过已完成的论文，只为剩余论文生成摘要并补全报告')
+    parser.add_argument('--update-site', action='store_true', default=PIPELINE_CONFIG.get('update_site', False),
+                        help='报告生成后更新网站（清理旧文件、更新首页和归档页面），无需再单独运行 arxivsite')
+    parser.add_argument('--site-days', type=int, default=PIPELINE_CONFIG.get('site_days', 30),
+                        help='更新网站时摘要文件的保留天数')
+    parser.add_argument('--github-dir', type=str, default=PIPELINE_CONFIG.get('github_dir', './.github'),
+                        help='网站配置文件目录')
     
     args = parser.parse_args()
     
     # 更新配置
     SEARCH_CONFIG['max_total_results'] = args.max_results
+    LLM_CONFIG['model'] = args.model
+    LLM_CONFIG['fallback_models'] = args.fallback_models
+    SEARCH_CONFIG['cache_dir'] = args.cache_dir
+    if args.offline:
+        if not args.cache_dir:
+            parser.error("--offline 需要同时指定 --cache-dir")
+        SEARCH_CONFIG['cache_mode'] = 'offline'
+    RELEVANCE_CONFIG['min_score'] = args.min_score
+    RELEVANCE_CONFIG['top_n'] = args.top_n
+    if args.no_relevance:
+        RELEVANCE_CONFIG['enabled'] = False
+    if args.no_dedup:
+        DEDUP_CONFIG['enabled'] = False
     
-    # 初始化客户端
-    arxiv_client = ArxivClient(SEARCH_CONFIG)
-    paper_summarizer = PaperSummarizer(LLM_CONFIG['api_key'], LLM_CONFIG.get('model'))
+    PIPELINE_CONFIG['update_site'] = args.update_site
+    PIPELINE_CONFIG['site_days'] = args.site_days
+    PIPELINE_CONFIG['github_dir'] = args.github_dir
     
-    # 准备 last_run_file 路径
-    last_run_file = os.path.join(args.output_dir, LAST_RUN_FILE)
+    try:
+        profiles = load_profiles(PROFILES, args.profiles)
+    except ValueError as e:
+        parser.error(str(e))
+    if profiles:
+        print(f"主题: {', '.join(profile.name for profile in profiles)}，检索所有主题的并集")
     
-    # 获取论文
-    papers = arxiv_client.search_papers(
-        categories=args.categories, 
+    # 检索、过滤、摘要生成、报告写入和网站更新由流水线编排
+    pipeline = Pipeline(
+        output_dir=args.output_dir,
+        state_dir=args.state_dir,
         query=args.query,
-        last_run_file=last_run_file
+        categories=args.categories,
+        date_window=args.date_window,
+        resume=args.resume,
+        use_summary_cache=not args.no_summary_cache,
+        clear_summary_cache=args.clear_summary_cache,
+        profiles=profiles,
     )
-    if not papers:
-        print("未找到符合条件的论文")
-        return
-    
-    # 记录最新文章ID用于在摘要成功后保存
-    latest_entry_id = papers[0]['entry_id'] if papers else None
-    
-    # 生成摘要
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    output_file = os.path.join(args.output_dir, f"summary_{timestamp}.md")
-    
-    # 创建输出目录
-    os.makedirs(args.output_dir, exist_ok=True)
-    
-    # 生成摘要并保存
-    try:
-        success = paper_summarizer.summarize_papers(papers, output_file)
-        if success:
-            print(f"摘要已成功生成并保存到: {output_file}")
-        else:
-            print(f"摘要生成过程中出现错误，结果可能不完整: {output_file}")
-    except Exception as e:
-        print(f"生成摘要时发生错误: {e}")
-        success = False
-    
-    # 只有在摘要成功生成后才保存最新文章ID
-    if success and latest_entry_id and last_run_file:
-        arxiv_client.save_last_run_info(latest_entry_id, last_run_file, len(papers))
-        print(f"摘要成功生成，已更新运行记录。下次运行将从最新文章 ID 开始: {latest_entry_id}")
-    else:
-        print("由于摘要生成不完整或失败，未更新运行记录，下次运行将继续尝试获取这些论文。")
+    # 摘要生成或检索不完整时以非零状态退出，便于定时任务发现失败
+    if not pipeline.run():
+        sys.exit(1)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -0,0 +1,229 @@
+"""
+近似重复检测模块 - 基于 MinHash/LSH 的持久化索引，检测跨运行的重复论文
+
+交叉列出、重新提交或标题略有修改的论文会以新的 arXiv ID 出现；
+对标题和摘要的归一化文本计算 MinHash 签名，按 LSH 分桶保存在SQLite中，
+新论文只需与同桶的候选论文比较，查询开销与历史论文数量无关。
+"""
+import hashlib
+import random
+import re
+import sqlite3
+import struct
+import threading
+from datetime import datetime
+from typing import List, Dict, Any, Callable, Iterable, Iterator, NamedTuple, Optional, Sequence, Tuple
+
+from src.paper_store import split_arxiv_id
+
+# 梅森素数 2^61-1，作为 MinHash 哈希函数族 (a*x + b) mod p 的模数
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 64) - 1
+
+# SQLite 单条语句中参数数量有上限，批量查询时分块执行
+_QUERY_CHUNK_SIZE = 500
+
+
+class Duplicate(NamedTuple):
+    """与新论文近似重复的历史论文"""
+    arxiv_id: str
+    entry_id: str
+    title: str
+    report: Optional[str]
+    similarity: float
+
+
+def normalize_text(text: str) -> str:
+    """转换为小写，去掉LaTeX命令和标点，合并空白"""
+    text = re.sub(r'\\[a-zA-Z]+', ' ', (text or "").lower())
+    return " ".join(re.sub(r'[^0-9a-z]+', ' ', text).split())
+
+
+def _hash64(data: str) -> int:
+    """确定性的64位哈希，不受 PYTHONHASHSEED 影响，跨运行保持一致"""
+    return int.from_bytes(hashlib.blake2b(data.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def optimal_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """选择 LSH 分段数和每段行数，使候选阈值 (1/b)^(1/r) 最接近相似度阈值"""
+    candidates = [(b, num_perm // b) for b in range(1, num_perm + 1) if num_perm % b == 0]
+    return min(candidates, key=lambda br: abs((1 / br[0]) ** (1 / br[1]) - threshold))
+
+
+class MinHasher:
+    """计算文本词级 shingle 集合的 MinHash 签名"""
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 3, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = random.Random(seed)
+        self._perms = [(rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+                       for _ in range(num_perm)]
+
+    def shingles(self, text: str) -> set:
+        words = normalize_text(text).split()
+        k = self.shingle_size
+        if len(words) <= k:
+            return {_hash64(" ".join(words))} if words else set()
+        return {_hash64(" ".join(words[i:i + k])) for i in range(len(words) - k + 1)}
+
+    def signature(self, text: str) -> Tuple[int, ...]:
+        shingles = self.shingles(text)
+        if not shingles:
+            return (_MAX_HASH,) * self.num_perm
+        p = _MERSENNE_PRIME
+        return tuple(min((a * x + b) % p for x in shingles) for a, b in self._perms)
+
+
+def paper_text(paper: Dict[str, Any]) -> str:
+    """参与去重比较的文本：标题和摘要"""
+    return f"{paper.get('title') or ''} {paper.get('summary') or ''}"
+
+
+class DedupIndex:
+    """
+    持久化的 MinHash/LSH 近似重复索引
+
+    签名按 bands 段切分，每段哈希为一个桶键；两篇论文只要有一段完全相同即成为候选，
+    再用完整签名估计 Jaccard 相似度，不低于 threshold 的视为重复。
+    """
+
+    def __init__(self, db_path: str, threshold: float = 0.7, num_perm: int = 128,
+                 shingle_size: int = 3, seed: int = 1):
+        self.db_path = str(db_path)
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm, shingle_size, seed)
+        self.bands, self.rows = optimal_bands(num_perm, threshold)
+        self._packer = struct.Struct(f'<{num_perm}Q')
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS signatures (
+                arxiv_id TEXT PRIMARY KEY,
+                entry_id TEXT,
+                title TEXT,
+                report TEXT,
+                added_at TEXT,
+                signature BLOB
+            );
+            CREATE TABLE IF NOT EXISTS buckets (
+                bucket INTEGER,
+                arxiv_id TEXT,
+                PRIMARY KEY (bucket, arxiv_id)
+            ) WITHOUT ROWID;
+        """)
+        self._conn.commit()
+        # 已处理的重复论文及其匹配到的历史论文
+        self.duplicates: List[Tuple[Dict[str, Any], Duplicate]] = []
+
+    @classmethod
+    def from_config(cls, db_path: str, config: Dict[str, Any]) -> 'DedupIndex':
+        """根据 DEDUP_CONFIG 创建索引"""
+        return cls(
+            db_path,
+            threshold=config.get('threshold', 0.7),
+            num_perm=config.get('num_perm', 128),
+            shingle_size=config.get('shingle_size', 3),
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM signatures").fetchone()[0]
+
+    def _bucket_keys(self, signature: Sequence[int]) -> List[int]:
+        """每段签名哈希为一个有符号64位整数（SQLite INTEGER 范围）"""
+        keys = []
+        for band in range(self.bands):
+            chunk = signature[band * self.rows:(band + 1) * self.rows]
+            digest = hashlib.blake2b(struct.pack(f'<I{self.rows}Q', band, *chunk), digest_size=8).digest()
+            keys.append(int.from_bytes(digest, 'little', signed=True))
+        return keys
+
+    def _similarity(self, a: Sequence[int], b: Sequence[int]) -> float:
+        return sum(x == y for x, y in zip(a, b)) / len(a)
+
+    def query(self, paper: Dict[str, Any]) -> Optional[Duplicate]:
+        """查找与论文最相似的历史论文，相似度低于阈值时返回None（同一arXiv ID的其他版本不算重复）"""
+        arxiv_id = split_arxiv_id(paper['entry_id'])[0]
+        signature = self.hasher.signature(paper_text(paper))
+        keys = self._bucket_keys(signature)
+        placeholders = ",".join("?" * len(keys))
+        with self._lock:
+            rows = self._conn.execute(f"""
+                SELECT arxiv_id, entry_id, title, report, signature FROM signatures
+                WHERE arxiv_id IN (SELECT DISTINCT arxiv_id FROM buckets WHERE bucket IN ({placeholders}))
+                  AND arxiv_id != ?
+            """, (*keys, arxiv_id)).fetchall()
+
+        best = None
+        for other_id, entry_id, title, report, blob in rows:
+            similarity = self._similarity(signature, self._packer.unpack(blob))
+            if similarity >= self.threshold and (best is None or similarity > best.similarity):
+                best = Duplicate(other_id, entry_id, title, report, round(similarity, 3))
+        return best
+
+    def filter(self, papers: Iterable[Dict[str, Any]],
+               rejected: Optional[Callable[[Dict[str, Any]], None]] = None) -> Iterator[Dict[str, Any]]:
+        """流式过滤：产出非重复论文，重复论文及其匹配结果记录在 duplicates 中，并传给 rejected（如果给出）"""
+        for paper in papers:
+            match = self.query(paper)
+            if match is None:
+                yield paper
+            else:
+                self.duplicates.append((paper, match))
+                if rejected is not None:
+                    rejected(paper)
+
+    def add(self, papers: Iterable[Dict[str, Any]], report: Optional[str] = None) -> int:
+        """将论文加入索引，report 为包含其摘要的报告文件；已存在的论文更新签名和报告"""
+        now = datetime.now().isoformat()
+        rows, buckets = [], []
+        for paper in papers:
+            arxiv_id = split_arxiv_id(paper['entry_id'])[0]
+            signature = self.hasher.signature(paper_text(paper))
+            rows.append((arxiv_id, paper['entry_id'], paper.get('title'), report, now,
+                         self._packer.pack(*signature)))
+            buckets.extend((key, arxiv_id) for key in self._bucket_keys(signature))
+        if not rows:
+            return 0
+        with self._lock:
+            ids = [row[0] for row in rows]
+            for i in range(0, len(ids), _QUERY_CHUNK_SIZE):
+                chunk = ids[i:i + _QUERY_CHUNK_SIZE]
+                self._conn.execute(
+                    f"DELETE FROM buckets WHERE arxiv_id IN ({','.join('?' * len(chunk))})", chunk)
+            self._conn.executemany("""
+                INSERT INTO signatures (arxiv_id, entry_id, title, report, added_at, signature)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(arxiv_id) DO UPDATE SET
+                    entry_id = excluded.entry_id,
+                    title = excluded.title,
+                    report = COALESCE(excluded.report, report),
+                    added_at = excluded.added_at,
+                    signature = excluded.signature
+            """, rows)
+            self._conn.executemany("INSERT OR IGNORE INTO buckets (bucket, arxiv_id) VALUES (?, ?)", buckets)
+            self._conn.commit()
+        return len(rows)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def format_duplicates_section(duplicates: List[Tuple[Dict[str, Any], Duplicate]]) -> str:
+    """生成报告中的重复论文章节，将重复论文链接到此前的摘要"""
+    lines = ["## 疑似重复论文", "",
+             "以下论文与此前已总结的论文高度相似，未重复生成摘要：", ""]
+    for paper, match in duplicates:
+        previous = f"[{match.title}]({match.entry_id})"
+        if match.report:
+            previous += f"（见 {match.report}）"
+        lines.append(f"- [{paper.get('title')}]({paper['entry_id']}) → {previous}，相似度 {match.similarity:.2f}")
+    return "\n".join(lines) + "\n"
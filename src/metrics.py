@@ -0,0 +1,152 @@
+"""
+运行指标模块 - 记录一次运行中各阶段的耗时、模型调用延迟、token 用量、重试和缓存命中
+
+RunMetrics 由 cli 创建，注入 ArxivClient、PaperSummarizer（及其 ModelClient）和 SiteManager，
+运行结束后在摘要报告旁写入JSON指标文件，也可以写为 Prometheus 文本格式
+（例如供 node_exporter 的 textfile collector 采集），用于长期跟踪成本和吞吐量。
+"""
+import json
+import math
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Mapping, Union
+
+# usageMetadata 字段与 token 计数器的对应关系
+USAGE_COUNTERS = {
+    'promptTokenCount': 'llm.prompt_tokens',
+    'candidatesTokenCount': 'llm.output_tokens',
+    'thoughtsTokenCount': 'llm.thought_tokens',
+    'cachedContentTokenCount': 'llm.cached_tokens',
+}
+
+# Prometheus 指标名前缀
+PROMETHEUS_PREFIX = "arxivsummary"
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    """最近秩法计算分位数，ordered 已排序"""
+    if not ordered:
+        return 0.0
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def _prometheus_name(name: str) -> str:
+    return f"{PROMETHEUS_PREFIX}_{re.sub(r'[^a-zA-Z0-9_]', '_', name)}"
+
+
+def _prometheus_label(value: Any) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class RunMetrics:
+    """
+    线程安全的运行指标
+
+    - 阶段耗时: stage(name) 上下文管理器累计各阶段的墙钟时间（秒）
+    - 计数器: incr(name, value)，例如请求数、重试次数、token 数、缓存命中数
+    - 延迟: observe(name, seconds) 记录每次调用的耗时，输出次数、总和、p50/p95 和最大值
+    - 运行信息: set_info(**info) 记录模型、报告路径等标签
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started_at = datetime.now(timezone.utc)
+        self.stages: Dict[str, float] = {}
+        self.counters: Counter = Counter()
+        self.latencies: Dict[str, List[float]] = {}
+        self.info: Dict[str, Any] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """累计代码块的墙钟时间，同名阶段多次进入时耗时相加"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def add_time(self, name: str, seconds: float):
+        with self._lock:
+            self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def incr(self, name: str, value: Union[int, float] = 1):
+        with self._lock:
+            self.counters[name] += value
+
+    def observe(self, name: str, seconds: float):
+        with self._lock:
+            self.latencies.setdefault(name, []).append(seconds)
+
+    def record_usage(self, usage: Mapping[str, Any]):
+        """累计一次模型响应 usageMetadata 中的 token 数"""
+        with self._lock:
+            for field, counter in USAGE_COUNTERS.items():
+                if usage.get(field):
+                    self.counters[counter] += usage[field]
+
+    def set_info(self, **info):
+        with self._lock:
+            self.info.update(info)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            latencies = {}
+            for name, values in self.latencies.items():
+                ordered = sorted(values)
+                latencies[name] = {
+                    'count': len(ordered),
+                    'sum': sum(ordered),
+                    'p50': _percentile(ordered, 50),
+                    'p95': _percentile(ordered, 95),
+                    'max': ordered[-1] if ordered else 0.0,
+                }
+            return {
+                'started_at': self.started_at.isoformat(),
+                'info': dict(self.info),
+                'stages': dict(self.stages),
+                'counters': dict(sorted(self.counters.items())),
+                'latencies': latencies,
+            }
+
+    def write_json(self, path: Union[str, Path]):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+    def to_prometheus(self) -> str:
+        """Prometheus 文本格式：阶段耗时为 gauge，计数器为 counter，延迟为 summary"""
+        data = self.to_dict()
+        lines = []
+        if data['info']:
+            labels = ",".join(f'{key}="{_prometheus_label(value)}"' for key, value in sorted(data['info'].items()))
+            lines += [f"# TYPE {_prometheus_name('run_info')} gauge", f"{_prometheus_name('run_info')}{{{labels}}} 1"]
+        lines += [f"# TYPE {_prometheus_name('run_start_time_seconds')} gauge",
+                  f"{_prometheus_name('run_start_time_seconds')} {self.started_at.timestamp():.3f}"]
+        if data['stages']:
+            name = _prometheus_name('stage_seconds')
+            lines.append(f"# TYPE {name} gauge")
+            lines += [f'{name}{{stage="{_prometheus_label(stage)}"}} {seconds:.6f}'
+                      for stage, seconds in sorted(data['stages'].items())]
+        for counter, value in data['counters'].items():
+            name = _prometheus_name(counter) + "_total"
+            lines += [f"# TYPE {name} counter", f"{name} {value}"]
+        for latency, summary in sorted(data['latencies'].items()):
+            name = _prometheus_name(latency) + "_seconds"
+            lines += [f"# TYPE {name} summary",
+                      f'{name}{{quantile="0.5"}} {summary["p50"]:.6f}',
+                      f'{name}{{quantile="0.95"}} {summary["p95"]:.6f}',
+                      f"{name}_sum {summary['sum']:.6f}",
+                      f"{name}_count {summary['count']}"]
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: Union[str, Path]):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus())
@@ -0,0 +1,310 @@
+"""
+OAI-PMH 批量收割模块 - 用于回填历史论文元数据
+
+通过 arXiv OAI-PMH 接口的 ListRecords 按集合和日期范围批量获取论文，
+逐页流式解析为与检索接口相同格式的 PaperRecord，并在每页之后保存 resumptionToken 检查点，
+中断后可以从上次的位置继续收割。示例:
+    python -m src.oai_harvester --from 2024-01-01 --until 2024-06-30 --categories cs.NE q-bio.NC
+"""
+import argparse
+import json
+import os
+import time
+import xml.etree.ElementTree as ET
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+
+import requests
+
+from src.rate_limit import IntervalRateLimiter, ThrottledSession
+from src.records import PaperRecord, JsonlWriter
+
+OAI = '{http://www.openarchives.org/OAI/2.0/}'
+ARXIV_OAI = '{http://arxiv.org/OAI/arXiv/}'
+
+# 属于 physics 集合的 arXiv 大类，其余大类（cs、math、q-bio 等）各自是顶层集合
+PHYSICS_ARCHIVES = {
+    'astro-ph', 'cond-mat', 'gr-qc', 'hep-ex', 'hep-lat', 'hep-ph', 'hep-th',
+    'math-ph', 'nlin', 'nucl-ex', 'nucl-th', 'physics', 'quant-ph',
+}
+
+
+class OAIError(Exception):
+    """OAI-PMH 接口返回的协议错误"""
+
+    def __init__(self, code: str, message: str = ""):
+        super().__init__(f"{code}: {message}" if message else code)
+        self.code = code
+
+
+def category_to_set(category: str) -> str:
+    """将 arXiv 分类转换为 OAI-PMH 集合名称，例如 cs.NE -> cs，hep-th -> physics:hep-th"""
+    archive = category.split('.', 1)[0]
+    if archive in PHYSICS_ARCHIVES:
+        return f"physics:{archive}"
+    return archive
+
+
+def _text(elem: ET.Element, tag: str) -> Optional[str]:
+    value = elem.findtext(ARXIV_OAI + tag)
+    return " ".join(value.split()) if value else None
+
+
+def parse_record(metadata: ET.Element) -> Optional[PaperRecord]:
+    """将 arXiv 元数据格式的 <arXiv> 元素转换为论文记录"""
+    arxiv_id = (metadata.findtext(ARXIV_OAI + 'id') or "").strip()
+    if not arxiv_id:
+        return None
+    authors = []
+    for author in metadata.iter(ARXIV_OAI + 'author'):
+        parts = [author.findtext(ARXIV_OAI + tag) for tag in ('forenames', 'keyname', 'suffix')]
+        authors.append(" ".join(part.strip() for part in parts if part and part.strip()))
+    categories = (metadata.findtext(ARXIV_OAI + 'categories') or "").split()
+    created = (metadata.findtext(ARXIV_OAI + 'created') or "").strip()
+    updated = (metadata.findtext(ARXIV_OAI + 'updated') or "").strip() or created
+    abs_url = f"http://arxiv.org/abs/{arxiv_id}"
+    pdf_url = f"http://arxiv.org/pdf/{arxiv_id}"
+    return PaperRecord(
+        title=_text(metadata, 'title') or "",
+        authors=authors,
+        # OAI-PMH 只提供日期，补全为与检索接口一致的 ISO 时间格式
+        published=f"{created}T00:00:00+00:00" if created else "",
+        updated=f"{updated}T00:00:00+00:00" if updated else "",
+        summary=(metadata.findtext(ARXIV_OAI + 'abstract') or "").strip(),
+        doi=_text(metadata, 'doi'),
+        primary_category=categories[0] if categories else "",
+        categories=categories,
+        links=[abs_url, pdf_url],
+        pdf_url=pdf_url,
+        entry_id=abs_url,
+        comment=_text(metadata, 'comments'),
+    )
+
+
+class ListRecordsParser:
+    """
+    增量解析一页 ListRecords 响应
+
+    反复调用 feed() 传入响应数据块，每次返回本块中解析完成的论文记录；
+    已删除的记录被跳过，resumption_token / complete_list_size / error 在解析到对应元素后可用。
+    """
+
+    def __init__(self):
+        self._parser = ET.XMLPullParser(events=('end',))
+        self.resumption_token: Optional[str] = None
+        self.complete_list_size: Optional[int] = None
+        self.error: Optional[OAIError] = None
+
+    def _drain(self) -> List[PaperRecord]:
+        records = []
+        for _, elem in self._parser.read_events():
+            tag = elem.tag
+            if tag == OAI + 'record':
+                header = elem.find(OAI + 'header')
+                metadata = elem.find(f'{OAI}metadata/{ARXIV_OAI}arXiv')
+                if (header is None or header.get('status') != 'deleted') and metadata is not None:
+                    record = parse_record(metadata)
+                    if record is not None:
+                        records.append(record)
+                elem.clear()
+            elif tag == OAI + 'resumptionToken':
+                self.resumption_token = (elem.text or "").strip() or None
+                size = elem.get('completeListSize')
+                self.complete_list_size = int(size) if size and size.isdigit() else None
+            elif tag == OAI + 'error':
+                self.error = OAIError(elem.get('code', 'unknown'), (elem.text or "").strip())
+        return records
+
+    def feed(self, data: bytes) -> List[PaperRecord]:
+        self._parser.feed(data)
+        return self._drain()
+
+    def close(self) -> List[PaperRecord]:
+        self._parser.close()
+        return self._drain()
+
+
+class OAIHarvester:
+    """
+    arXiv OAI-PMH 收割客户端
+
+    每个集合依次请求 ListRecords，跟随 resumptionToken 翻页直到列表结束；
+    所有请求共享最小间隔限速，503 响应按 Retry-After 等待后重试。
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None, session=None):
+        if config is None:
+            from config.settings import HARVEST_CONFIG
+            config = HARVEST_CONFIG
+        self.config = config
+        limiter = IntervalRateLimiter(config.get('delay_seconds', 3.0))
+        self.session = ThrottledSession(session or requests.Session(), limiter)
+
+    def _retry_after(self, response) -> float:
+        """解析 Retry-After 秒数，缺失或为日期格式时使用默认间隔"""
+        value = (response.headers.get('Retry-After') or "").strip()
+        delay = float(value) if value.isdigit() else self.config.get('delay_seconds', 3.0)
+        return min(delay, self.config.get('max_retry_after', 600))
+
+    def _fetch_page(self, params: Dict[str, str]) -> Tuple[List[PaperRecord], Optional[str], Optional[int]]:
+        """
+        请求并增量解析一页 ListRecords 响应
+
+        Returns:
+            (本页论文记录, 下一页的 resumptionToken（最后一页为None）, 记录总数)
+        """
+        num_retries = self.config.get('num_retries', 5)
+        for attempt in range(num_retries + 1):
+            try:
+                response = self.session.get(self.config['base_url'], params=params, stream=True,
+                                            timeout=self.config.get('timeout', 60))
+                if response.status_code == 503:
+                    delay = self._retry_after(response)
+                    response.close()
+                    if attempt >= num_retries:
+                        raise requests.HTTPError(f"HTTP错误 503，重试次数已用完: {params}")
+                    print(f"服务器繁忙，{delay:.0f} 秒后重试({attempt + 1}/{num_retries})")
+                    time.sleep(delay)
+                    continue
+                if response.status_code != 200:
+                    response.close()
+                    raise requests.HTTPError(f"HTTP错误 {response.status_code}: {params}")
+                parser = ListRecordsParser()
+                records = []
+                for chunk in response.iter_content(chunk_size=65536):
+                    records.extend(parser.feed(chunk))
+                records.extend(parser.close())
+                response.close()
+                if parser.error is not None:
+                    raise parser.error
+                return records, parser.resumption_token, parser.complete_list_size
+            except (requests.ConnectionError, requests.Timeout, ET.ParseError) as e:
+                if attempt >= num_retries:
+                    raise
+                print(f"获取页面失败，正在重试({attempt + 1}/{num_retries}): {e}")
+                time.sleep(self.config.get('delay_seconds', 3.0))
+
+    def _load_checkpoint(self, checkpoint_file: Optional[str], job: Dict[str, Any]) -> Dict[str, Any]:
+        """读取与本次任务参数一致的检查点，没有或参数不同时从头开始"""
+        state = dict(job, set_index=0, resumption_token=None, harvested=0)
+        if not checkpoint_file or not os.path.exists(checkpoint_file):
+            return state
+        try:
+            with open(checkpoint_file, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"读取收割检查点失败，将从头开始: {e}")
+            return state
+        if all(saved.get(key) == value for key, value in job.items()):
+            print(f"从检查点继续收割: 集合 {saved['sets'][saved['set_index']]}，已收割 {saved.get('harvested', 0)} 篇")
+            state.update(saved)
+        else:
+            print("检查点与本次收割参数不一致，将从头开始")
+        return state
+
+    def _save_checkpoint(self, checkpoint_file: Optional[str], state: Dict[str, Any]):
+        if not checkpoint_file:
+            return
+        tmp_file = f"{checkpoint_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_file, checkpoint_file)
+
+    def iter_pages(self, categories: List[str], from_date: Optional[str] = None,
+                   until_date: Optional[str] = None,
+                   checkpoint_file: Optional[str] = None) -> Iterator[List[PaperRecord]]:
+        """
+        按分类和日期范围（YYYY-MM-DD，按记录的最后修改日期）逐页产出论文记录
+
+        集合粒度为 arXiv 大类，记录在本地按分类过滤。调用方取下一页时才保存上一页之后的检查点，
+        因此调用方应在取下一页之前持久化当前页；中断后重新调用时从检查点的集合和 resumptionToken 继续，
+        全部完成后删除检查点。
+        """
+        sets = list(dict.fromkeys(category_to_set(cat) for cat in categories))
+        wanted = set(categories)
+        job = {'sets': sets, 'categories': sorted(wanted), 'from': from_date, 'until': until_date}
+        state = self._load_checkpoint(checkpoint_file, job)
+
+        while state['set_index'] < len(sets):
+            set_spec = sets[state['set_index']]
+            token = state['resumption_token']
+            while True:
+                if token:
+                    params = {'verb': 'ListRecords', 'resumptionToken': token}
+                else:
+                    params = {'verb': 'ListRecords', 'metadataPrefix': self.config.get('metadata_prefix', 'arXiv'),
+                              'set': set_spec}
+                    if from_date:
+                        params['from'] = from_date
+                    if until_date:
+                        params['until'] = until_date
+                try:
+                    records, token, total = self._fetch_page(params)
+                except OAIError as e:
+                    if e.code == 'noRecordsMatch':
+                        records, token, total = [], None, 0
+                    elif e.code == 'badResumptionToken' and state['resumption_token']:
+                        # 检查点中的 resumptionToken 已过期，从该集合的开头重新收割
+                        print(f"resumptionToken 已失效，重新收割集合 {set_spec}")
+                        state['resumption_token'] = token = None
+                        continue
+                    else:
+                        raise
+
+                page = [record for record in records
+                        if set_spec in wanted or wanted.intersection(record['categories'])]
+                if page:
+                    state['harvested'] += len(page)
+                    yield page
+
+                state['resumption_token'] = token
+                self._save_checkpoint(checkpoint_file, state)
+                if not token:
+                    break
+                if total:
+                    print(f"集合 {set_spec}: 已收割 {state['harvested']} 篇（该集合共 {total} 条记录）")
+
+            state['set_index'] += 1
+            state['resumption_token'] = None
+            self._save_checkpoint(checkpoint_file, state)
+
+        if checkpoint_file and os.path.exists(checkpoint_file):
+            os.remove(checkpoint_file)
+        print(f"收割完成，共 {state['harvested']} 篇论文")
+
+    def iter_records(self, categories: List[str], from_date: Optional[str] = None,
+                     until_date: Optional[str] = None,
+                     checkpoint_file: Optional[str] = None) -> Iterator[PaperRecord]:
+        """逐篇产出论文记录，参数同 iter_pages"""
+        for page in self.iter_pages(categories, from_date, until_date, checkpoint_file):
+            yield from page
+
+
+def main():
+    from config.settings import CATEGORIES, HARVEST_CONFIG, STATE_DIR
+
+    parser = argparse.ArgumentParser(description='arXiv OAI-PMH 历史元数据收割工具')
+    parser.add_argument('--categories', nargs='+', default=CATEGORIES, help='arXiv分类')
+    parser.add_argument('--from', dest='from_date', type=str, help='起始日期 (YYYY-MM-DD)')
+    parser.add_argument('--until', dest='until_date', type=str, help='结束日期 (YYYY-MM-DD)')
+    parser.add_argument('--output', type=str, default=os.path.join(STATE_DIR, HARVEST_CONFIG['output_file']),
+                        help='输出的JSONL文件（.gz结尾时压缩）')
+    parser.add_argument('--checkpoint', type=str,
+                        default=os.path.join(STATE_DIR, HARVEST_CONFIG['checkpoint_file']),
+                        help='收割检查点文件，中断后使用相同参数重新运行即可继续')
+    parser.add_argument('--base-url', type=str, default=HARVEST_CONFIG['base_url'], help='OAI-PMH 接口地址')
+    args = parser.parse_args()
+
+    config = dict(HARVEST_CONFIG, base_url=args.base_url)
+    harvester = OAIHarvester(config)
+    os.makedirs(os.path.dirname(args.checkpoint) or ".", exist_ok=True)
+    with JsonlWriter(args.output) as writer:
+        # 每页写入并刷新到磁盘后才请求下一页，检查点不会超前于已保存的数据
+        for page in harvester.iter_pages(args.categories, args.from_date, args.until_date,
+                                         checkpoint_file=args.checkpoint):
+            writer.write_many(page)
+            writer.flush()
+    print(f"元数据已保存到: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+"""
+论文记录存储模块 - 使用SQLite持久化记录所有见过和已总结的论文
+"""
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+
+# 匹配 http://arxiv.org/abs/2401.12345v2 或 http://arxiv.org/abs/hep-th/9901001v1 等形式
+ENTRY_ID_PATTERN = re.compile(r'(?:abs|pdf)/(.+?)(?:v(\d+))?(?:\.pdf)?/?$')
+
+# SQLite 单条语句中参数数量有上限，批量查询时分块执行
+LOOKUP_CHUNK_SIZE = 500
+
+
+def split_arxiv_id(entry_id: str) -> Tuple[str, Optional[int]]:
+    """
+    将 arXiv 链接或ID拆分为不带版本号的ID和版本号
+
+    Returns:
+        (不带版本号的arXiv ID, 版本号；没有版本号时为None)
+    """
+    entry_id = entry_id.strip()
+    match = ENTRY_ID_PATTERN.search(entry_id)
+    if match:
+        base_id, version = match.group(1), match.group(2)
+    else:
+        bare = re.match(r'(.+?)(?:v(\d+))?$', entry_id)
+        base_id, version = bare.group(1), bare.group(2)
+    return base_id, int(version) if version else None
+
+
+class PaperStore:
+    """
+    已见论文存储，以不带版本号的 arXiv ID 为主键
+
+    启动时将已见和已总结的ID载入内存集合，检索过程中的成员判断为 O(1)；
+    写入时同步更新SQLite文件，支持跨运行持久化。
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = str(db_path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS papers (
+                arxiv_id TEXT PRIMARY KEY,
+                version INTEGER,
+                entry_id TEXT,
+                title TEXT,
+                published TEXT,
+                first_seen TEXT,
+                last_seen TEXT,
+                summarized_at TEXT,
+                summarized_version INTEGER,
+                rejected_at TEXT,
+                rejected_reason TEXT
+            )
+        """)
+        # 旧版本创建的数据库没有被过滤记录的列
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(papers)")}
+        for column in ('rejected_at', 'rejected_reason'):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE papers ADD COLUMN {column} TEXT")
+        self._conn.commit()
+        self._seen = set()
+        self._summarized = set()
+        self._rejected = set()
+        for arxiv_id, summarized_at, rejected_at in self._conn.execute(
+                "SELECT arxiv_id, summarized_at, rejected_at FROM papers"):
+            self._seen.add(arxiv_id)
+            if summarized_at:
+                self._summarized.add(arxiv_id)
+            elif rejected_at:
+                self._rejected.add(arxiv_id)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    def __contains__(self, entry_id: str) -> bool:
+        return split_arxiv_id(entry_id)[0] in self._seen
+
+    def is_summarized(self, entry_id: str) -> bool:
+        """判断论文（任意版本）是否已经生成过摘要"""
+        return split_arxiv_id(entry_id)[0] in self._summarized
+
+    def is_rejected(self, entry_id: str) -> bool:
+        """判断论文是否被过滤（重复或未达到相关性阈值）且尚未生成过摘要"""
+        return split_arxiv_id(entry_id)[0] in self._rejected
+
+    def lookup(self, entry_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """批量查询论文记录，返回以不带版本号的ID为键的字典"""
+        arxiv_ids = list({split_arxiv_id(entry_id)[0] for entry_id in entry_ids})
+        records = {}
+        with self._lock:
+            for i in range(0, len(arxiv_ids), LOOKUP_CHUNK_SIZE):
+                chunk = arxiv_ids[i:i + LOOKUP_CHUNK_SIZE]
+                placeholders = ",".join("?" * len(chunk))
+                cursor = self._conn.execute(
+                    f"SELECT * FROM papers WHERE arxiv_id IN ({placeholders})", chunk)
+                columns = [column[0] for column in cursor.description]
+                for row in cursor:
+                    record = dict(zip(columns, row))
+                    records[record['arxiv_id']] = record
+        return records
+
+    def mark_seen(self, papers: List[Dict[str, Any]]):
+        """记录检索到的论文，已存在的记录更新最新版本号和最后见到时间"""
+        now = datetime.now().isoformat()
+        rows = []
+        for paper in papers:
+            arxiv_id, version = split_arxiv_id(paper['entry_id'])
+            rows.append((arxiv_id, version, paper['entry_id'], paper.get('title'),
+                         paper.get('published'), now, now))
+        with self._lock:
+            self._conn.executemany("""
+                INSERT INTO papers (arxiv_id, version, entry_id, title, published, first_seen, last_seen)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(arxiv_id) DO UPDATE SET
+                    version = NULLIF(MAX(COALESCE(version, 0), COALESCE(excluded.version, 0)), 0),
+                    entry_id = CASE WHEN COALESCE(excluded.version, 0) >= COALESCE(version, 0)
+                                    THEN excluded.entry_id ELSE entry_id END,
+                    title = excluded.title,
+                    last_seen = excluded.last_seen
+            """, rows)
+            self._conn.commit()
+            self._seen.update(row[0] for row in rows)
+
+    def mark_summarized(self, papers: List[Dict[str, Any]]):
+        """记录已成功生成摘要的论文及其版本"""
+        self.mark_seen(papers)
+        now = datetime.now().isoformat()
+        rows = []
+        for paper in papers:
+            arxiv_id, version = split_arxiv_id(paper['entry_id'])
+            rows.append((now, version, arxiv_id))
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE papers SET summarized_at = ?, summarized_version = ? WHERE arxiv_id = ?", rows)
+            self._conn.commit()
+            self._summarized.update(row[2] for row in rows)
+            self._rejected.difference_update(row[2] for row in rows)
+
+    def mark_rejected(self, papers: List[Dict[str, Any]], reason: str):
+        """
+        记录被过滤、没有生成摘要的论文及原因（'duplicate'、'relevance'、'profile'）
+
+        与已总结的论文不同，被过滤的论文下次检索时仍会产出并重新过滤，
+        相关性阈值、关键词或 top_n 修改后可以重新入选。
+        """
+        self.mark_seen(papers)
+        now = datetime.now().isoformat()
+        rows = [(now, reason, split_arxiv_id(paper['entry_id'])[0]) for paper in papers]
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE papers SET rejected_at = ?, rejected_reason = ? WHERE arxiv_id = ? AND summarized_at IS NULL",
+                rows)
+            self._conn.commit()
+            self._rejected.update(row[2] for row in rows if row[2] not in self._summarized)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
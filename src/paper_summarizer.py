@@ -4,40 +4,218 @@
 import os
 import re
 import json
-from typing import List, Dict, Any, Optional
+import gzip
+import hashlib
+import threading
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Tuple
 from pathlib import Path
 import requests
+from requests.adapters import HTTPAdapter
 import time
 from datetime import datetime
 import pytz
-from config.settings import LLM_CONFIG
+from config.settings import LLM_CONFIG, BATCH_CONFIG
+from src.rate_limit import IntervalRateLimiter, ThrottledSession, TokenBucketLimiter, retry_after_seconds
+from src.paper_store import split_arxiv_id
+from src.summary_cache import SummaryCache, summary_cache_key
+from src.batching import TokenEstimator, BatchPacker
+from src.run_journal import RunJournal
+from src.report_writer import ReportWriter, PAPER_COUNT_PLACEHOLDER, MODELS_PLACEHOLDER
+from src.metrics import RunMetrics
+from src.streaming import background_iter
+from src.prompts import PROMPT_VERSION, system_instruction, user_prompt, paper_block
+
+# 生成参数变化时缓存摘要同样失效
+GENERATION_CONFIG_KEYS = ('temperature', 'max_output_tokens', 'top_p', 'top_k')
+
+# 结构化输出模式（output_format='json'）要求模型返回的JSON Schema：每篇论文一个对象，
+# 只包含需要模型生成的内容，标题、链接、日期和作者由本地元数据渲染
+SUMMARY_RESPONSE_SCHEMA = {
+    "type": "ARRAY",
+    "items": {
+        "type": "OBJECT",
+        "properties": {
+            "id": {"type": "STRING", "description": "论文信息中给出的ID，原样填写"},
+            "purpose": {"type": "STRING", "description": "研究目的"},
+            "findings": {"type": "STRING", "description": "主要发现"},
+        },
+        "required": ["id", "purpose", "findings"],
+        "propertyOrdering": ["id", "purpose", "findings"],
+    },
+}
+
+# 表示触发配额限制或服务暂时过载的HTTP状态码
+RATE_LIMIT_STATUS = (429, 503)
+
+# 每个模型一个 RPM/TPM 限速器，同一模型的所有客户端和线程共享配额
+_rate_limiters: Dict[str, TokenBucketLimiter] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(model: str) -> TokenBucketLimiter:
+    """获取模型共享的限速器，配额来自 LLM_CONFIG['rate_limits']"""
+    with _rate_limiters_lock:
+        if model not in _rate_limiters:
+            limits = LLM_CONFIG.get('rate_limits', {}).get(model, {})
+            _rate_limiters[model] = TokenBucketLimiter(limits.get('rpm'), limits.get('tpm'))
+        return _rate_limiters[model]
+
+
+class RateLimitError(Exception):
+    """限流等待次数或服务器要求的等待时间超过上限"""
+
+
+# 启用模型路由时，摘要章节标题下记录生成该摘要的模型
+MODEL_TAG_PATTERN = re.compile(r'^<!-- model: (\S+) -->$', re.MULTILINE)
+
+
+class ModelRoute:
+    """
+    路由中的一个模型
+
+    max_input_tokens: 单次请求的输入 token 预算，超出时交给后面的模型，None表示不限
+    max_latency: 延迟阈值（秒），一次调用超过该值后暂时改用其他模型，None表示不限
+    """
+
+    def __init__(self, model: str, max_input_tokens: Optional[int] = None, max_latency: Optional[float] = None):
+        self.model = model
+        self.max_input_tokens = max_input_tokens
+        self.max_latency = max_latency
+        # 限流、服务器错误或响应过慢后，在该时刻（time.monotonic）之前跳过该模型
+        self.unavailable_until = 0.0
+
+    @classmethod
+    def from_config(cls, model: str) -> 'ModelRoute':
+        budget = LLM_CONFIG.get('model_budgets', {}).get(model, {})
+        return cls(model, budget.get('max_input_tokens'), budget.get('max_latency'))
+
+    def fits(self, tokens: float) -> bool:
+        return self.max_input_tokens is None or tokens <= self.max_input_tokens
+
+
+def _iter_json_objects(text: str) -> Iterator[Any]:
+    """解析JSON数组中的对象；整体无法解析（例如输出被截断）时逐个解析完整的对象"""
+    text = re.sub(r'^```(?:json)?\s*|\s*```$', '', text.strip())
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        data = None
+    if data is not None:
+        yield from (data if isinstance(data, list) else [data])
+        return
+    decoder = json.JSONDecoder()
+    index = text.find('{')
+    while index != -1:
+        try:
+            item, end = decoder.raw_decode(text, index)
+        except json.JSONDecodeError:
+            return
+        yield item
+        index = text.find('{', end)
+
 
 class ModelClient:
-    """语言模型API客户端"""
+    """
+    语言模型API客户端
+
+    按 routes 的顺序选择模型：主模型在前，LLM_CONFIG['fallback_models'] 依次在后。
+    每次调用使用第一个能容纳本次请求输入 token 数、且当前未被跳过的模型；
+    某个模型触发限流、返回5xx、超时或响应超过延迟阈值时，在 route_cooldown 秒内（限流时至少为服务器要求的等待时间）
+    跳过该模型，本次及后续调用改用下一个模型。没有其他可用模型时按原方式等待和重试。
+    """
     
-    def __init__(self, api_key: str, model: Optional[str] = None):
+    def __init__(self, api_key: str, model: Optional[str] = None, metrics: Optional[RunMetrics] = None):
         self.api_key = api_key
+        self.metrics = metrics or RunMetrics()
         self.model = model or LLM_CONFIG['model']
         self.api_url = f"{LLM_CONFIG['api_url']}/{self.model}:generateContent"
         self.timeout = LLM_CONFIG.get('timeout', 60) # 增加超时时间
+        # 流式生成：逐块读取 streamGenerateContent 的SSE响应，超时按两次数据之间的空闲时间计算
+        self.stream = LLM_CONFIG.get('stream', False)
+        self.connect_timeout = LLM_CONFIG.get('connect_timeout', 10)
+        self.idle_timeout = LLM_CONFIG.get('idle_timeout', 60)
+        self.gzip = LLM_CONFIG.get('gzip', True)
+        self.gzip_requests = LLM_CONFIG.get('gzip_requests', False)
+        # 所有线程共享同一个会话：限制同时进行中的请求数，并保证请求发起时间的最小间隔
+        self._http = self._create_session()
+        self.session = ThrottledSession(
+            self._http,
+            IntervalRateLimiter(LLM_CONFIG.get('request_interval', 0.0)),
+            max_concurrent=LLM_CONFIG.get('concurrency', 1)
+        )
+        # 按模型配额（RPM/TPM）限速，遇到限流响应时所有调用方一起暂停
+        self.rate_limiter = get_rate_limiter(self.model)
+        # 模型路由：主模型和备用模型，按顺序优先
+        self.routes = [ModelRoute.from_config(self.model)]
+        for fallback in LLM_CONFIG.get('fallback_models') or []:
+            if fallback not in [route.model for route in self.routes]:
+                self.routes.append(ModelRoute.from_config(fallback))
+        self.route_cooldown = LLM_CONFIG.get('route_cooldown', 60)
+        self._routes_lock = threading.Lock()
+        # 系统指令的缓存上下文（cachedContents），(模型, 系统指令哈希) -> 缓存名称，None表示不可用
+        self.context_cache = LLM_CONFIG.get('context_cache', False)
+        self.context_cache_ttl = LLM_CONFIG.get('context_cache_ttl', 3600)
+        self._context_caches: Dict[Tuple[str, str], Optional[str]] = {}
+        self._context_cache_lock = threading.Lock()
+        
+    def _create_session(self) -> requests.Session:
+        """创建保持长连接的会话，连接池大小与并发数一致，批次、重试和单篇请求复用同一批TLS连接"""
+        pool_size = LLM_CONFIG.get('pool_size') or max(1, LLM_CONFIG.get('concurrency', 1))
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+        
+    def connection_stats(self) -> Dict[str, int]:
+        """连接复用统计：新建连接数、请求数和复用连接的请求数"""
+        connections = requests_sent = 0
+        for adapter in set(self._http.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for pool in [pools.get(key) for key in pools.keys()]:
+                if pool is None:
+                    continue
+                connections += pool.num_connections
+                requests_sent += pool.num_requests
+        return {
+            'connections': connections,
+            'requests': requests_sent,
+            'reused': max(0, requests_sent - connections),
+        }
         
     def _create_headers(self) -> Dict[str, str]:
         """创建请求头"""
-        return {
+        headers = {
             "Content-Type": "application/json"
         }
+        if self.gzip:
+            # Google API 只在 User-Agent 中包含 gzip 时返回压缩响应
+            headers["Accept-Encoding"] = "gzip"
+            headers["User-Agent"] = "biai-daily-arxiv (gzip)"
+        if self.gzip_requests:
+            headers["Content-Encoding"] = "gzip"
+        return headers
     
     def _create_request_body(
         self, 
         messages: List[Dict[str, str]],
         temperature: Optional[float] = None,
-        max_tokens: Optional[int] = None
+        max_tokens: Optional[int] = None,
+        response_schema: Optional[Dict[str, Any]] = None,
+        cached_content: Optional[str] = None
     ) -> Dict[str, Any]:
-        """创建请求体"""
+        """
+        创建请求体，指定 response_schema 时要求模型返回符合该结构的JSON
+
+        system 消息作为 systemInstruction 发送；给出 cached_content 时系统指令已在缓存上下文中，只引用缓存。
+        """
         prompt = messages[-1]["content"]
+        system = self._system_text(messages)
         
-        return {
-            "contents": [{"parts": [{"text": prompt}]}],
+        body = {
+            "contents": [{"role": "user", "parts": [{"text": prompt}]}],
             "generationConfig": {
                 "temperature": temperature or LLM_CONFIG['temperature'],
                 "maxOutputTokens": max_tokens or LLM_CONFIG['max_output_tokens'],
@@ -45,6 +223,78 @@ class ModelClient:
                 "topK": LLM_CONFIG['top_k']
             }
         }
+        if response_schema is not None:
+            body["generationConfig"]["responseMimeType"] = "application/json"
+            body["generationConfig"]["responseSchema"] = response_schema
+        if cached_content:
+            body["cachedContent"] = cached_content
+        elif system:
+            body["systemInstruction"] = {"parts": [{"text": system}]}
+        return body
+
+    @staticmethod
+    def _system_text(messages: List[Dict[str, str]]) -> str:
+        return "\n\n".join(message["content"] for message in messages if message["role"] == "system")
+
+    def _api_base(self, route: ModelRoute) -> str:
+        """API版本根地址，例如 https://generativelanguage.googleapis.com/v1beta"""
+        return self._route_url(route).rsplit('/models/', 1)[0]
+
+    def _context_cache(self, route: ModelRoute, system: str) -> Optional[str]:
+        """
+        获取系统指令在该模型上的缓存上下文名称，首次使用时创建
+
+        每次运行、每个模型、每份系统指令只创建一次。后端不支持或拒绝创建（例如内容少于模型要求的最小 token 数）时
+        记为不可用，之后的调用直接发送系统指令（仍可命中后端的隐式前缀缓存）。
+        """
+        if not system or not self.context_cache:
+            return None
+        key = (route.model, hashlib.sha256(system.encode('utf-8')).hexdigest())
+        with self._context_cache_lock:
+            if key in self._context_caches:
+                return self._context_caches[key]
+            name = None
+            try:
+                response = self.session.post(
+                    f"{self._api_base(route)}/cachedContents?key={self.api_key}",
+                    headers={"Content-Type": "application/json"},
+                    data=json.dumps({
+                        "model": f"models/{route.model}",
+                        "systemInstruction": {"parts": [{"text": system}]},
+                        "ttl": f"{self.context_cache_ttl}s",
+                    }, ensure_ascii=False).encode('utf-8'),
+                    timeout=self.connect_timeout
+                )
+                if response.status_code == 200:
+                    name = response.json().get("name")
+                    print(f"已为模型 {route.model} 创建系统指令缓存: {name}")
+                    self.metrics.incr('llm.context_caches')
+                else:
+                    print(f"模型 {route.model} 无法创建系统指令缓存(HTTP {response.status_code})，"
+                          f"改为每次发送系统指令: {response.text[:200]}")
+            except (requests.RequestException, ValueError) as e:
+                print(f"创建系统指令缓存失败，改为每次发送系统指令: {e}")
+            self._context_caches[key] = name
+            return name
+
+    def _drop_context_cache(self, route: ModelRoute, name: str):
+        """缓存上下文失效（例如已过期）时不再使用"""
+        with self._context_cache_lock:
+            for key, value in self._context_caches.items():
+                if key[0] == route.model and value == name:
+                    self._context_caches[key] = None
+
+    def delete_context_caches(self):
+        """删除本次运行创建的缓存上下文，未删除的缓存在 context_cache_ttl 后自动过期"""
+        with self._context_cache_lock:
+            caches = [(model, name) for (model, _), name in self._context_caches.items() if name]
+            self._context_caches.clear()
+        for model, name in caches:
+            route = next((route for route in self.routes if route.model == model), ModelRoute(model))
+            try:
+                self.session.delete(f"{self._api_base(route)}/{name}?key={self.api_key}", timeout=self.connect_timeout)
+            except requests.RequestException as e:
+                print(f"删除系统指令缓存 {name} 失败: {e}")
     
     def _extract_content_from_response(self, result: Dict[str, Any]) -> str:
         """从API响应中提取内容，处理不同的响应格式"""
@@ -116,46 +366,204 @@ class ModelClient:
             print(f"响应结构: {json.dumps(result, indent=2, ensure_ascii=False)}")
             raise
 
+    def _stream_url(self, api_url: Optional[str] = None) -> str:
+        return re.sub(r':generateContent$', ':streamGenerateContent', api_url or self.api_url)
+
+    def _route_url(self, route: ModelRoute) -> str:
+        """备用模型的请求地址由主模型地址替换模型名得到"""
+        if route.model == self.model:
+            return self.api_url
+        return self.api_url.replace(f"/{self.model}:", f"/{route.model}:")
+
+    def _route_limiter(self, route: ModelRoute) -> TokenBucketLimiter:
+        return self.rate_limiter if route.model == self.model else get_rate_limiter(route.model)
+
+    def _select_route(self, tokens: float) -> ModelRoute:
+        """
+        选择本次请求使用的模型：按顺序第一个能容纳 tokens 且未被跳过的模型
+
+        没有模型能容纳时使用预算最大的模型；能容纳的模型都被跳过时使用最早恢复的模型。
+        """
+        fitting = [route for route in self.routes if route.fits(tokens)]
+        if not fitting:
+            fitting = [max(self.routes, key=lambda route: float('inf') if route.max_input_tokens is None
+                           else route.max_input_tokens)]
+        now = time.monotonic()
+        with self._routes_lock:
+            for route in fitting:
+                if route.unavailable_until <= now:
+                    return route
+            return min(fitting, key=lambda route: route.unavailable_until)
+
+    def _spill_over(self, route: ModelRoute, seconds: float, tokens: float, reason: str) -> bool:
+        """
+        在 seconds 秒内跳过该模型
+
+        Returns:
+            是否有其他可用模型能接手本次请求（只有一个模型时总是 False）
+        """
+        if len(self.routes) < 2:
+            return False
+        with self._routes_lock:
+            route.unavailable_until = max(route.unavailable_until, time.monotonic() + seconds)
+        alternative = self._select_route(tokens)
+        if alternative is route or alternative.unavailable_until > time.monotonic():
+            return False
+        print(f"模型 {route.model} {reason}，{seconds:.0f} 秒内改用 {alternative.model}")
+        self.metrics.incr('llm.spillovers')
+        return True
+
+    def _read_stream(self, response: requests.Response) -> Dict[str, Any]:
+        """
+        逐块读取SSE流式响应，合并为与 generateContent 相同结构的结果
+
+        每个 data 事件是一个 GenerateContentResponse 片段：拼接各片段的文本，
+        finishReason 和 usageMetadata 取最后出现的值。两个片段之间的间隔超过 idle_timeout 时按超时处理。
+        """
+        texts = []
+        candidate: Dict[str, Any] = {}
+        usage: Dict[str, Any] = {}
+        try:
+            for line in response.iter_lines():
+                if not line.startswith(b'data:'):
+                    continue
+                try:
+                    chunk = json.loads(line[5:].decode('utf-8'))
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"流式响应片段解析错误: {e}, 片段内容: {line[:500]!r}") from e
+                if "error" in chunk:
+                    return chunk
+                usage = chunk.get("usageMetadata") or usage
+                for chunk_candidate in chunk.get("candidates") or []:
+                    for part in (chunk_candidate.get("content") or {}).get("parts") or []:
+                        # 思考模型的思考摘要不计入正文
+                        if "text" in part and not part.get("thought"):
+                            texts.append(part["text"])
+                    if chunk_candidate.get("finishReason"):
+                        candidate["finishReason"] = chunk_candidate["finishReason"]
+        except requests.ConnectionError as e:
+            # 读取流的过程中空闲超时由 urllib3 抛出，requests 将其包装为连接错误
+            raise requests.Timeout(f"流式响应中断或超过{self.idle_timeout}秒没有新数据: {e}") from e
+        finally:
+            response.close()
+        
+        if texts:
+            candidate["content"] = {"parts": [{"text": "".join(texts)}], "role": "model"}
+        return {"candidates": [candidate] if candidate else [], "usageMetadata": usage}
+
     def chat_completion(
         self,
         messages: List[Dict[str, str]],
         temperature: Optional[float] = None,
-        max_tokens: Optional[int] = None
+        max_tokens: Optional[int] = None,
+        response_schema: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
-        """创建聊天完成"""
+        """创建聊天完成，system 消息作为系统指令发送，启用 context_cache 时通过缓存上下文引用"""
         headers = self._create_headers()
-        data = self._create_request_body(messages, temperature, max_tokens)
+        system = self._system_text(messages)
+        # 请求体按引用的缓存上下文分别只序列化（和压缩）一次，重试时复用
+        bodies: Dict[Optional[str], bytes] = {}
+        
+        # 按提示词长度预估本次请求的输入 token 数用于 TPM 限速，响应后按实际用量修正
+        estimated_tokens = sum(len(message["content"]) for message in messages) / LLM_CONFIG.get('chars_per_token', 4.0)
+        max_rate_limit_waits = LLM_CONFIG.get('max_rate_limit_waits', 10)
+        max_retry_after = LLM_CONFIG.get('max_retry_after', 120)
         
         last_exception = None
+        rate_limit_waits = 0
+        attempt = 0
+        call_start = time.perf_counter()
+        self.metrics.incr('llm.calls')
         
-        for attempt in range(LLM_CONFIG['retry_count']):
+        while attempt < LLM_CONFIG['retry_count']:
+            route = self._select_route(estimated_tokens)
+            rate_limiter = self._route_limiter(route)
+            cached_content = self._context_cache(route, system)
+            if cached_content not in bodies:
+                data = self._create_request_body(messages, temperature, max_tokens, response_schema, cached_content)
+                bodies[cached_content] = json.dumps(data, ensure_ascii=False).encode('utf-8')
+                if self.gzip_requests:
+                    bodies[cached_content] = gzip.compress(bodies[cached_content])
+            body = bodies[cached_content]
             try:
-                print(f"尝试API调用 (第{attempt + 1}次)...")
-                response = requests.post(
-                    f"{self.api_url}?key={self.api_key}",
-                    headers=headers,
-                    json=data,
-                    timeout=self.timeout
-                )
+                waited = rate_limiter.acquire(estimated_tokens)
+                if waited:
+                    self.metrics.incr('llm.throttle_wait_seconds', waited)
+                if len(self.routes) > 1:
+                    print(f"尝试API调用 (第{attempt + 1}次，模型 {route.model})...")
+                else:
+                    print(f"尝试API调用 (第{attempt + 1}次)...")
+                request_start = time.perf_counter()
+                self.metrics.incr('llm.requests')
+                if self.stream:
+                    response = self.session.post(
+                        f"{self._stream_url(self._route_url(route))}?alt=sse&key={self.api_key}",
+                        headers=headers,
+                        data=body,
+                        timeout=(self.connect_timeout, self.idle_timeout),
+                        stream=True
+                    )
+                else:
+                    response = self.session.post(
+                        f"{self._route_url(route)}?key={self.api_key}",
+                        headers=headers,
+                        data=body,
+                        timeout=self.timeout
+                    )
+                
+                # 限流响应：按服务器要求的时间暂停该模型的所有调用方，不消耗重试次数；
+                # 有其他可用模型时立即改用，否则等待后重试
+                if response.status_code in RATE_LIMIT_STATUS:
+                    delay = retry_after_seconds(response)
+                    if delay is None:
+                        delay = LLM_CONFIG['retry_delay'] * (2 ** min(rate_limit_waits, 5))
+                    rate_limit_waits += 1
+                    self.metrics.incr('llm.rate_limited')
+                    give_up = rate_limit_waits > max_rate_limit_waits or delay > max_retry_after
+                    # 等待时间超过上限（例如当日配额用尽）时本次调用放弃，不暂停共享的限速器，
+                    # 以免其他批次被一同阻塞到配额恢复
+                    if delay <= max_retry_after:
+                        rate_limiter.pause(delay)
+                    if self._spill_over(route, max(delay, self.route_cooldown), estimated_tokens,
+                                        f"触发限流(HTTP {response.status_code})"):
+                        continue
+                    if give_up:
+                        raise RateLimitError(f"HTTP错误 {response.status_code}: 触发限流{rate_limit_waits}次，"
+                                             f"服务器要求等待 {delay:.0f} 秒: {response.text[:500]}")
+                    print(f"触发限流(HTTP {response.status_code})，{delay:.1f} 秒后重试...")
+                    self.metrics.incr('llm.rate_limit_wait_seconds', delay)
+                    continue
                 
                 # 检查HTTP状态码
                 if response.status_code != 200:
                     error_msg = f"HTTP错误 {response.status_code}: {response.text}"
                     print(f"HTTP错误: {error_msg}")
-                    raise requests.HTTPError(error_msg)
+                    raise requests.HTTPError(error_msg, response=response)
                 
                 # 解析JSON响应
                 try:
-                    result = response.json()
+                    result = self._read_stream(response) if self.stream else response.json()
                 except json.JSONDecodeError as e:
                     error_msg = f"JSON解析错误: {e}, 响应内容: {response.text[:500]}"
                     print(f"JSON解析错误: {error_msg}")
                     raise ValueError(error_msg)
                 
+                usage = result.get("usageMetadata", {})
+                if usage.get("promptTokenCount"):
+                    rate_limiter.adjust(usage["promptTokenCount"] - estimated_tokens)
+                
                 # 提取内容
                 content = self._extract_content_from_response(result)
                 
                 print(f"API调用成功，内容长度: {len(content)}")
+                now = time.perf_counter()
+                self.metrics.observe('llm.request', now - request_start)
+                self.metrics.observe('llm.call', now - call_start)
+                self.metrics.record_usage(usage)
+                # 响应过慢：本次结果照常返回，后续调用暂时改用其他模型
+                if route.max_latency and now - request_start > route.max_latency:
+                    self._spill_over(route, self.route_cooldown, estimated_tokens,
+                                     f"响应耗时 {now - request_start:.1f} 秒超过阈值 {route.max_latency} 秒")
                 
                 return {
                     "choices": [{
@@ -165,29 +573,53 @@ class ModelClient:
                         },
                         "finish_reason": "stop"
                     }],
-                    "usage": result.get("usageMetadata", {})
+                    "usage": usage,
+                    "model": route.model
                 }
                 
+            except RateLimitError as e:
+                last_exception = e
+                print(f"限流等待超过上限，停止重试: {e}")
+                break
+                
             except requests.Timeout as e:
                 last_exception = e
-                print(f"请求超时({self.timeout}秒), 正在重试({attempt + 1}/{LLM_CONFIG['retry_count']})...")
-                if attempt == LLM_CONFIG['retry_count'] - 1:
+                timeout = f"空闲{self.idle_timeout}" if self.stream else self.timeout
+                print(f"请求超时({timeout}秒), 正在重试({attempt + 1}/{LLM_CONFIG['retry_count']})...")
+                attempt += 1
+                if attempt == LLM_CONFIG['retry_count']:
                     break
-                time.sleep(LLM_CONFIG['retry_delay'] * (2 ** attempt))
+                self.metrics.incr('llm.retries')
+                # 改用其他模型时不需要退避等待
+                if not self._spill_over(route, self.route_cooldown, estimated_tokens, "请求超时"):
+                    time.sleep(LLM_CONFIG['retry_delay'] * (2 ** (attempt - 1)))
                 
             except requests.HTTPError as e:
                 last_exception = e
                 print(f"HTTP错误: {e}, 正在重试({attempt + 1}/{LLM_CONFIG['retry_count']})...")
-                if attempt == LLM_CONFIG['retry_count'] - 1:
+                attempt += 1
+                if attempt == LLM_CONFIG['retry_count']:
                     break
-                time.sleep(LLM_CONFIG['retry_delay'] * (2 ** attempt))
+                self.metrics.incr('llm.retries')
+                status = e.response.status_code if e.response is not None else None
+                # 引用的缓存上下文失效（例如已过期）时改为直接发送系统指令，立即重试
+                if cached_content and status in (400, 403, 404):
+                    print(f"系统指令缓存 {cached_content} 不可用，改为直接发送系统指令")
+                    self._drop_context_cache(route, cached_content)
+                    continue
+                # 服务器错误（5xx）时改用其他模型，不需要退避等待
+                if not (status and status >= 500
+                        and self._spill_over(route, self.route_cooldown, estimated_tokens, f"返回HTTP {status}")):
+                    time.sleep(LLM_CONFIG['retry_delay'] * (2 ** (attempt - 1)))
                 
             except Exception as e:
                 last_exception = e
                 print(f"API调用失败: {e}, 正在重试({attempt + 1}/{LLM_CONFIG['retry_count']})...")
-                if attempt == LLM_CONFIG['retry_count'] - 1:
+                attempt += 1
+                if attempt == LLM_CONFIG['retry_count']:
                     break
-                time.sleep(LLM_CONFIG['retry_delay'] * (2 ** attempt))
+                self.metrics.incr('llm.retries')
+                time.sleep(LLM_CONFIG['retry_delay'] * (2 ** (attempt - 1)))
         
         # 所有重试都失败了
         error_msg = f"API调用失败，已重试{LLM_CONFIG['retry_count']}次"
@@ -195,12 +627,26 @@ class ModelClient:
             error_msg += f"，最后一次错误: {last_exception}"
         
         print(f"最终错误: {error_msg}")
+        self.metrics.incr('llm.failures')
         raise Exception(error_msg)
 
 class PaperSummarizer:
-    def __init__(self, api_key: str, model: Optional[str] = None):
-        self.client = ModelClient(api_key, model)
-        self.max_papers_per_batch = 20 # 适当减少批处理数量，防止Prompt过长
+    def __init__(self, api_key: str, model: Optional[str] = None, cache: Optional[SummaryCache] = None,
+                 estimator: Optional[TokenEstimator] = None, journal: Optional[RunJournal] = None,
+                 metrics: Optional[RunMetrics] = None):
+        # 运行指标：模型调用的延迟、token 用量和重试由 ModelClient 记录，批次、备选和缓存命中在这里记录
+        self.metrics = metrics or RunMetrics()
+        self.client = ModelClient(api_key, model, metrics=self.metrics)
+        self.cache = cache
+        # 运行日志：每批完成后记录摘要，恢复运行时已完成的论文直接使用日志中的摘要
+        self.journal = journal
+        # 每批论文数量由输入/输出 token 预算决定，max_papers_per_batch 只是上限
+        self.max_papers_per_batch = BATCH_CONFIG.get('max_papers', 30)
+        self.estimator = estimator or TokenEstimator.from_config(self.client.model, BATCH_CONFIG)
+        # 同时进行的批次（以及单篇备选生成）数量，请求速率由 ModelClient 的共享限速器控制
+        self.concurrency = max(1, LLM_CONFIG.get('concurrency', 1))
+        # 'markdown': 模型直接输出Markdown章节；'json': 模型按 SUMMARY_RESPONSE_SCHEMA 输出，本地渲染Markdown
+        self.output_format = LLM_CONFIG.get('output_format', 'markdown')
 
     def _fix_markdown_links(self, text: str) -> str:
         """使用正则表达式修复未正确格式化的Markdown链接"""
@@ -217,54 +663,65 @@ class PaperSummarizer:
             
         return pattern.sub(replacer, text)
 
-    def _generate_batch_summaries(self, papers: List[Dict[str, Any]], start_index: int) -> str:
-        """为一批论文生成总结"""
-        batch_prompt = ""
-        for i, paper in enumerate(papers, start=start_index):
-            # 确保摘要只取一部分，避免prompt过长
-            summary_snippet = (paper['summary'][:800] + '...') if len(paper['summary']) > 800 else paper['summary']
-            batch_prompt += f"""
----
-论文 {i}:
-- 标题: {paper['title']}
-- 作者: {', '.join(paper['authors'])}
-- 发布日期: {paper['published'][:10]}
-- arXiv链接: {paper['entry_id']}
-- 摘要: {summary_snippet}
-"""
-        
-        final_prompt = f"""请为以下{len(papers)}篇来自ArXiv的论文生成中文总结。每篇论文的总结都需要遵循严格的Markdown格式。
+    def _summary_snippet(self, paper: Dict[str, Any]) -> str:
+        """论文摘要原文，超过 abstract_max_chars 时截断（None表示不截断）"""
+        max_chars = BATCH_CONFIG.get('abstract_max_chars')
+        if max_chars and len(paper['summary']) > max_chars:
+            return paper['summary'][:max_chars] + '...'
+        return paper['summary']
 
-**必须遵循的输出格式:**
-对于每一篇论文，你的输出必须是以下格式，不得有任何变动：
+    def _paper_block(self, paper: Dict[str, Any], i: int) -> str:
+        """用户提示词中单篇论文的信息，JSON模式下只提供ID、标题和摘要"""
+        return paper_block(paper, i, self._summary_snippet(paper), split_arxiv_id(paper['entry_id'])[0],
+                           self.output_format)
 
-### [论文标题](论文的arXiv链接)
-<!-- 论文发布日期，格式：YYYY-MM-DD -->
-**📅 发布日期**: 论文发布日期(YYYY-MM-DD格式)
+    def _create_batch_packer(self) -> BatchPacker:
+        """按输入/输出 token 预算打包批次，输出预算留出余量，避免超过 maxOutputTokens 导致批次被截断"""
+        max_output_tokens = LLM_CONFIG['max_output_tokens'] * BATCH_CONFIG.get('output_budget_ratio', 0.8)
+        return BatchPacker(
+            self.estimator,
+            paper_chars=lambda paper: len(self._paper_block(paper, 1)),
+            prompt_overhead_chars=sum(len(message["content"]) for message in self._build_messages([], 1)),
+            max_input_tokens=BATCH_CONFIG.get('max_input_tokens', 24000),
+            max_output_tokens=max_output_tokens,
+            max_papers=self.max_papers_per_batch,
+        )
 
-* **👥 作者**: 作者名
-* **🎯 研究目的**: 详细描述研究的背景、动机和核心目标，包括解决的问题和研究意义。
-* **⭐ 主要发现**: 详细阐述论文的核心贡献、创新点、实验结果和理论突破，以及对领域的潜在影响。
+    def _build_batch_prompt(self, papers: List[Dict[str, Any]], start_index: int) -> str:
+        """构建一批论文的用户提示词，只包含论文信息"""
+        batch_prompt = "".join(self._paper_block(paper, i) for i, paper in enumerate(papers, start=start_index))
+        return user_prompt(batch_prompt, len(papers), self.output_format)
 
----
+    def _build_messages(self, papers: List[Dict[str, Any]], start_index: int) -> List[Dict[str, str]]:
+        """一批论文的请求消息：固定的系统指令（各次调用相同，可缓存）和论文信息"""
+        return [
+            {"role": "system", "content": system_instruction(self.output_format)},
+            {"role": "user", "content": self._build_batch_prompt(papers, start_index)},
+        ]
 
-**关键指令:**
-1.  **无需序号**: 论文标题前不需要添加序号，序号将由网站页面动态生成。
-2.  **链接格式**: 论文标题必须作为可点击的Markdown链接，格式为 `[标题](链接)`。
-3.  **日期注释**: 在标题下方，必须插入HTML注释 `<!-- YYYY-MM-DD -->` 来标记发布日期，格式严格为YYYY-MM-DD。
-4.  **可见日期**: 在HTML注释后，必须添加可见的日期行：`**📅 发布日期**: YYYY-MM-DD`。
-5.  **内容丰富**: "研究目的"应包含研究背景、动机和目标；"主要发现"应详细描述核心贡献、创新点和实验结果。
-6.  **分隔符**: 每篇论文总结之后，必须使用 `---` 作为分隔符。
-7.  **语言**: 所有输出内容必须为中文。
-8.  **数学公式**: 你可以自由使用LaTeX语法（例如 `$E=mc^2$`）来表示数学公式。
-9.  **完整性**: 必须为每篇论文生成完整的摘要，不得遗漏任何一篇。
-
-**需要你处理的论文信息如下:**
-{batch_prompt}
-"""
+    def _observe_usage(self, messages: List[Dict[str, str]], paper_count: int, response: Dict[str, Any]):
+        """用主模型的响应校准 token 估计，备用模型的用量不计入"""
+        if response.get("model", self.client.model) == self.client.model:
+            prompt_chars = sum(len(message["content"]) for message in messages)
+            self.estimator.observe(prompt_chars, paper_count, response.get("usage") or {})
+
+    def _routing(self) -> bool:
+        return len(getattr(self.client, 'routes', ())) > 1
+
+    def _tag_model(self, text: str, response: Dict[str, Any]) -> str:
+        """启用模型路由时，在每个摘要章节的标题下记录生成该摘要的模型"""
+        model = response.get("model")
+        if not model or not self._routing():
+            return text
+        return re.sub(r'(?m)^(###\s.*)$', lambda match: f"{match.group(1)}\n<!-- model: {model} -->", text)
+
+    def _generate_batch_summaries(self, papers: List[Dict[str, Any]], start_index: int) -> str:
+        """为一批论文生成总结，API调用失败时抛出异常，由调用方决定如何补救"""
+        messages = self._build_messages(papers, start_index)
         try:
             print(f"正在为{len(papers)}篇论文生成摘要...")
-            response = self.client.chat_completion([{"role": "user", "content": final_prompt}])
+            response = self.client.chat_completion(messages)
+            self._observe_usage(messages, len(papers), response)
             content = response["choices"][0]["message"]["content"].strip()
             
             # 检查生成的内容是否完整
@@ -276,75 +733,98 @@ class PaperSummarizer:
                 print(f"可能部分论文摘要生成失败")
             
             # 在返回内容后，立即进行链接修复
-            fixed_content = self._fix_markdown_links(content)
+            fixed_content = self._tag_model(self._fix_markdown_links(content), response)
             print(f"摘要生成成功，共生成 {generated_sections} 个摘要")
             return fixed_content
             
         except Exception as e:
             print(f"批量生成摘要失败: {e}")
-            print(f"将尝试为每篇论文单独生成摘要...")
-            return self._generate_individual_summaries(papers)
-
-    def _generate_individual_summaries(self, papers: List[Dict[str, Any]]) -> str:
-        """逐个为论文生成摘要（作为批量失败的备选方案）"""
-        individual_summaries = []
-        
-        for i, paper in enumerate(papers):
-            try:
-                print(f"正在为第{i+1}篇论文生成摘要: {paper['title'][:50]}...")
-                
-                # 为单篇论文生成摘要
-                summary_snippet = (paper['summary'][:800] + '...') if len(paper['summary']) > 800 else paper['summary']
-                
-                single_prompt = f"""请为这篇来自ArXiv的论文生成中文总结。
-
-**论文信息:**
-- 标题: {paper['title']}
-- 作者: {', '.join(paper['authors'])}
-- 发布日期: {paper['published'][:10]}
-- arXiv链接: {paper['entry_id']}
-- 摘要: {summary_snippet}
-
-**输出格式:**
-### [论文标题](论文的arXiv链接)
-<!-- 论文发布日期，格式：YYYY-MM-DD -->
-**📅 发布日期**: 论文发布日期(YYYY-MM-DD格式)
+            raise
 
-* **👥 作者**: 作者名
-* **🎯 研究目的**: 详细描述研究的背景、动机和核心目标，包括解决的问题和研究意义。
-* **⭐ 主要发现**: 详细阐述论文的核心贡献、创新点、实验结果和理论突破，以及对领域的潜在影响。
+    def _generate_json_sections(self, papers: List[Dict[str, Any]], start_index: int) -> Dict[str, str]:
+        """JSON模式下为一批论文生成摘要，逐项校验后用本地元数据渲染章节，API调用失败时抛出异常"""
+        messages = self._build_messages(papers, start_index)
+        print(f"正在为{len(papers)}篇论文生成结构化摘要...")
+        response = self.client.chat_completion(messages, response_schema=SUMMARY_RESPONSE_SCHEMA)
+        self._observe_usage(messages, len(papers), response)
+        sections = {arxiv_id: self._tag_model(section, response) for arxiv_id, section
+                    in self._parse_json_sections(response["choices"][0]["message"]["content"], papers).items()}
+        print(f"结构化摘要解析完成，有效 {len(sections)}/{len(papers)} 篇")
+        return sections
 
----
+    def _parse_json_sections(self, text: str, papers: List[Dict[str, Any]]) -> Dict[str, str]:
+        """
+        校验JSON摘要并渲染为Markdown章节，以不带版本号的 arXiv ID 为键
 
-请确保输出格式严格按照上述要求。"""
+        只接受 id 属于本批论文、purpose 和 findings 均为非空字符串的对象；
+        输出被截断导致整体无法解析时，保留被截断位置之前的完整对象。
+        """
+        by_id = {split_arxiv_id(paper['entry_id'])[0]: paper for paper in papers}
+        sections = {}
+        for item in _iter_json_objects(text):
+            if not isinstance(item, dict):
+                continue
+            arxiv_id = split_arxiv_id(str(item.get('id') or ""))[0]
+            purpose, findings = item.get('purpose'), item.get('findings')
+            if (arxiv_id in by_id and arxiv_id not in sections
+                    and isinstance(purpose, str) and purpose.strip()
+                    and isinstance(findings, str) and findings.strip()):
+                sections[arxiv_id] = self._render_section(by_id[arxiv_id], purpose.strip(), findings.strip())
+        return sections
 
-                response = self.client.chat_completion([{"role": "user", "content": single_prompt}])
-                content = response["choices"][0]["message"]["content"].strip()
-                fixed_content = self._fix_markdown_links(content)
-                individual_summaries.append(fixed_content)
-                print(f"第{i+1}篇论文摘要生成成功")
-                
-                # 为了避免API限制，添加小延迟
-                if i < len(papers) - 1:
-                    time.sleep(1)
-                    
-            except Exception as e:
-                print(f"第{i+1}篇论文摘要生成失败: {e}")
-                # 生成错误摘要
-                error_summary = f"""### [{paper['title']}]({paper['entry_id']})
+    def _render_section(self, paper: Dict[str, Any], purpose: str, findings: str,
+                        error: Optional[str] = None) -> str:
+        """用论文元数据渲染与Markdown模式格式一致的摘要章节"""
+        error_line = f"\n**错误信息**: {error}\n" if error is not None else ""
+        return f"""### [{paper['title']}]({paper['entry_id']})
 <!-- {paper['published'][:10]} -->
 **📅 发布日期**: {paper['published'][:10]}
 
 * **👥 作者**: {', '.join(paper['authors'])}
-* **🎯 研究目的**: 由于API调用失败，无法生成详细的研究目的摘要。请参考原始论文了解详情。
-* **⭐ 主要发现**: 由于API调用失败，无法生成详细的主要发现摘要。请参考原始论文了解详情。
+* **🎯 研究目的**: {purpose}
+* **⭐ 主要发现**: {findings}
+{error_line}
+---"""
+
+    def _generate_individual_summaries(self, papers: List[Dict[str, Any]]) -> str:
+        """逐个为论文生成摘要（作为批量失败的备选方案），并发执行，输出保持论文顺序"""
+        return "\n".join(self._generate_individual_sections(papers))
 
-**错误信息**: {str(e)}
+    def _generate_individual_sections(self, papers: List[Dict[str, Any]]) -> List[str]:
+        """并发地逐篇生成摘要，返回与 papers 一一对应的摘要章节"""
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='summary-single') as executor:
+            return list(executor.map(self._generate_single_summary, papers, range(len(papers))))
 
----"""
-                individual_summaries.append(error_summary)
-        
-        return "\n".join(individual_summaries)
+    def _generate_single_summary(self, paper: Dict[str, Any], i: int) -> str:
+        """为单篇论文生成摘要，失败时返回错误摘要"""
+        try:
+            print(f"正在为第{i+1}篇论文生成摘要: {paper['title'][:50]}...")
+            
+            if self.output_format == 'json':
+                section = self._generate_json_sections([paper], i + 1).get(split_arxiv_id(paper['entry_id'])[0])
+                if section is None:
+                    raise ValueError("JSON响应中没有该论文的有效摘要")
+                print(f"第{i+1}篇论文摘要生成成功")
+                return section
+            
+            # 单篇论文与批量请求使用相同的系统指令，只是论文信息只有一篇
+            messages = self._build_messages([paper], i + 1)
+            response = self.client.chat_completion(messages)
+            self._observe_usage(messages, 1, response)
+            content = response["choices"][0]["message"]["content"].strip()
+            fixed_content = self._tag_model(self._fix_markdown_links(content), response)
+            print(f"第{i+1}篇论文摘要生成成功")
+            return fixed_content
+                
+        except Exception as e:
+            print(f"第{i+1}篇论文摘要生成失败: {e}")
+            # 生成错误摘要
+            return self._render_section(
+                paper,
+                "由于API调用失败，无法生成详细的研究目的摘要。请参考原始论文了解详情。",
+                "由于API调用失败，无法生成详细的主要发现摘要。请参考原始论文了解详情。",
+                error=str(e),
+            )
 
     def _process_batch(self, papers: List[Dict[str, Any]], start_index: int) -> str:
         """处理一批论文"""
@@ -358,7 +838,6 @@ class PaperSummarizer:
         if generated_count != expected_count:
             print(f"警告: 生成的摘要数量({generated_count})与预期({expected_count})不符")
         
-        time.sleep(2)  # 为了避免API限制
         return summaries
 
     def _validate_summaries(self, summaries: str, expected_count: int) -> bool:
@@ -371,40 +850,220 @@ class PaperSummarizer:
         
         return is_valid
 
-    def _generate_batch_summary(self, papers: List[Dict[str, Any]]) -> str:
-        """批量生成所有论文的总结"""
-        all_summaries = []
-        total_papers = len(papers)
+    def _summarize_batch(self, batch: List[Dict[str, Any]], start_index: int) -> List[str]:
+        """
+        生成一批论文的摘要，返回与 batch 一一对应的摘要章节
+
+        批量响应按标题中的链接拆分到每篇论文，保留格式完整的章节；缺失或格式不完整的论文
+        合并为一个新批次重新请求（最多 salvage_retries 轮），仍然缺失的论文才逐篇生成。
+        """
+        sections: Dict[str, str] = {}
+        missing = list(batch)
+        retries = BATCH_CONFIG.get('salvage_retries', 1)
         
-        for i in range(0, total_papers, self.max_papers_per_batch):
-            batch = papers[i:i + self.max_papers_per_batch]
-            batch_size = len(batch)
-            print(f"\n正在处理第 {i + 1} 到 {min(i + self.max_papers_per_batch, total_papers)} 篇论文...")
-            
+        for round_index in range(retries + 1):
+            # 只剩一篇论文时直接使用单篇提示词
+            if round_index and len(missing) == 1:
+                break
+            if round_index:
+                self.metrics.incr('summary.salvage_requests')
             try:
-                batch_summary = self._process_batch(batch, i + 1)
-                
-                # 验证批次摘要
-                if self._validate_summaries(batch_summary, batch_size):
-                    all_summaries.append(batch_summary)
-                    print(f"批次处理成功: {batch_size}篇论文")
-                else:
-                    print(f"批次验证失败，将逐个处理...")
-                    individual_summary = self._generate_individual_summaries(batch)
-                    all_summaries.append(individual_summary)
-                    
+                matched = self._request_sections(missing, start_index)
             except Exception as e:
                 print(f"批次处理失败: {e}")
-                print(f"将逐个处理这{batch_size}篇论文...")
-                individual_summary = self._generate_individual_summaries(batch)
-                all_summaries.append(individual_summary)
+                break
             
-            # 批次间等待
-            if i + self.max_papers_per_batch < total_papers:
-                print(f"批次处理完成，等待 {LLM_CONFIG['retry_delay']} 秒后继续...")
-                time.sleep(LLM_CONFIG['retry_delay'])
+            sections.update(matched)
+            missing = [paper for paper in missing if split_arxiv_id(paper['entry_id'])[0] not in matched]
+            if not missing:
+                print(f"批次处理成功: 第 {start_index} 到 {start_index + len(batch) - 1} 篇论文")
+                break
+            print(f"批次中 {len(matched)} 篇摘要有效，缺失或格式不完整 {len(missing)} 篇")
+            if round_index < retries and len(missing) > 1:
+                print(f"将这{len(missing)}篇论文合并为一个批次重新请求...")
         
-        final_summary = "\n".join(all_summaries)
+        if missing:
+            print(f"将逐个处理这{len(missing)}篇论文...")
+            self.metrics.incr('summary.fallback_papers', len(missing))
+            for paper, section in zip(missing, self._generate_individual_sections(missing)):
+                sections[split_arxiv_id(paper['entry_id'])[0]] = section
+        return [sections[split_arxiv_id(paper['entry_id'])[0]] for paper in batch]
+
+    def _request_sections(self, papers: List[Dict[str, Any]], start_index: int) -> Dict[str, str]:
+        """请求一批论文的摘要，返回格式完整的章节，以不带版本号的 arXiv ID 为键"""
+        if self.output_format == 'json':
+            return self._generate_json_sections(papers, start_index)
+        return self._match_sections(self._process_batch(papers, start_index), papers)
+
+    def _cache_key(self, paper: Dict[str, Any], model: Optional[str] = None) -> str:
+        """论文摘要的缓存键，model 为生成摘要的模型，默认为主模型"""
+        generation_config = {key: LLM_CONFIG.get(key) for key in GENERATION_CONFIG_KEYS}
+        if self.output_format != 'markdown':
+            # 只在非默认输出模式下加入键中，已有的Markdown模式缓存保持有效
+            generation_config['output_format'] = self.output_format
+        return summary_cache_key(paper, model or self.client.model, PROMPT_VERSION, generation_config)
+
+    def _section_model(self, section: str) -> str:
+        """生成该章节的模型：启用模型路由时取章节中的模型标记，否则为主模型"""
+        match = MODEL_TAG_PATTERN.search(section)
+        return match.group(1) if match else self.client.model
+
+    def _cached_summary(self, paper: Dict[str, Any]) -> Optional[str]:
+        """按主模型、各备用模型的顺序查找论文的缓存摘要"""
+        models = [route.model for route in getattr(self.client, 'routes', ())] or [self.client.model]
+        for model in models:
+            summary = self.cache.get(self._cache_key(paper, model))
+            if summary is not None:
+                return summary
+        return None
+
+    def _is_complete_section(self, section: str) -> bool:
+        """章节包含提示词要求的研究目的和主要发现两项，输出被截断的章节不完整"""
+        return "研究目的" in section and "主要发现" in section
+
+    def _match_sections(self, text: str, papers: List[Dict[str, Any]]) -> Dict[str, str]:
+        """
+        将生成的摘要文本按 ### 标题拆分，并按标题中的 arXiv 链接对应到论文
+
+        只返回格式完整的章节，以不带版本号的 arXiv ID 为键；所有标题都没有可识别的链接、
+        但章节数量与论文数量一致时按顺序对应。
+        """
+        sections = [section.strip() for section in re.split(r'(?m)^(?=###\s)', text)
+                    if section.strip().startswith('###')]
+        wanted = {split_arxiv_id(paper['entry_id'])[0] for paper in papers}
+        matched = {}
+        linked = 0
+        for section in sections:
+            match = re.search(r'\]\((\S+?)\)', section.split('\n', 1)[0])
+            if not match:
+                continue
+            linked += 1
+            arxiv_id = split_arxiv_id(match.group(1))[0]
+            if arxiv_id in wanted and arxiv_id not in matched and self._is_complete_section(section):
+                matched[arxiv_id] = section
+        if not linked and len(sections) == len(papers):
+            for paper, section in zip(papers, sections):
+                if self._is_complete_section(section):
+                    matched[split_arxiv_id(paper['entry_id'])[0]] = section
+        return matched
+
+    def _summarize_and_cache(self, batch: List[Dict[str, Any]], start_index: int) -> List[str]:
+        """
+        生成一批论文的摘要并写入缓存
+
+        Returns:
+            与 batch 一一对应的摘要章节
+        """
+        sections = self._summarize_batch(batch, start_index)
+        if self.journal is not None:
+            # 检查点：失败的论文不记录，恢复运行时重新生成
+            self.journal.add_results(
+                (paper, section) for paper, section in zip(batch, sections) if "**错误信息**" not in section
+            )
+        if self.cache is not None:
+            # 调用失败时生成的错误摘要不写入缓存，下次运行重新生成；
+            # 条目按实际生成该章节的模型（可能是备用模型）计算键并记录
+            self.cache.put_many(
+                (self._cache_key(paper, model), split_arxiv_id(paper['entry_id'])[0], model, PROMPT_VERSION, section)
+                for paper, section, model in ((paper, section, self._section_model(section))
+                                              for paper, section in zip(batch, sections))
+                if "**错误信息**" not in section
+            )
+        return sections
+
+    def _iter_sections(self, papers: Iterable[Dict[str, Any]]) -> Iterator[str]:
+        """
+        按输入顺序逐篇产出论文的摘要章节
+
+        papers 可以是列表，也可以是边检索边产出的迭代器。运行日志中已完成或命中摘要缓存的论文直接使用已有摘要，
+        未命中的论文按 token 预算装满一批即提交到线程池，最多 concurrency 个批次同时生成，
+        未完成的批次达到 2 倍并发数时暂停读取输入；
+        每提交一批就产出前面已经完成的章节，调用方可以在生成过程中增量写入报告。
+        """
+        # 每篇论文一个位置：缓存命中时为摘要文本，否则为 (批次的future, 在批次中的位置)
+        slots = []
+        # 未命中缓存、等待装入批次的论文对应的位置，按输入顺序排列
+        miss_slots = deque()
+        # 下一个要产出的位置
+        next_slot = 0
+        sent = 0
+        cached = 0
+        resumed = 0
+        # 已提交、尚未确认完成的批次，按提交顺序排列
+        pending = deque()
+
+        def misses():
+            nonlocal cached, resumed
+            for paper in papers:
+                summary = None
+                if self.journal is not None:
+                    self.journal.add_paper(paper)
+                    summary = self.journal.completed(paper)
+                    if summary is not None:
+                        resumed += 1
+                        self.metrics.incr('summary.resumed')
+                        slots.append(summary)
+                        continue
+                if self.cache is not None:
+                    summary = self._cached_summary(paper)
+                if summary is not None:
+                    cached += 1
+                    self.metrics.incr('summary.cache_hits')
+                    slots.append(summary)
+                    if self.journal is not None:
+                        self.journal.add_results([(paper, summary)])
+                    continue
+                if self.cache is not None:
+                    self.metrics.incr('summary.cache_misses')
+                miss_slots.append(len(slots))
+                slots.append(None)
+                yield paper
+
+        def ready(wait: bool) -> Iterator[str]:
+            nonlocal next_slot
+            while next_slot < len(slots):
+                slot = slots[next_slot]
+                if slot is None or (not isinstance(slot, str) and not (wait or slot[0].done())):
+                    return
+                # 产出后释放该位置，已写入报告的章节不再留在内存中
+                slots[next_slot] = ""
+                next_slot += 1
+                yield slot if isinstance(slot, str) else slot[0].result()[slot[1]]
+        
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='summary-batch') as executor:
+            # 按 token 预算装满一批即提交
+            for batch in self._create_batch_packer().pack(misses()):
+                start_index = sent + 1
+                sent += len(batch)
+                print(f"\n正在处理第 {start_index} 到 {sent} 篇论文...")
+                self.metrics.incr('summary.batches')
+                future = executor.submit(self._summarize_and_cache, batch, start_index)
+                for position in range(len(batch)):
+                    slots[miss_slots.popleft()] = (future, position)
+                pending.append(future)
+                # 未完成的批次达到 2 倍并发数时先等待最早的批次，避免在模型调用期间把上游论文全部拉进内存
+                while pending and (pending[0].done() or len(pending) >= 2 * self.concurrency):
+                    # 只等待完成，批次的异常在产出对应章节时抛出
+                    pending.popleft().exception()
+                yield from ready(wait=False)
+            
+            yield from ready(wait=True)
+        
+        if resumed:
+            print(f"运行日志: 恢复已完成的 {resumed} 篇论文摘要")
+        if self.cache is not None:
+            print(f"摘要缓存: 命中 {cached} 篇，调用模型生成 {sent} 篇")
+
+    def _generate_batch_summary(self, papers: Iterable[Dict[str, Any]]) -> Tuple[str, int]:
+        """
+        批量生成所有论文的总结，结果按论文的输入顺序拼接
+
+        Returns:
+            (所有摘要拼接后的文本, 论文总数)
+        """
+        all_summaries = list(self._iter_sections(papers))
+        total_papers = len(all_summaries)
+        final_summary = "\n\n".join(summary for summary in all_summaries if summary)
         
         # 最终验证
         if self._validate_summaries(final_summary, total_papers):
@@ -412,45 +1071,114 @@ class PaperSummarizer:
         else:
             print(f"⚠️ 部分论文摘要可能生成失败，请检查结果")
         
-        return final_summary
+        return final_summary, total_papers
+
+    def summarize_papers(self, papers: Iterable[Dict[str, Any]], output_file: str, render_queue: int = 0,
+                         on_section: Optional[Callable[[str], None]] = None,
+                         appendix: Optional[Callable[[], str]] = None) -> bool:
+        """
+        批量处理所有论文并创建Markdown报告
 
-    def summarize_papers(self, papers: List[Dict[str, Any]], output_file: str) -> bool:
-        """批量处理所有论文并创建Markdown报告"""
-        print(f"开始生成论文总结，共 {len(papers)} 篇...")
-        summaries = self._generate_batch_summary(papers)
+        papers 为迭代器时（例如 ArxivClient.iter_papers 的后台预取流），
+        第一批论文到达后即开始生成摘要，检索与摘要生成并行进行。
+        报告增量写入：每篇论文的摘要完成后（按输入顺序）立即追加到输出文件。
+        render_queue 大于0时摘要生成在后台线程中进行，完成的章节经容量为 render_queue 的有界队列交给报告写入。
+        on_section 给出时，每个章节写入报告后按输入顺序传给它（例如分发到各主题的报告）。
+        appendix 给出时，在所有章节写入后调用，返回的内容写在报告尾部之前。
+        返回所有论文是否都成功生成了摘要；有论文的章节为错误摘要时返回 False。
+        """
+        if isinstance(papers, list):
+            print(f"开始生成论文总结，共 {len(papers)} 篇...")
+        else:
+            print("开始生成论文总结，论文将在检索过程中分批处理...")
+        
+        output_md = Path(output_file).with_suffix('.md')
+        writer = ReportWriter(output_md, self._markdown_header(), self._markdown_footer())
+        paper_count = 0
+        heading_count = 0
+        api_success = True
+        model_counts = Counter()
+        sections = self._iter_sections(papers)
+        if render_queue > 0:
+            sections = background_iter(sections, maxsize=render_queue)
+        with writer, self.metrics.stage('summarize'):
+            for section in sections:
+                paper_count += 1
+                heading_count += section.count('###')
+                model_counts.update(MODEL_TAG_PATTERN.findall(section))
+                if "**错误信息**" in section:
+                    # 有论文摘要生成失败时本次运行不完整，调用方保留运行日志、不推进运行记录
+                    api_success = False
+                    self.metrics.incr('summary.errors')
+                writer.write_section(section)
+                if on_section is not None:
+                    on_section(section)
+            if appendix is not None:
+                writer.write_appendix(appendix())
+            writer.close(paper_count, self._format_model_counts(model_counts))
+        self.metrics.incr('summary.papers', paper_count)
         
-        api_success = "[生成失败:" not in summaries
+        if heading_count == paper_count:
+            print(f"✅ 所有{paper_count}篇论文摘要生成完成")
+        else:
+            print(f"摘要验证失败: 期望{paper_count}篇，实际{heading_count}篇")
+            print(f"⚠️ 部分论文摘要可能生成失败，请检查结果")
         if not api_success:
             print("警告: 摘要生成过程中出现错误，结果可能不完整")
 
-        markdown_content = self._generate_markdown(papers, summaries)
-        
-        output_md = Path(output_file).with_suffix('.md')
-        output_md.write_text(markdown_content, encoding='utf-8')
+        if hasattr(self.client, 'delete_context_caches'):
+            self.client.delete_context_caches()
+        if hasattr(self.client, 'connection_stats'):
+            stats = self.client.connection_stats()
+            print(f"API连接统计: 新建 {stats['connections']} 个连接，共 {stats['requests']} 次请求，"
+                  f"复用连接 {stats['reused']} 次")
+
         print(f"Markdown文件已保存：{output_md}")
         
         return api_success
 
-    def _generate_markdown(self, papers: List[Dict[str, Any]], summaries: str) -> str:
-        """生成markdown格式的报告"""
+    def _markdown_header(self, paper_count: Optional[int] = None, models: Optional[str] = None,
+                         title: str = "Arxiv论文总结报告") -> str:
+        """
+        报告头部，未给出论文数量时保留占位符，由 ReportWriter 在结束时回填
+
+        启用模型路由时“使用模型”一项列出各模型生成的篇数，未给出时同样保留占位符。
+        """
         beijing_time = datetime.now(pytz.timezone('Asia/Shanghai')).strftime('%Y-%m-%d %H:%M:%S')
+        count = f"{paper_count} 篇" if paper_count is not None else PAPER_COUNT_PLACEHOLDER
+        if models is None:
+            models = MODELS_PLACEHOLDER if self._routing() else self.client.model
         
-        return f"""# Arxiv论文总结报告
+        return f"""# {title}
 
 ## 基本信息
 - 生成时间: {beijing_time}
-- 使用模型: {self.client.model}
-- 论文数量: {len(papers)} 篇
+- 使用模型: {models}
+- 论文数量: {count}
 
 ---
 
 ## 论文总结
 
-{summaries}
+"""
+
+    def _format_model_counts(self, model_counts: Counter) -> str:
+        """各模型生成的篇数，例如 “gemini-2.5-flash-lite 12 篇，gemini-2.5-flash 3 篇”"""
+        if not model_counts:
+            return self.client.model
+        return "，".join(f"{model} {count} 篇" for model, count in model_counts.most_common())
+
+    def _markdown_footer(self) -> str:
+        return """
 
 ---
 
 ## 生成说明
 - 本报告由AI模型自动生成，摘要内容仅供参考。
 - 如有错误或遗漏，请以原始论文为准。
-"""
\ No newline at end of file
+"""
+
+    def _generate_markdown(self, paper_count: int, summaries: str) -> str:
+        """生成markdown格式的报告"""
+        models = self._format_model_counts(Counter(MODEL_TAG_PATTERN.findall(summaries)))
+        return self._markdown_header(paper_count, models) + summaries + self._markdown_footer()
@@ -0,0 +1,462 @@
+"""
+运行流水线模块 - 一次完整运行的编排：检索 → 过滤 → 摘要生成 → 报告写入 → 网站更新
+
+各阶段在各自的线程中运行，通过有界队列（streaming.background_iter）连接：
+- 检索: ArxivClient.iter_papers 逐页产出论文，元数据逐条追加保存（子查询并发数 fetch_workers）
+- 过滤: 近似重复检测和本地相关性评分（按得分排序时需要等待检索完成）
+- 摘要生成: PaperSummarizer 按 token 预算组批，最多 summarize_workers 个批次同时调用模型
+- 报告写入: 完成的章节按输入顺序增量写入报告
+- 网站更新: 报告写入后清理旧文件、更新首页和归档页面（与 arxivsite 相同）
+
+配置了多个主题（PROFILES）时检索所有主题查询的并集，每篇论文只生成一次摘要，
+过滤阶段丢弃不属于任何主题的论文，报告写入阶段再将章节分发到各主题的报告和网站栏目。
+
+下游较慢时队列写满，上游阶段随之阻塞，内存占用由各队列容量决定：检索到的论文只计数，
+生成了摘要的论文在章节写入时加入近似重复索引，运行结束前只保留其ID、标题和发布日期（用于标记为已总结）。
+cli 和 main.py 只负责解析参数，运行逻辑都在 Pipeline.run 中。
+"""
+import os
+import shutil
+import time
+from collections import deque
+from datetime import datetime
+from itertools import chain
+from pathlib import Path
+from typing import Dict, Any, Callable, Iterable, Iterator, List, Optional
+from src.arxiv_client import ArxivClient
+from src.paper_summarizer import PaperSummarizer, PROMPT_VERSION, MODEL_TAG_PATTERN
+from src.summary_cache import SummaryCache
+from src.batching import TokenEstimator
+from src.paper_store import PaperStore
+from src.streaming import background_iter, iter_batches
+from src.records import JsonlWriter, iter_jsonl
+from src.relevance import RelevanceScorer, keywords_from_query
+from src.profiles import Profile, ProfileReports, load_profiles, union_categories, union_keywords, union_query
+from src.dedup import DedupIndex, format_duplicates_section
+from src.run_journal import RunJournal, load_journal
+from src.site_manager import SiteManager
+from src.metrics import RunMetrics
+from config.settings import (
+    SEARCH_CONFIG, CATEGORIES, QUERY, PROFILES, LLM_CONFIG, RELEVANCE_CONFIG, DEDUP_CONFIG, SUMMARY_CACHE_CONFIG,
+    BATCH_CONFIG, METRICS_CONFIG, PIPELINE_CONFIG, OUTPUT_DIR, STATE_DIR, LAST_RUN_FILE, SEEN_STORE_FILE, METADATA_FILE,
+    DEDUP_INDEX_FILE, SUMMARY_CACHE_FILE, TOKEN_CALIBRATION_FILE, RUN_JOURNAL_FILE
+)
+
+
+# 保存在状态目录中的文件，旧版本写在输出目录中，运行时自动移动到状态目录
+STATE_FILES = (LAST_RUN_FILE, METADATA_FILE, SEEN_STORE_FILE, DEDUP_INDEX_FILE, SUMMARY_CACHE_FILE,
+               TOKEN_CALIBRATION_FILE, RUN_JOURNAL_FILE)
+
+# 被过滤的论文（已见论文存储）和生成了摘要的论文（近似重复索引）每积累这么多篇写入一次
+FLUSH_SIZE = 100
+
+
+def _brief(paper: Dict[str, Any]) -> Dict[str, Any]:
+    """运行结束时更新已见论文存储只需要的字段，不保留摘要原文"""
+    return {'entry_id': paper['entry_id'], 'title': paper.get('title'), 'published': paper.get('published')}
+
+
+class Pipeline:
+    """
+    一次运行的流水线
+
+    arxiv_client 和 model_client 可以注入（例如测试中的本地替身），未给出时按配置创建；
+    各阶段的队列容量和并发数来自 PIPELINE_CONFIG，可以用 config 覆盖部分项。
+    profiles 未给出时使用 PROFILES 中配置的所有主题；主题不为空时 query 和 categories 由各主题的并集代替。
+    报告写入 output_dir（发布到网站），已见论文存储、近似重复索引、摘要缓存、运行记录和运行日志等状态写入 state_dir。
+    """
+
+    def __init__(self, output_dir: str = OUTPUT_DIR, query: str = QUERY, categories: Optional[List[str]] = None,
+                 date_window: bool = False, resume: bool = False, use_summary_cache: bool = True,
+                 clear_summary_cache: bool = False, update_site: Optional[bool] = None,
+                 arxiv_client: Optional[ArxivClient] = None, model_client=None,
+                 metrics: Optional[RunMetrics] = None, config: Optional[Dict[str, Any]] = None,
+                 profiles: Optional[List[Profile]] = None, state_dir: str = STATE_DIR):
+        self.output_dir = output_dir
+        self.state_dir = state_dir
+        self.query = query
+        self.categories = categories if categories is not None else CATEGORIES
+        self.profiles = load_profiles(PROFILES) if profiles is None else profiles
+        if self.profiles:
+            self.query = union_query(self.profiles)
+            self.categories = union_categories(self.profiles)
+        self.date_window = date_window
+        self.resume = resume
+        self.use_summary_cache = use_summary_cache
+        self.clear_summary_cache = clear_summary_cache
+        self.config = {**PIPELINE_CONFIG, **(config or {})}
+        self.update_site = self.config.get('update_site', False) if update_site is None else update_site
+        # 运行指标：检索、模型调用、摘要生成和网站更新共用一个记录器，运行结束后写在报告旁
+        self.metrics = metrics or RunMetrics()
+        if arxiv_client is None:
+            search_config = SEARCH_CONFIG
+            if self.config.get('fetch_workers'):
+                search_config = {**SEARCH_CONFIG, 'max_workers': self.config['fetch_workers']}
+            arxiv_client = ArxivClient(search_config, metrics=self.metrics)
+        self.arxiv_client = arxiv_client
+        self.model_client = model_client
+        self.journal_path = os.path.join(state_dir, RUN_JOURNAL_FILE)
+        self.last_run_file = os.path.join(state_dir, LAST_RUN_FILE)
+        self.calibration_file = os.path.join(state_dir, TOKEN_CALIBRATION_FILE)
+        # 运行中打开的资源，run 结束时关闭
+        self.journal: Optional[RunJournal] = None
+        self.summary_cache: Optional[SummaryCache] = None
+        self.store: Optional[PaperStore] = None
+        self.dedup: Optional[DedupIndex] = None
+        self.metadata_writer: Optional[JsonlWriter] = None
+        self.summarizer: Optional[PaperSummarizer] = None
+        self.estimator: Optional[TokenEstimator] = None
+        # 检索到的论文数量（包括被过滤掉的）和检索顺序中第一篇论文的ID，不保留论文本身
+        self.fetch_count = 0
+        self.latest_entry_id: Optional[str] = None
+        # 交给摘要生成阶段的论文数量
+        self.paper_count = 0
+        # 生成了摘要章节的论文（只保留ID、标题和发布日期），成功后标记为已总结；
+        # 被过滤的论文只标记为已见（注明原因），下次运行重新过滤
+        self.summarized: List[Dict[str, Any]] = []
+        self._pending_rejects: Dict[str, List[Dict[str, Any]]] = {}
+        # 生成了摘要章节、等待写入近似重复索引的论文，每 FLUSH_SIZE 篇写入一次
+        self._pending_index: List[Dict[str, Any]] = []
+        self.output_file: Optional[str] = None
+        # 交给摘要生成阶段、章节尚未写入的论文及其所属的主题，按输入顺序排列，章节写入时取出
+        self.in_flight = deque()
+        self.profile_reports: Optional[ProfileReports] = None
+
+    def run(self) -> bool:
+        """
+        运行整条流水线
+
+        Returns:
+            摘要是否全部成功生成；没有需要生成摘要的论文时返回 True，没有可恢复的运行日志时返回 False
+        """
+        run_start = time.perf_counter()
+        os.makedirs(self.output_dir, exist_ok=True)
+        os.makedirs(self.state_dir, exist_ok=True)
+        self._migrate_state()
+        try:
+            if not self._open_journal():
+                return False
+            self._open_resources()
+            success = self._run()
+        finally:
+            self.close()
+        if self.update_site:
+            self._update_site()
+        if self.output_file is not None and METRICS_CONFIG.get('enabled', True):
+            self._write_metrics(run_start, success)
+        return success
+
+    def _migrate_state(self):
+        """将旧版本写在输出目录中的状态文件移动到状态目录，避免随网站发布"""
+        if os.path.abspath(self.state_dir) == os.path.abspath(self.output_dir):
+            return
+        for name in STATE_FILES:
+            old_path = os.path.join(self.output_dir, name)
+            new_path = os.path.join(self.state_dir, name)
+            if os.path.exists(old_path) and not os.path.exists(new_path):
+                shutil.move(old_path, new_path)
+                print(f"已将状态文件 {name} 从输出目录移动到 {self.state_dir}")
+
+    def _open_journal(self) -> bool:
+        """打开运行日志：每批摘要完成后写入检查点，运行中断后可用 --resume 恢复"""
+        if self.resume:
+            self.journal = RunJournal(self.journal_path, resume=True)
+            if not self.journal.resumable:
+                print(f"没有可恢复的运行日志: {self.journal_path}")
+                self.journal.discard()
+                self.journal = None
+                return False
+        else:
+            if load_journal(self.journal_path).resumable:
+                print("上次运行未完成，其运行日志将被覆盖（如需恢复请使用 --resume）")
+            self.journal = RunJournal(self.journal_path)
+        return True
+
+    def _open_resources(self):
+        # 打开摘要缓存，清理过期条目和旧提示词版本生成的条目
+        if SUMMARY_CACHE_CONFIG.get('enabled', False) and self.use_summary_cache:
+            self.summary_cache = SummaryCache.from_config(os.path.join(self.state_dir, SUMMARY_CACHE_FILE),
+                                                          SUMMARY_CACHE_CONFIG)
+            if self.clear_summary_cache:
+                print(f"已清空摘要缓存，删除 {self.summary_cache.invalidate()} 条")
+            elif SUMMARY_CACHE_CONFIG.get('purge_old_prompts', True):
+                self.summary_cache.invalidate(keep_prompt_version=PROMPT_VERSION)
+            self.summary_cache.evict()
+
+        # token 估计器载入上次运行的校准结果，本次运行中继续校准
+        self.estimator = TokenEstimator.from_config(LLM_CONFIG['model'], BATCH_CONFIG, self.calibration_file)
+        self.summarizer = PaperSummarizer(LLM_CONFIG['api_key'], LLM_CONFIG.get('model'),
+                                          cache=self.summary_cache, estimator=self.estimator,
+                                          journal=self.journal, metrics=self.metrics)
+        if self.model_client is not None:
+            self.summarizer.client = self.model_client
+        if self.config.get('summarize_workers'):
+            self.summarizer.concurrency = max(1, self.config['summarize_workers'])
+
+        # 打开已见论文存储，用于跳过已总结过的论文
+        self.store = PaperStore(os.path.join(self.state_dir, SEEN_STORE_FILE))
+
+        # 打开近似重复索引；索引为空时用历史元数据中已总结的论文建立索引
+        if DEDUP_CONFIG.get('enabled', False):
+            self.dedup = DedupIndex.from_config(os.path.join(self.state_dir, DEDUP_INDEX_FILE), DEDUP_CONFIG)
+            metadata_path = os.path.join(self.state_dir, METADATA_FILE)
+            if len(self.dedup) == 0 and os.path.exists(metadata_path):
+                history = (paper for paper in iter_jsonl(metadata_path)
+                           if self.store.is_summarized(paper['entry_id']))
+                indexed = sum(self.dedup.add(batch) for batch in iter_batches(history, 500))
+                print(f"已用历史元数据建立近似重复索引，共 {indexed} 篇论文")
+
+    def _fetch(self, date_range) -> Iterator[Dict[str, Any]]:
+        """检索阶段：在后台线程中逐页检索，元数据逐条追加保存，通过有界队列交给过滤阶段"""
+        self.metadata_writer = JsonlWriter(os.path.join(self.state_dir, METADATA_FILE))
+
+        def fetch():
+            for paper in self.metadata_writer.tee(self.arxiv_client.iter_papers(
+                    categories=self.categories,
+                    query=self.query,
+                    last_run_file=self.last_run_file,
+                    store=self.store,
+                    date_range=date_range)):
+                if self.latest_entry_id is None:
+                    self.latest_entry_id = paper['entry_id']
+                self.fetch_count += 1
+                yield paper
+
+        maxsize = self.config.get('fetch_queue') or SEARCH_CONFIG.get('page_size', 100) * 2
+        return background_iter(fetch(), maxsize=maxsize)
+
+    def _rejected(self, reason: str) -> Callable[[Dict[str, Any]], None]:
+        """被过滤论文的回调：按批记录为已见并注明原因，不标记为已总结"""
+        pending = self._pending_rejects.setdefault(reason, [])
+
+        def rejected(paper):
+            pending.append(_brief(paper))
+            self.metrics.incr(f'filter.{reason}')
+            if len(pending) >= FLUSH_SIZE:
+                self._flush_rejects()
+
+        return rejected
+
+    def _flush_rejects(self):
+        for reason, papers in self._pending_rejects.items():
+            if papers:
+                self.store.mark_rejected(papers, reason)
+                papers.clear()
+
+    def _match_profiles(self, papers: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        rejected = self._rejected('profile')
+        for paper in papers:
+            if any(profile.matches(paper) for profile in self.profiles):
+                yield paper
+            else:
+                rejected(paper)
+
+    def _filter(self, papers: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        过滤阶段：跳过近似重复论文，按本地相关性评分过滤，按得分排序时相关性最高的论文进入最先生成的批次
+
+        被过滤的论文在已见论文存储中记录原因，下次检索时按当时的配置重新过滤。
+        """
+        if self.dedup is not None:
+            papers = self.dedup.filter(papers, rejected=self._rejected('duplicate'))
+        relevance_config = RELEVANCE_CONFIG
+        if self.profiles:
+            papers = self._match_profiles(papers)
+            # 相关性评分同时使用各主题的关键词，避免只按默认关键词评分时过滤掉其他主题的论文
+            base = RELEVANCE_CONFIG.get('keywords') or keywords_from_query(self.query)
+            relevance_config = {**RELEVANCE_CONFIG, 'keywords': union_keywords(self.profiles, base)}
+        try:
+            if relevance_config.get('enabled', False):
+                scorer = RelevanceScorer.from_config(relevance_config, self.query)
+                if RELEVANCE_CONFIG.get('rank', False) or scorer.top_n:
+                    ranked = scorer.rank(papers, rejected=self._rejected('relevance'))
+                    print(f"相关性评分: 检索到 {self.fetch_count} 篇，保留 {len(ranked)} 篇"
+                          f"（阈值 {scorer.min_score}，上限 {scorer.top_n or '无'}）")
+                    papers = (paper for _, paper in ranked)
+                else:
+                    papers = scorer.filter(papers, rejected=self._rejected('relevance'))
+            yield from papers
+        finally:
+            self._flush_rejects()
+
+    def _candidates(self, date_range) -> Iterator[Dict[str, Any]]:
+        """需要生成摘要的论文流：恢复运行时来自运行日志，否则经过检索和过滤两个阶段"""
+        if self.resume:
+            # 恢复运行：论文列表来自日志（已经过重复检测和相关性评分），不重新检索
+            journal = self.journal
+            print(f"从运行日志恢复: 共 {len(journal.papers)} 篇论文，已完成 {len(journal.results)} 篇")
+            if not journal.fetch_complete:
+                print("中断时论文尚未全部检索，本次只补全日志中记录的论文，其余论文在下次运行时检索")
+            self.fetch_count = len(journal.papers)
+            return iter(journal.papers)
+
+        candidates = background_iter(self._filter(self._fetch(date_range)),
+                                     maxsize=self.config.get('filter_queue', 100))
+
+        def mark_fetched(stream):
+            # 摘要生成阶段取完所有论文后才标记检索完成，此时每篇论文都已记录在运行日志中；
+            # 有子查询出错时检索不完整，不标记
+            yield from stream
+            if not self.arxiv_client.failed_queries:
+                self.journal.mark_fetched()
+
+        return mark_fetched(candidates)
+
+    def _collect(self, papers: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        for paper in papers:
+            self.paper_count += 1
+            names = [profile.name for profile in self.profiles if profile.matches(paper)] if self.profiles else []
+            # 启用近似重复检测时保留完整的论文，章节写入时加入索引；取出后不再保留。
+            # 摘要生成阶段限制了未完成的批次数，in_flight 的长度不超过这些批次与渲染队列中的论文数
+            self.in_flight.append((paper if self.dedup is not None else _brief(paper), names))
+            yield paper
+
+    def _on_section(self, section: str):
+        """
+        报告写入阶段：记录生成了摘要的论文并加入近似重复索引，将章节分发到其论文所属主题的报告
+
+        论文在章节写入后即加入索引，因此同一次运行中稍后检索到的近似重复论文也可能被过滤并链接到本次报告。
+        """
+        paper, names = self.in_flight.popleft()
+        if "**错误信息**" not in section:
+            self.summarized.append(_brief(paper))
+            if self.dedup is not None:
+                self._pending_index.append(paper)
+                if len(self._pending_index) >= FLUSH_SIZE:
+                    self._flush_index()
+        if self.profile_reports is not None:
+            self.profile_reports.write(names, section)
+
+    def _duplicates_section(self) -> str:
+        """报告尾部之前的疑似重复论文章节，所有章节写入后（过滤阶段已结束）由报告写入调用"""
+        if self.dedup is None or not self.dedup.duplicates or not DEDUP_CONFIG.get('link_in_report', True):
+            return ""
+        return format_duplicates_section(self.dedup.duplicates)
+
+    def _flush_index(self):
+        if self._pending_index:
+            self.dedup.add(self._pending_index, report=os.path.basename(self.output_file))
+            self._pending_index = []
+
+    def _run(self) -> bool:
+        # 按时间窗口检索时，窗口起点由上次成功运行的窗口终点决定
+        date_range = None
+        if self.resume:
+            window_end = self.journal.run.get('window_end')
+            window_end = datetime.fromisoformat(window_end) if window_end else None
+        else:
+            if self.date_window:
+                date_range = self.arxiv_client.get_date_window(self.last_run_file)
+            window_end = date_range[1] if date_range else None
+
+        candidates = self._candidates(date_range)
+        first_paper = next(candidates, None)
+        if first_paper is None:
+            if self.arxiv_client.failed_queries:
+                print("检索出错，未找到可生成摘要的论文，未更新运行记录")
+                self.journal.discard()
+                return False
+            if self.fetch_count:
+                print("检索到的论文均为重复论文或未达到相关性阈值，本次不生成摘要")
+                self.arxiv_client.save_last_run_info(self.latest_entry_id, self.last_run_file, 0,
+                                                     window_end=window_end)
+            else:
+                print("未找到符合条件的论文")
+            self.journal.discard()
+            return True
+
+        if self.resume:
+            # 恢复运行时沿用中断运行的报告路径和最新文章ID
+            self.output_file = self.journal.run['output_file']
+            latest_entry_id = self.journal.run['latest_entry_id']
+        else:
+            # 记录最新文章ID（检索顺序中的第一篇）用于在摘要成功后保存
+            latest_entry_id = self.latest_entry_id
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            self.output_file = os.path.join(self.output_dir, f"summary_{timestamp}.md")
+            self.journal.start(output_file=self.output_file, latest_entry_id=latest_entry_id,
+                               window_end=window_end.isoformat() if window_end else None,
+                               model=self.summarizer.client.model, prompt_version=PROMPT_VERSION)
+
+        if self.profiles:
+            summarizer = self.summarizer
+            self.profile_reports = ProfileReports(
+                self.profiles, self.output_file,
+                header=lambda profile: summarizer._markdown_header(title=f"Arxiv论文总结报告 - {profile.title}"),
+                footer=summarizer._markdown_footer(), model_pattern=MODEL_TAG_PATTERN)
+
+        # 摘要生成与报告写入：完成的章节经有界队列交给报告写入
+        try:
+            success = self.summarizer.summarize_papers(self._collect(chain([first_paper], candidates)),
+                                                       self.output_file,
+                                                       render_queue=self.config.get('render_queue', 0),
+                                                       on_section=self._on_section,
+                                                       appendix=self._duplicates_section)
+            if success:
+                print(f"摘要已成功生成并保存到: {self.output_file}")
+            else:
+                print(f"摘要生成过程中出现错误，结果可能不完整: {self.output_file}")
+        except Exception as e:
+            print(f"生成摘要时发生错误: {e}")
+            success = False
+        if self.arxiv_client.failed_queries:
+            print(f"{len(self.arxiv_client.failed_queries)} 个子查询检索出错，本次检索结果不完整")
+            success = False
+        print(f"本次共处理 {self.paper_count} 篇新论文")
+        if self.dedup is not None:
+            self._flush_index()
+        if self.profile_reports is not None:
+            for name, count in self.profile_reports.close(self.summarizer._format_model_counts).items():
+                self.metrics.incr(f'profile.{name}.papers', count)
+                print(f"主题 {name}: {count} 篇，报告: {self.profile_reports.path(self.profile_reports.profiles[name])}")
+
+        if self.estimator.samples:
+            self.estimator.save(self.calibration_file)
+        if self.dedup is not None and self.dedup.duplicates:
+            print(f"跳过 {len(self.dedup.duplicates)} 篇疑似重复论文")
+
+        # 只有在摘要成功生成后才保存最新文章ID，并将生成了摘要章节的论文标记为已总结
+        # 被过滤的论文已在过滤阶段记录为已见，不标记为已总结，修改阈值、关键词或 top_n 后可以重新入选
+        # 恢复运行时，中断前论文未全部检索则只标记已总结的论文，不更新运行记录，剩余论文下次运行时检索
+        if success and latest_entry_id:
+            if self.journal.fetch_complete:
+                self.arxiv_client.save_last_run_info(latest_entry_id, self.last_run_file, self.paper_count,
+                                                     window_end=window_end)
+            self.store.mark_summarized(self.summarized)
+            self.journal.discard()
+            print(f"摘要成功生成，已更新运行记录。下次运行将从最新文章 ID 开始: {latest_entry_id}")
+        else:
+            self.journal.close()
+            print("由于摘要生成不完整或失败，未更新运行记录，下次运行将继续尝试获取这些论文。")
+            print(f"已完成的摘要保存在运行日志中，可使用 --resume 恢复: {self.journal_path}")
+        return success
+
+    def _write_metrics(self, run_start: float, success: bool):
+        self.metrics.add_time('run', time.perf_counter() - run_start)
+        self.metrics.set_info(model=self.summarizer.client.model, prompt_version=PROMPT_VERSION,
+                              output_format=self.summarizer.output_format,
+                              report=os.path.basename(self.output_file), resumed=self.resume, success=success)
+        if self.profiles:
+            self.metrics.set_info(profiles=",".join(profile.name for profile in self.profiles))
+        metrics_file = Path(self.output_file).with_suffix('.metrics.json')
+        self.metrics.write_json(metrics_file)
+        if METRICS_CONFIG.get('prometheus', False):
+            self.metrics.write_prometheus(metrics_file.with_suffix('.prom'))
+        print(f"运行指标已保存到: {metrics_file}")
+
+    def _update_site(self):
+        """网站更新阶段：依赖完整的报告，在报告写入完成后进行"""
+        print("\n正在更新网站...")
+        sections = [(profile.title, profile.name) for profile in self.profiles]
+        site = SiteManager(self.output_dir, self.config.get('github_dir'), metrics=self.metrics, sections=sections)
+        site.update(self.config.get('site_days', 30))
+
+    def close(self):
+        if self.metadata_writer is not None:
+            self.metadata_writer.close()
+            print(f"元数据已保存到: {self.metadata_writer.path}")
+            self.metadata_writer = None
+        for resource in (self.store, self.dedup, self.summary_cache):
+            if resource is not None:
+                resource.close()
+        self.store = self.dedup = self.summary_cache = None
@@ -0,0 +1,134 @@
+"""
+多主题模块 - 一次运行覆盖多个主题（分类 + 查询）
+
+检索所有主题查询的并集，每篇论文只生成一次摘要；完成的章节按论文所属的主题分发到各主题的报告，
+报告位于输出目录下以主题名命名的子目录中，由 SiteManager 生成各自的首页和归档页面（网站栏目）。
+论文是否属于某个主题在本地判断：分类有交集，且标题/摘要命中该主题的关键词。
+"""
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Any, Callable, Iterable, List, Mapping, Optional
+from src.relevance import RelevanceScorer, keywords_from_query
+from src.report_writer import ReportWriter
+
+
+class Profile:
+    """
+    一个主题
+
+    keywords: 判断论文是否属于该主题的关键词及权重，None表示从 query 中提取；query 为空时只按分类判断
+    min_score: 关键词得分阈值，0表示命中任意关键词即可
+    """
+
+    def __init__(self, name: str, categories: Iterable[str] = (), query: str = "", title: Optional[str] = None,
+                 keywords: Optional[Mapping[str, float]] = None, min_score: float = 0.0):
+        self.name = name
+        self.title = title or name
+        self.categories = [cat for cat in categories if cat]
+        self.query = query or ""
+        self.keywords = dict(keywords) if keywords else keywords_from_query(self.query)
+        self.min_score = min_score
+        self._scorer = RelevanceScorer(self.keywords) if self.keywords else None
+
+    @classmethod
+    def from_config(cls, name: str, config: Dict[str, Any]) -> 'Profile':
+        return cls(name, config.get('categories', ()), config.get('query', ""), config.get('title'),
+                   config.get('keywords'), config.get('min_score', 0.0))
+
+    def matches(self, paper: Mapping) -> bool:
+        """论文是否属于该主题；没有分类信息的论文只按关键词判断"""
+        categories = paper.get('categories') or ()
+        if self.categories and categories and not set(self.categories) & set(categories):
+            return False
+        if self._scorer is None:
+            return True
+        score = self._scorer.score(paper)
+        return score > 0 and score >= self.min_score
+
+
+def load_profiles(config: Mapping[str, Dict[str, Any]], names: Optional[Iterable[str]] = None) -> List[Profile]:
+    """按 PROFILES 配置创建主题，names 给出时只保留这些主题（按配置中的顺序）"""
+    if names is not None:
+        names = set(names)
+        unknown = names - set(config)
+        if unknown:
+            raise ValueError(f"未配置的主题: {', '.join(sorted(unknown))}")
+    return [Profile.from_config(name, spec) for name, spec in config.items() if names is None or name in names]
+
+
+def union_categories(profiles: Iterable[Profile]) -> List[str]:
+    """所有主题分类的并集（保持首次出现的顺序）；任一主题不限分类时返回空列表，即不限分类"""
+    categories = {}
+    for profile in profiles:
+        if not profile.categories:
+            return []
+        categories.update(dict.fromkeys(profile.categories))
+    return list(categories)
+
+
+def union_query(profiles: Iterable[Profile]) -> str:
+    """
+    所有主题查询的并集；任一主题不限查询时返回空字符串，即只按分类检索
+
+    各查询都是 OR 连接的关键词时合并去重为一个 OR 查询（split_by='keyword' 时仍可拆分），否则用括号包裹后 OR 连接。
+    """
+    queries = []
+    for profile in profiles:
+        if not profile.query.strip():
+            return ""
+        queries.append(profile.query.strip())
+    if all(not re.search(r'[()]|\bAND(NOT)?\b', query) for query in queries):
+        terms = dict.fromkeys(term.strip() for query in queries for term in re.split(r'\s+OR\s+', query))
+        return " OR ".join(term for term in terms if term)
+    return " OR ".join(f"({query})" for query in queries)
+
+
+def union_keywords(profiles: Iterable[Profile], base: Mapping[str, float]) -> Dict[str, float]:
+    """相关性评分使用的关键词：base 与各主题关键词的并集，同一关键词取较大的权重"""
+    keywords = dict(base)
+    for profile in profiles:
+        for term, weight in profile.keywords.items():
+            keywords[term] = max(keywords.get(term, weight), weight)
+    return keywords
+
+
+class ProfileReports:
+    """
+    各主题的报告
+
+    write(paper_profiles, section) 将摘要章节追加到其所属主题的报告；报告在主题收到第一篇论文时创建，
+    路径为 <输出目录>/<主题名>/<汇总报告文件名>。header(profile) 返回该主题报告的头部模板。
+    """
+
+    def __init__(self, profiles: Iterable[Profile], output_file: str, header: Callable[[Profile], str], footer: str,
+                 model_pattern: Optional[re.Pattern] = None):
+        self.profiles = {profile.name: profile for profile in profiles}
+        self.output_file = Path(output_file)
+        self.header = header
+        self.footer = footer
+        self.model_pattern = model_pattern
+        self.writers: Dict[str, ReportWriter] = {}
+        self.model_counts: Dict[str, Counter] = {}
+
+    def path(self, profile: Profile) -> Path:
+        return self.output_file.parent / profile.name / self.output_file.name
+
+    def write(self, names: Iterable[str], section: str):
+        for name in names:
+            writer = self.writers.get(name)
+            if writer is None:
+                profile = self.profiles[name]
+                writer = self.writers[name] = ReportWriter(self.path(profile), self.header(profile), self.footer)
+                self.model_counts[name] = Counter()
+            writer.write_section(section)
+            if self.model_pattern is not None:
+                self.model_counts[name].update(self.model_pattern.findall(section))
+
+    def close(self, format_models: Callable[[Counter], str]) -> Dict[str, int]:
+        """回填各报告的论文数量和模型篇数并关闭，返回各主题的论文数量"""
+        counts = {}
+        for name, writer in self.writers.items():
+            writer.close(writer.sections, format_models(self.model_counts[name]))
+            counts[name] = writer.sections
+        return counts
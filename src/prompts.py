@@ -0,0 +1,101 @@
+"""
+提示词模板模块 - 摘要生成使用的系统指令和用户提示词
+
+固定的输出格式和关键指令作为系统指令（systemInstruction）发送，批量请求和单篇备选请求共用同一份；
+用户提示词只包含论文信息。系统指令在一次运行中保持不变，后端支持时由 ModelClient 注册为缓存上下文，
+每次调用只引用缓存。修改任何模板时必须递增 PROMPT_VERSION，旧模板生成的缓存摘要随之失效。
+"""
+from typing import Dict, Any, Callable
+
+PROMPT_VERSION = "3"
+
+MARKDOWN_SYSTEM_INSTRUCTION = """请为用户提供的来自ArXiv的论文生成中文总结。每篇论文的总结都需要遵循严格的Markdown格式。
+
+**必须遵循的输出格式:**
+对于每一篇论文，你的输出必须是以下格式，不得有任何变动：
+
+### [论文标题](论文的arXiv链接)
+<!-- 论文发布日期，格式：YYYY-MM-DD -->
+**📅 发布日期**: 论文发布日期(YYYY-MM-DD格式)
+
+* **👥 作者**: 作者名
+* **🎯 研究目的**: 详细描述研究的背景、动机和核心目标，包括解决的问题和研究意义。
+* **⭐ 主要发现**: 详细阐述论文的核心贡献、创新点、实验结果和理论突破，以及对领域的潜在影响。
+
+---
+
+**关键指令:**
+1.  **无需序号**: 论文标题前不需要添加序号，序号将由网站页面动态生成。
+2.  **链接格式**: 论文标题必须作为可点击的Markdown链接，格式为 `[标题](链接)`。
+3.  **日期注释**: 在标题下方，必须插入HTML注释 `<!-- YYYY-MM-DD -->` 来标记发布日期，格式严格为YYYY-MM-DD。
+4.  **可见日期**: 在HTML注释后，必须添加可见的日期行：`**📅 发布日期**: YYYY-MM-DD`。
+5.  **内容丰富**: "研究目的"应包含研究背景、动机和目标；"主要发现"应详细描述核心贡献、创新点和实验结果。
+6.  **分隔符**: 每篇论文总结之后，必须使用 `---` 作为分隔符。
+7.  **语言**: 所有输出内容必须为中文。
+8.  **数学公式**: 你可以自由使用LaTeX语法（例如 `$E=mc^2$`）来表示数学公式。
+9.  **完整性**: 必须为每篇论文生成完整的摘要，不得遗漏任何一篇。
+"""
+
+JSON_SYSTEM_INSTRUCTION = """请为用户提供的来自ArXiv的论文生成中文总结，以JSON数组返回，每篇论文一个对象：
+- "id": 论文信息中给出的ID，原样填写。
+- "purpose": 研究目的，详细描述研究的背景、动机和核心目标，包括解决的问题和研究意义。
+- "findings": 主要发现，详细阐述论文的核心贡献、创新点、实验结果和理论突破，以及对领域的潜在影响。
+
+**关键指令:**
+1.  **完整性**: 必须为每篇论文返回一个对象，不得遗漏任何一篇。
+2.  **只写内容**: 不要输出标题、作者、日期、链接或Markdown标题，这些信息会自动补全。
+3.  **语言**: 所有内容必须为中文，可以使用LaTeX语法（例如 `$E=mc^2$`）表示数学公式。
+"""
+
+SYSTEM_INSTRUCTIONS = {
+    'markdown': MARKDOWN_SYSTEM_INSTRUCTION,
+    'json': JSON_SYSTEM_INSTRUCTION,
+}
+
+USER_PROMPTS = {
+    'markdown': "请为以下{count}篇来自ArXiv的论文生成中文总结。\n\n**需要你处理的论文信息如下:**\n{papers}\n",
+    'json': "请为以下{count}篇来自ArXiv的论文生成中文总结，以JSON数组返回。\n\n**需要你处理的论文信息如下:**\n{papers}\n",
+}
+
+# 单篇论文的信息，JSON模式下只提供ID、标题和摘要
+PAPER_BLOCKS = {
+    'markdown': """
+---
+论文 {index}:
+- 标题: {title}
+- 作者: {authors}
+- 发布日期: {published}
+- arXiv链接: {entry_id}
+- 摘要: {summary}
+""",
+    'json': """
+---
+论文 {index}:
+- ID: {arxiv_id}
+- 标题: {title}
+- 摘要: {summary}
+""",
+}
+
+
+def system_instruction(output_format: str) -> str:
+    """输出模式对应的系统指令"""
+    return SYSTEM_INSTRUCTIONS[output_format]
+
+
+def user_prompt(paper_blocks: str, count: int, output_format: str) -> str:
+    """包含论文信息的用户提示词，paper_blocks 为 paper_block 拼接的结果"""
+    return USER_PROMPTS[output_format].format(count=count, papers=paper_blocks)
+
+
+def paper_block(paper: Dict[str, Any], index: int, summary: str, arxiv_id: str, output_format: str) -> str:
+    """用户提示词中单篇论文的信息，summary 为（可能截断的）摘要原文"""
+    return PAPER_BLOCKS[output_format].format(
+        index=index,
+        title=paper['title'],
+        authors=', '.join(paper['authors']),
+        published=paper['published'][:10],
+        entry_id=paper['entry_id'],
+        arxiv_id=arxiv_id,
+        summary=summary,
+    )
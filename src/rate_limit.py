@@ -0,0 +1,209 @@
+"""
+请求限速工具模块
+"""
+import re
+import threading
+import time
+import weakref
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Optional
+
+
+class IntervalRateLimiter:
+    """
+    在多个线程之间共享的最小间隔限速器
+
+    保证任意两次请求的发起时间至少间隔 min_interval 秒，
+    适用于 arXiv API “每3秒不超过一次请求”的礼貌访问要求。
+    """
+
+    def __init__(self, min_interval: float = 3.0):
+        self.min_interval = max(0.0, float(min_interval))
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self) -> float:
+        """阻塞直到可以发起下一次请求，返回实际等待的秒数"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.min_interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+def _release_when_consumed(response, release: Callable[[], None]):
+    """
+    流式响应读完、关闭或被回收时调用一次 release
+
+    替换实例的 iter_content 和 close：requests 的 content、text、json() 和 iter_lines() 都经由 iter_content 读取。
+    替换的方法通过弱引用访问响应，不形成引用环，未关闭的响应在被回收时同样会释放。
+    """
+    lock = threading.Lock()
+    released = False
+
+    def release_once():
+        nonlocal released
+        with lock:
+            if released:
+                return
+            released = True
+        release()
+
+    cls = type(response)
+    ref = weakref.ref(response)
+
+    def iter_content(*args, **kwargs):
+        try:
+            yield from cls.iter_content(ref(), *args, **kwargs)
+        finally:
+            release_once()
+
+    def close():
+        try:
+            cls.close(ref())
+        finally:
+            release_once()
+
+    response.iter_content = iter_content
+    response.close = close
+    weakref.finalize(response, release_once)
+
+
+class ThrottledSession:
+    """
+    包装 requests 会话，每次请求前先从共享限速器领取请求时隙
+
+    max_concurrent 限制同时进行中的请求数，None 表示不限制。stream=True 的请求返回时只读取了响应头，
+    并发名额保留到响应体读完或响应被关闭为止。
+    """
+
+    def __init__(self, session, limiter: IntervalRateLimiter, max_concurrent: Optional[int] = None):
+        self.session = session
+        self.limiter = limiter
+        self._slots = threading.BoundedSemaphore(max_concurrent) if max_concurrent else None
+
+    def _throttled(self, send, url: str, **kwargs):
+        if self._slots is None:
+            self.limiter.wait()
+            return send(url, **kwargs)
+        self._slots.acquire()
+        try:
+            self.limiter.wait()
+            response = send(url, **kwargs)
+        except BaseException:
+            self._slots.release()
+            raise
+        if kwargs.get('stream'):
+            _release_when_consumed(response, self._slots.release)
+        else:
+            self._slots.release()
+        return response
+
+    def get(self, url: str, **kwargs):
+        return self._throttled(self.session.get, url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        return self._throttled(self.session.post, url, **kwargs)
+
+    def delete(self, url: str, **kwargs):
+        return self._throttled(self.session.delete, url, **kwargs)
+
+
+class TokenBucketLimiter:
+    """
+    按每分钟请求数（RPM）和每分钟 token 数（TPM）限速的双令牌桶，在所有并发调用方之间共享
+
+    两个桶的容量均为一分钟的配额并按速率持续补充，acquire() 阻塞直到两个桶都有足够余量；
+    请求完成后可用 adjust() 按实际 token 用量修正预估值。收到限流响应时 pause() 让所有调用方
+    一起等待服务器给出的时间。rpm / tpm 为 None 表示不限制。
+    """
+
+    def __init__(self, requests_per_minute: Optional[float] = None,
+                 tokens_per_minute: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.rpm = requests_per_minute or None
+        self.tpm = tokens_per_minute or None
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._requests = float(self.rpm or 0)
+        self._tokens = float(self.tpm or 0)
+        self._updated = clock()
+        self._paused_until = 0.0
+
+    def _refill(self, now: float):
+        elapsed = max(0.0, now - self._updated)
+        self._updated = now
+        if self.rpm:
+            self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60)
+        if self.tpm:
+            self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60)
+
+    def acquire(self, tokens: float = 0) -> float:
+        """阻塞直到可以发起一次消耗 tokens 个 token 的请求，返回实际等待的秒数"""
+        if self.tpm:
+            # 单次请求超过整个桶的容量时按满桶计算，避免永远等待
+            tokens = min(tokens, self.tpm)
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._refill(now)
+                delay = self._paused_until - now
+                if delay <= 0:
+                    need_requests = (1 - self._requests) * 60 / self.rpm if self.rpm else 0
+                    need_tokens = (tokens - self._tokens) * 60 / self.tpm if self.tpm else 0
+                    delay = max(need_requests, need_tokens)
+                    if delay <= 0:
+                        if self.rpm:
+                            self._requests -= 1
+                        if self.tpm:
+                            self._tokens -= tokens
+                        return waited
+            self._sleep(delay)
+            waited += delay
+
+    def adjust(self, tokens: float):
+        """按实际用量修正 token 桶：正数为补扣，负数为返还"""
+        if not self.tpm:
+            return
+        with self._lock:
+            self._refill(self._clock())
+            self._tokens = min(self.tpm, self._tokens - tokens)
+
+    def pause(self, seconds: float):
+        """在 seconds 秒内暂停所有调用方，用于遵守服务器返回的 Retry-After"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, self._clock() + seconds)
+
+
+def retry_after_seconds(response) -> Optional[float]:
+    """
+    从限流响应中解析服务器要求的等待秒数
+
+    依次检查 Retry-After 头（秒数或HTTP日期）和 Google API 错误详情中 RetryInfo 的 retryDelay（如 "23s"），
+    都没有时返回None。
+    """
+    value = (response.headers.get('Retry-After') or "").strip()
+    if value:
+        if re.fullmatch(r'\d+(\.\d+)?', value):
+            return float(value)
+        try:
+            return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            pass
+    try:
+        details = response.json().get('error', {}).get('details', [])
+    except (ValueError, AttributeError):
+        return None
+    for detail in details if isinstance(details, list) else []:
+        delay = detail.get('retryDelay') if isinstance(detail, dict) else None
+        match = re.fullmatch(r'(\d+(?:\.\d+)?)s', delay or "")
+        if match:
+            return float(match.group(1))
+    return None
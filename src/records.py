@@ -0,0 +1,161 @@
+"""
+论文记录模块 - 紧凑的论文元数据类型以及JSONL流式读写
+"""
+import gzip
+import json
+import sys
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Dict, Any, Iterable, Iterator, Optional, Union
+
+# 论文元数据字段，顺序与 ArxivClient 生成的元数据字典一致
+PAPER_FIELDS = (
+    'title', 'authors', 'published', 'updated', 'summary', 'doi',
+    'primary_category', 'categories', 'links', 'pdf_url', 'entry_id', 'comment',
+)
+
+# 以列表形式保存的字段，记录中使用元组存储
+_SEQUENCE_FIELDS = ('authors', 'categories', 'links')
+
+
+class PaperRecord(Mapping):
+    """
+    论文元数据记录
+
+    使用 __slots__ 存储字段，不为每条记录创建 __dict__；列表字段保存为元组，分类名称驻留复用。
+    实现只读 Mapping 接口，原有按 paper['title'] / paper.get('doi') 访问字典的代码可以直接使用。
+    """
+
+    __slots__ = PAPER_FIELDS
+
+    def __init__(self, title: str = "", authors: Iterable[str] = (), published: str = "",
+                 updated: str = "", summary: str = "", doi: Optional[str] = None,
+                 primary_category: str = "", categories: Iterable[str] = (),
+                 links: Iterable[str] = (), pdf_url: Optional[str] = None,
+                 entry_id: str = "", comment: Optional[str] = None):
+        self.title = title
+        self.authors = tuple(authors or ())
+        self.published = published
+        self.updated = updated
+        self.summary = summary
+        self.doi = doi
+        self.primary_category = sys.intern(primary_category) if primary_category else primary_category
+        self.categories = tuple(sys.intern(cat) for cat in categories or ())
+        self.links = tuple(links or ())
+        self.pdf_url = pdf_url
+        self.entry_id = entry_id
+        self.comment = comment
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in PAPER_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(PAPER_FIELDS)
+
+    def __len__(self) -> int:
+        return len(PAPER_FIELDS)
+
+    def __repr__(self) -> str:
+        return f"PaperRecord(entry_id={self.entry_id!r}, title={self.title!r})"
+
+    def __getstate__(self):
+        return tuple(getattr(self, field) for field in PAPER_FIELDS)
+
+    def __setstate__(self, state):
+        for field, value in zip(PAPER_FIELDS, state):
+            setattr(self, field, value)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为可JSON序列化的字典，元组字段转换为列表"""
+        data = {field: getattr(self, field) for field in PAPER_FIELDS}
+        for field in _SEQUENCE_FIELDS:
+            data[field] = list(data[field])
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'PaperRecord':
+        """从字典创建记录，忽略未知字段"""
+        return cls(**{field: data[field] for field in PAPER_FIELDS if field in data})
+
+
+def to_json_dict(paper: Mapping) -> Dict[str, Any]:
+    """将 PaperRecord 或普通字典转换为可JSON序列化的字典"""
+    if isinstance(paper, PaperRecord):
+        return paper.to_dict()
+    return dict(paper)
+
+
+def _open_text(path: Path, mode: str, compress: bool):
+    if compress:
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+class JsonlWriter:
+    """
+    追加写入的JSONL论文记录文件，文件名以 .gz 结尾时使用gzip压缩
+
+    每条记录一行，写入过程中崩溃最多丢失最后一行；gzip 追加写入会产生多成员压缩流，读取时透明支持。
+    """
+
+    def __init__(self, path: Union[str, Path], compress: Optional[bool] = None, flush_every: int = 100):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.compress = self.path.suffix == '.gz' if compress is None else compress
+        self.flush_every = flush_every
+        self.count = 0
+        self._file = _open_text(self.path, 'a', self.compress)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def write(self, paper: Mapping):
+        self._file.write(json.dumps(to_json_dict(paper), ensure_ascii=False))
+        self._file.write("\n")
+        self.count += 1
+        if self.flush_every and self.count % self.flush_every == 0:
+            self._file.flush()
+
+    def write_many(self, papers: Iterable[Mapping]):
+        for paper in papers:
+            self.write(paper)
+
+    def tee(self, papers: Iterable[Mapping]) -> Iterator[Mapping]:
+        """边写入边产出记录，用于在检索过程中增量保存元数据"""
+        for paper in papers:
+            self.write(paper)
+            yield paper
+        self.flush()
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+
+def iter_jsonl(path: Union[str, Path], compress: Optional[bool] = None) -> Iterator[PaperRecord]:
+    """惰性读取JSONL论文记录文件，跳过空行和写入中断导致的不完整行"""
+    path = Path(path)
+    compress = path.suffix == '.gz' if compress is None else compress
+    with _open_text(path, 'r', compress) as f:
+        try:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    data = json.loads(line)
+                except json.JSONDecodeError:
+                    print(f"跳过无法解析的记录: {path}:{line_number}")
+                    continue
+                yield PaperRecord.from_dict(data)
+        except EOFError:
+            # 写入中断时 gzip 流的最后一个成员不完整
+            print(f"文件末尾不完整，已读取到中断位置: {path}")
@@ -0,0 +1,127 @@
+"""
+相关性评分模块 - 在调用语言模型之前按关键词加权命中对论文进行本地评分与排序
+"""
+import heapq
+import math
+import re
+from collections.abc import Mapping
+from typing import Callable, Dict, List, Iterable, Iterator, Optional, Tuple, Union
+
+# 关键词配置既可以是 {关键词: 权重} 字典，也可以是关键词列表（权重均为1）
+KeywordSpec = Union[Mapping, Iterable[str]]
+# 过滤掉的论文的回调
+Rejected = Callable[[Mapping], None]
+
+
+def keywords_from_query(query: str) -> Dict[str, float]:
+    """从 arXiv 查询字符串中提取关键词，忽略布尔运算符和字段前缀"""
+    terms = {}
+    for token in re.findall(r'(?:\w+:)?"[^"]+"|[^\s()]+', query or ""):
+        if token.upper() in ('AND', 'OR', 'ANDNOT', 'NOT'):
+            continue
+        token = re.sub(r'^\w+:', '', token).strip('"')
+        if token:
+            terms[token] = 1.0
+    return terms
+
+
+def _term_pattern(term: str) -> str:
+    """将关键词转换为正则表达式：空白和连字符可互换匹配，末尾 * 表示前缀匹配"""
+    prefix = term.endswith('*')
+    words = re.split(r'[\s\-]+', term.rstrip('*').strip())
+    pattern = r'[\s\-]+'.join(re.escape(word) for word in words if word)
+    return r'\b' + pattern + (r'\w*' if prefix else r'\b')
+
+
+class RelevanceScorer:
+    """
+    基于加权关键词命中的相关性评分器
+
+    所有关键词编译为一个带命名分组的正则表达式，每个文本只扫描一次即可得到全部命中；
+    标题命中与摘要命中分别加权，摘要中同一关键词的重复命中按对数递减计分，避免堆砌关键词的摘要得分过高。
+    """
+
+    def __init__(self, keywords: KeywordSpec, title_weight: float = 3.0,
+                 abstract_weight: float = 1.0, min_score: float = 0.0,
+                 top_n: Optional[int] = None):
+        if not isinstance(keywords, Mapping):
+            keywords = {term: 1.0 for term in keywords}
+        self.terms: List[str] = [term for term in keywords if term and term.strip('*').strip()]
+        self.weights: List[float] = [float(keywords[term]) for term in self.terms]
+        self.title_weight = title_weight
+        self.abstract_weight = abstract_weight
+        self.min_score = min_score
+        self.top_n = top_n
+
+        # 较长的关键词排在前面，重叠时优先匹配更具体的短语（如 "spiking neural network" 优先于 "spiking"）
+        order = sorted(range(len(self.terms)), key=lambda i: -len(self.terms[i]))
+        alternatives = [f"(?P<t{i}>{_term_pattern(self.terms[i])})" for i in order]
+        self._pattern = re.compile('|'.join(alternatives), re.IGNORECASE) if alternatives else None
+
+    @classmethod
+    def from_config(cls, config: Dict, query: str = "") -> 'RelevanceScorer':
+        """根据 RELEVANCE_CONFIG 创建评分器，未配置关键词时从检索查询中提取"""
+        keywords = config.get('keywords') or keywords_from_query(query)
+        return cls(
+            keywords,
+            title_weight=config.get('title_weight', 3.0),
+            abstract_weight=config.get('abstract_weight', 1.0),
+            min_score=config.get('min_score', 0.0),
+            top_n=config.get('top_n'),
+        )
+
+    def _hits(self, text: str) -> Dict[int, int]:
+        """统计文本中每个关键词的命中次数"""
+        counts: Dict[int, int] = {}
+        if self._pattern is None or not text:
+            return counts
+        for match in self._pattern.finditer(text):
+            index = int(match.lastgroup[1:])
+            counts[index] = counts.get(index, 0) + 1
+        return counts
+
+    def score(self, paper: Mapping) -> float:
+        """计算单篇论文的相关性得分"""
+        score = 0.0
+        for index in self._hits(paper.get('title') or ""):
+            score += self.weights[index] * self.title_weight
+        for index, count in self._hits(paper.get('summary') or "").items():
+            score += self.weights[index] * self.abstract_weight * (1 + math.log(count))
+        return round(score, 4)
+
+    def filter(self, papers: Iterable[Mapping], rejected: Optional[Rejected] = None) -> Iterator[Mapping]:
+        """流式过滤：只产出得分不低于阈值的论文，保持原有顺序；低于阈值的论文传给 rejected（如果给出）"""
+        for paper in papers:
+            if self.score(paper) >= self.min_score:
+                yield paper
+            elif rejected is not None:
+                rejected(paper)
+
+    def rank(self, papers: Iterable[Mapping], rejected: Optional[Rejected] = None) -> List[Tuple[float, Mapping]]:
+        """
+        对论文评分、过滤并按得分从高到低排序
+
+        设置 top_n 时只保留得分最高的 N 篇；得分相同的论文保持输入顺序（即检索结果的时间顺序）。
+        低于阈值或超出 top_n 的论文传给 rejected（如果给出）。
+
+        Returns:
+            [(得分, 论文), ...]
+        """
+        kept = []
+        for index, paper in enumerate(papers):
+            score = self.score(paper)
+            if score >= self.min_score:
+                kept.append((score, index, paper))
+            elif rejected is not None:
+                rejected(paper)
+        key = lambda item: (-item[0], item[1])
+        if self.top_n:
+            ranked = heapq.nsmallest(self.top_n, kept, key=key)
+            if rejected is not None and len(ranked) < len(kept):
+                chosen = {index for _, index, _ in ranked}
+                for _, index, paper in kept:
+                    if index not in chosen:
+                        rejected(paper)
+        else:
+            ranked = sorted(kept, key=key)
+        return [(score, paper) for score, _, paper in ranked]
@@ -0,0 +1,80 @@
+"""
+报告写入模块 - 增量写入Markdown摘要报告
+
+先写入报告头部，每篇论文的摘要章节完成后立即追加并刷新到磁盘，最后写入尾部。
+论文总数和各模型生成的篇数在流式处理结束前未知，头部为其预留固定宽度的位置，结束时原地回填。
+"""
+import re
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+# 头部模板中论文数量的占位符
+PAPER_COUNT_PLACEHOLDER = "{paper_count}"
+# 头部模板中各模型生成篇数的占位符（启用模型路由时使用）
+MODELS_PLACEHOLDER = "{models}"
+
+
+class ReportWriter:
+    """
+    增量写入的Markdown报告
+
+    header 中的 {paper_count} 和 {models} 占位符写为等宽空白，close() 时回填；
+    回填值用空格补齐到预留宽度，行尾空格不影响Markdown渲染，超出宽度时截断。
+    """
+
+    COUNT_WIDTH = 16
+    MODELS_WIDTH = 240
+
+    def __init__(self, path: Union[str, Path], header: str, footer: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.footer = footer
+        self.sections = 0
+        self._file = open(self.path, 'wb')
+        widths = {PAPER_COUNT_PLACEHOLDER: self.COUNT_WIDTH, MODELS_PLACEHOLDER: self.MODELS_WIDTH}
+        # 占位符 -> (文件中的偏移, 预留宽度)
+        self._slots: Dict[str, tuple] = {}
+        pattern = "|".join(re.escape(placeholder) for placeholder in widths)
+        for part in re.split(f"({pattern})", header):
+            if part in widths and part not in self._slots:
+                self._slots[part] = (self._file.tell(), widths[part])
+                self._file.write(b" " * widths[part])
+            else:
+                self._file.write(part.encode('utf-8'))
+        self._file.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if not self._file.closed:
+            self._file.close()
+
+    def write_section(self, section: str):
+        """追加一篇论文的摘要章节并立即刷新"""
+        if not section:
+            return
+        if self.sections:
+            self._file.write(b"\n\n")
+        self._file.write(section.encode('utf-8'))
+        self._file.flush()
+        self.sections += 1
+
+    def write_appendix(self, text: str):
+        """在所有章节之后、尾部之前追加附加内容（例如疑似重复论文章节），不计入章节数"""
+        if not text:
+            return
+        self._file.write(b"\n\n" + text.encode('utf-8'))
+        self._file.flush()
+
+    def close(self, paper_count: int, models: Optional[str] = None):
+        """写入尾部并回填论文数量和各模型生成的篇数"""
+        self._file.write(self.footer.encode('utf-8'))
+        values = {PAPER_COUNT_PLACEHOLDER: f"{paper_count} 篇", MODELS_PLACEHOLDER: models or ""}
+        for placeholder, (offset, width) in self._slots.items():
+            value = values[placeholder].encode('utf-8')
+            if len(value) > width:
+                value = value[:width].decode('utf-8', errors='ignore').encode('utf-8')
+            self._file.seek(offset)
+            self._file.write(value.ljust(width))
+        self._file.close()
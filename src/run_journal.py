@@ -0,0 +1,142 @@
+"""
+运行日志模块 - 摘要生成过程的崩溃安全检查点
+
+摘要生成时向追加写入的JSONL日志依次记录：运行信息、交给摘要生成器的每篇论文、
+每批完成后各篇论文的摘要章节、论文是否已全部检索。运行成功后删除日志。
+运行中断（崩溃、超时、API失败）后使用 --resume 重新载入日志，跳过已完成的论文，
+只为剩余论文生成摘要并补全报告。
+写入日志时内存中只保留论文ID，论文和摘要章节只在恢复运行时从日志重新读取。
+"""
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Mapping, Optional, Tuple, Union
+
+from src.paper_store import split_arxiv_id
+from src.records import PaperRecord, to_json_dict
+
+
+class JournalState:
+    """从运行日志载入的状态：运行信息、论文列表（按交给摘要生成器的顺序）和已完成的摘要章节"""
+
+    def __init__(self):
+        self.run: Dict[str, Any] = {}
+        self.papers: List[PaperRecord] = []
+        self.results: Dict[str, str] = {}
+        self.fetch_complete = False
+        self._paper_ids = set()
+
+    @property
+    def resumable(self) -> bool:
+        """日志记录了一次尚未完成的运行"""
+        return bool(self.run)
+
+    def completed(self, paper: Mapping) -> Optional[str]:
+        """返回论文已完成的摘要章节，未完成时返回None"""
+        return self.results.get(split_arxiv_id(paper['entry_id'])[0])
+
+    def _apply(self, record: Dict[str, Any]):
+        kind = record.get('type')
+        if kind == 'run':
+            self.run = {key: value for key, value in record.items() if key != 'type'}
+        elif kind == 'paper':
+            paper = PaperRecord.from_dict(record['paper'])
+            arxiv_id = split_arxiv_id(paper['entry_id'])[0]
+            if arxiv_id not in self._paper_ids:
+                self._paper_ids.add(arxiv_id)
+                self.papers.append(paper)
+        elif kind == 'result':
+            self.results[record['id']] = record['section']
+        elif kind == 'fetched':
+            self.fetch_complete = True
+
+
+def load_journal(path: Union[str, Path]) -> JournalState:
+    """载入运行日志，跳过写入中断导致的不完整行；文件不存在时返回空状态"""
+    state = JournalState()
+    if not os.path.exists(path):
+        return state
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                state._apply(json.loads(line))
+            except (json.JSONDecodeError, KeyError, TypeError):
+                print(f"跳过运行日志中不完整的记录: {path}:{line_number}")
+    return state
+
+
+class RunJournal(JournalState):
+    """
+    追加写入的运行日志
+
+    每条记录一行，记录类型由 type 字段区分：run / paper / result / fetched。
+    摘要结果写入后立即 fsync，崩溃时最多丢失正在写入的一行。
+    resume=True 时载入已有日志并在其后继续追加，否则清空原有日志开始新的运行。
+    papers 和 results 只包含载入的日志内容，本次运行写入的论文和章节不保留在内存中，
+    只记录论文ID用于去重。
+    """
+
+    def __init__(self, path: Union[str, Path], resume: bool = False, fsync: bool = True):
+        super().__init__()
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.fsync = fsync
+        if resume:
+            self.__dict__.update(load_journal(self.path).__dict__)
+        self._lock = threading.Lock()
+        self._file = open(self.path, 'a' if resume else 'w', encoding='utf-8')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _write(self, records: Iterable[Dict[str, Any]], sync: bool = False):
+        with self._lock:
+            for record in records:
+                self._file.write(json.dumps(record, ensure_ascii=False))
+                self._file.write("\n")
+            self._file.flush()
+            if sync and self.fsync:
+                os.fsync(self._file.fileno())
+
+    def start(self, **run_info):
+        """记录运行信息（报告路径、最新论文ID、检索窗口等），恢复时用于补全报告和运行记录"""
+        self.run = dict(run_info)
+        self._write([dict(type='run', **run_info)], sync=True)
+
+    def add_paper(self, paper: Mapping):
+        """记录交给摘要生成器的论文，恢复运行时已记录的论文不重复写入"""
+        arxiv_id = split_arxiv_id(paper['entry_id'])[0]
+        with self._lock:
+            if arxiv_id in self._paper_ids:
+                return
+            self._paper_ids.add(arxiv_id)
+        self._write([{'type': 'paper', 'paper': to_json_dict(paper)}])
+
+    def add_results(self, results: Iterable[Tuple[Mapping, str]]):
+        """记录一批论文的摘要章节 (论文, 章节)"""
+        records = [{'type': 'result', 'id': split_arxiv_id(paper['entry_id'])[0], 'section': section}
+                   for paper, section in results]
+        if records:
+            self._write(records, sync=True)
+
+    def mark_fetched(self):
+        """记录论文已全部检索完毕，恢复时据此判断能否更新运行记录"""
+        self.fetch_complete = True
+        self._write([{'type': 'fetched'}], sync=True)
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def discard(self):
+        """运行成功后删除日志"""
+        self.close()
+        if self.path.exists():
+            self.path.unlink()
@@ -7,6 +7,9 @@ import argparse
 from datetime import datetime
 import re
 from pathlib import Path
+from src.metrics import RunMetrics
+from src.profiles import load_profiles
+from config.settings import PROFILES
 
 class SiteManager:
     """ArXiv摘要网站管理器，处理文件清理、索引和归档页面生成"""
@@ -18,24 +21,29 @@ title: {title}
 
 """
     
-    def __init__(self, data_dir, github_dir=None):
+    def __init__(self, data_dir, github_dir=None, metrics=None, sections=None):
         self.data_dir = Path(data_dir)
+        self.metrics = metrics or RunMetrics()
+        # 网站栏目（多主题报告）: [(栏目名称, 子目录名), ...]，首页导航中链接到各栏目的首页
+        self.sections = sections or []
         self.github_dir = Path(github_dir) if github_dir else None
         self.data_dir.mkdir(exist_ok=True)
     
     def clean_old_files(self, days=30):
-        """清理超过指定天数的markdown文件"""
+        """清理超过指定天数的markdown文件及其运行指标文件"""
         print(f"开始清理超过 {days} 天的旧摘要文件...")
         current_time = time.time()
         cutoff_time = current_time - (days * 86400)
         
         removed_count = 0
-        for file_path in self.data_dir.glob("summary_*.md"):
-            if file_path.stat().st_mtime < cutoff_time:
-                print(f"删除旧文件: {file_path.name}")
-                file_path.unlink()
-                removed_count += 1
+        for pattern in ("summary_*.md", "summary_*.metrics.*"):
+            for file_path in self.data_dir.glob(pattern):
+                if file_path.stat().st_mtime < cutoff_time:
+                    print(f"删除旧文件: {file_path.name}")
+                    file_path.unlink()
+                    removed_count += 1
         
+        self.metrics.incr('site.removed_files', removed_count)
         print(f"清理完成，共删除 {removed_count} 个文件。")
         return removed_count
     
@@ -63,16 +71,17 @@ title: {title}
         """将最新的摘要文件内容复制到index.md"""
         index_path = self.data_dir / "index.md"
         today = datetime.now().strftime('%Y-%m-%d')
+        nav = "".join(f" | [{title}]({name}/index.md)" for title, name in self.sections)
         
         if not sorted_files:
             print("未找到任何摘要文件，创建空的index.md。")
             title = "Arxiv论文总结报告"
-            content = "[查看所有摘要归档](archive.md)\n\n# Arxiv论文总结报告\n\n暂无可用摘要。"
+            content = f"[查看所有摘要归档](archive.md){nav}\n\n# Arxiv论文总结报告\n\n暂无可用摘要。"
         else:
             latest_file = sorted_files[0]
             print(f"找到最新文件: {latest_file.name}，正在更新index.md...")
             title, content = self.extract_content_and_title(latest_file)
-            content = f"[查看所有摘要归档](archive.md) | 更新日期: {today}\n\n{content}"
+            content = f"[查看所有摘要归档](archive.md){nav} | 更新日期: {today}\n\n{content}"
 
         full_content = self.DEFAULT_FRONT_MATTER.format(title=title) + content
         index_path.write_text(full_content, encoding='utf-8')
@@ -96,6 +105,7 @@ title: {title}
                 self.ensure_file_has_front_matter(file_path, f"{date_str} Arxiv论文摘要")
                 links.append(f'- [{date_str} 摘要]({filename})')
         
+        self.metrics.incr('site.archived_reports', len(links))
         content = self.DEFAULT_FRONT_MATTER.format(title=archive_title) + header + "\n".join(links)
         archive_path.write_text(content, encoding='utf-8')
         print("归档页面创建成功。")
@@ -131,24 +141,42 @@ title: {title}
         
         print("Jekyll部署配置完成。")
 
+    def update(self, days=30, clean=True):
+        """更新网站：清理旧文件，更新首页和归档页面，同步Jekyll配置；各栏目子目录同样更新"""
+        for title, name in self.sections:
+            print(f"\n正在更新栏目: {title}")
+            SiteManager(self.data_dir / name, metrics=self.metrics).update(days, clean)
+        
+        if clean:
+            with self.metrics.stage('site.clean'):
+                self.clean_old_files(days)
+        
+        sorted_files = self.get_sorted_summary_files()
+        
+        with self.metrics.stage('site.index'):
+            self.copy_latest_to_index(sorted_files)
+        with self.metrics.stage('site.archive'):
+            self.create_archive_page(sorted_files)
+        with self.metrics.stage('site.setup'):
+            self.setup_site_structure()
+
 def main():
     parser = argparse.ArgumentParser(description="ArXiv Summary网站管理工具")
     parser.add_argument('--data-dir', default='./data', help='数据目录路径')
     parser.add_argument('--github-dir', default='./.github', help='GitHub配置目录路径')
     parser.add_argument('--days', type=int, default=30, help='摘要文件保留天数')
     parser.add_argument('--skip-clean', action='store_true', help='跳过清理旧文件')
+    parser.add_argument('--metrics-file', help='将各步骤耗时写入该JSON指标文件')
     args = parser.parse_args()
     
-    site = SiteManager(args.data_dir, args.github_dir)
-    
-    if not args.skip_clean:
-        site.clean_old_files(args.days)
-    
-    sorted_files = site.get_sorted_summary_files()
+    metrics = RunMetrics()
+    sections = [(profile.title, profile.name) for profile in load_profiles(PROFILES)]
+    site = SiteManager(args.data_dir, args.github_dir, metrics=metrics, sections=sections)
+    site.update(args.days, clean=not args.skip_clean)
     
-    site.copy_latest_to_index(sorted_files)
-    site.create_archive_page(sorted_files)
-    site.setup_site_structure()
+    if args.metrics_file:
+        metrics.write_json(args.metrics_file)
+        print(f"运行指标已保存到: {args.metrics_file}")
     
     print("\n所有任务完成！")
 
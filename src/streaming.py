@@ -0,0 +1,76 @@
+"""
+流式处理工具模块 - 后台预取迭代器和分批工具
+"""
+import queue
+import threading
+from typing import Iterable, Iterator, List, TypeVar
+
+T = TypeVar('T')
+
+# 队列中用于标记生产者结束的哨兵对象
+_DONE = object()
+
+
+class _ProducerError:
+    """包装生产者线程中抛出的异常，在消费者线程中重新抛出"""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def background_iter(iterable: Iterable[T], maxsize: int = 100) -> Iterator[T]:
+    """
+    在后台线程中消费 iterable，通过有界队列将元素交给调用方
+
+    队列满时生产者阻塞，因此内存占用不超过 maxsize 个元素；
+    调用方提前停止迭代时生产者会在下一次放入元素时退出。
+    后台线程在调用时立即启动，而不是在第一次取元素时，以便多个流可以同时预取。
+    """
+    items = queue.Queue(maxsize=max(1, maxsize))
+    stopped = threading.Event()
+
+    def put(item) -> bool:
+        while not stopped.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put(item):
+                    return
+        except BaseException as e:
+            put(_ProducerError(e))
+            return
+        put(_DONE)
+
+    def consume():
+        try:
+            while True:
+                item = items.get()
+                if item is _DONE:
+                    return
+                if isinstance(item, _ProducerError):
+                    raise item.error
+                yield item
+        finally:
+            stopped.set()
+
+    threading.Thread(target=produce, daemon=True).start()
+    return consume()
+
+
+def iter_batches(iterable: Iterable[T], size: int) -> Iterator[List[T]]:
+    """将 iterable 按 size 分批，元素到达即组批，最后一批可能不足 size 个"""
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -0,0 +1,142 @@
+"""
+摘要缓存模块 - 按内容寻址的持久化论文摘要缓存
+
+缓存键为 (不带版本号的arXiv ID, 摘要原文, 模型名称, 提示词模板版本, 生成参数) 的哈希，
+任一项变化都会得到新的键；运行不完整时重新运行只需为未命中的论文调用语言模型。
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Iterable, Optional, Tuple
+
+from src.paper_store import split_arxiv_id
+
+
+def summary_cache_key(paper: Dict[str, Any], model: str, prompt_version: str,
+                      generation_config: Optional[Dict[str, Any]] = None) -> str:
+    """计算论文摘要的缓存键"""
+    arxiv_id = split_arxiv_id(paper['entry_id'])[0]
+    payload = json.dumps(
+        [arxiv_id, paper.get('summary') or "", model, prompt_version, generation_config or {}],
+        ensure_ascii=False, sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class SummaryCache:
+    """
+    SQLite 摘要缓存
+
+    命中时更新最后使用时间；evict() 删除超过 max_age_days 的条目，
+    并在条目数超过 max_entries 时按最近最少使用淘汰。
+    """
+
+    def __init__(self, db_path: str, max_entries: Optional[int] = 20000,
+                 max_age_days: Optional[float] = 90):
+        self.db_path = str(db_path)
+        self.max_entries = max_entries
+        self.max_age_days = max_age_days
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS summaries (
+                key TEXT PRIMARY KEY,
+                arxiv_id TEXT,
+                model TEXT,
+                prompt_version TEXT,
+                summary TEXT,
+                created_at REAL,
+                last_used REAL
+            );
+            CREATE INDEX IF NOT EXISTS idx_summaries_last_used ON summaries (last_used);
+        """)
+        self._conn.commit()
+
+    @classmethod
+    def from_config(cls, db_path: str, config: Dict[str, Any]) -> 'SummaryCache':
+        """根据 SUMMARY_CACHE_CONFIG 创建缓存"""
+        return cls(db_path, max_entries=config.get('max_entries', 20000),
+                   max_age_days=config.get('max_age_days', 90))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT summary FROM summaries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute("UPDATE summaries SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            return row[0]
+
+    def put_many(self, entries: Iterable[Tuple[str, str, str, str, str]]):
+        """写入缓存条目 (键, arXiv ID, 模型, 提示词版本, 摘要)"""
+        now = time.time()
+        rows = [(key, arxiv_id, model, prompt_version, summary, now, now)
+                for key, arxiv_id, model, prompt_version, summary in entries]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany("""
+                INSERT OR REPLACE INTO summaries (key, arxiv_id, model, prompt_version, summary, created_at, last_used)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+            self._conn.commit()
+
+    def evict(self) -> int:
+        """按时间和数量淘汰条目，返回删除的条目数"""
+        removed = 0
+        with self._lock:
+            if self.max_age_days:
+                cutoff = time.time() - self.max_age_days * 86400
+                removed += self._conn.execute("DELETE FROM summaries WHERE created_at < ?", (cutoff,)).rowcount
+            if self.max_entries:
+                removed += self._conn.execute("""
+                    DELETE FROM summaries WHERE key IN (
+                        SELECT key FROM summaries ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                    )
+                """, (self.max_entries,)).rowcount
+            self._conn.commit()
+        return removed
+
+    def invalidate(self, prompt_version: Optional[str] = None, model: Optional[str] = None,
+                   keep_prompt_version: Optional[str] = None) -> int:
+        """
+        删除缓存条目，返回删除的条目数
+
+        指定 prompt_version / model 时删除匹配的条目；指定 keep_prompt_version 时删除其他提示词版本的条目；
+        都不指定时清空缓存。
+        """
+        conditions, params = [], []
+        if prompt_version is not None:
+            conditions.append("prompt_version = ?")
+            params.append(prompt_version)
+        if model is not None:
+            conditions.append("model = ?")
+            params.append(model)
+        if keep_prompt_version is not None:
+            conditions.append("prompt_version != ?")
+            params.append(keep_prompt_version)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self._lock:
+            removed = self._conn.execute(f"DELETE FROM summaries{where}", params).rowcount
+            self._conn.commit()
+        return removed
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,99 @@
+"""
+arXiv 响应缓存测试模块
+"""
+import tempfile
+import time
+import unittest
+from src.arxiv_cache import ResponseCache, CachedSession, CacheMissError
+from src.arxiv_client import ArxivClient
+from config.settings import SEARCH_CONFIG
+from benchmarks.atom_fixtures import make_corpus, ReplaySession, FakeResponse
+
+URL = "https://export.arxiv.org/api/query?search_query=cat%3Acs.NE&id_list=&sortBy=submittedDate&sortOrder=descending&start=0&max_results=100"
+
+
+class ETagSession:
+    """返回带 ETag 的响应，收到匹配的 If-None-Match 时返回304"""
+
+    def __init__(self):
+        self.requests = []
+
+    def get(self, url, headers=None, **kwargs):
+        self.requests.append(headers or {})
+        if (headers or {}).get('If-None-Match') == '"v1"':
+            return FakeResponse(b"", status_code=304)
+        return FakeResponse(b"<feed/>", headers={'ETag': '"v1"'})
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_cache_key_normalization(self):
+        cache = ResponseCache(self.tmp_dir.name)
+        reordered = ("https://export.arxiv.org/api/query?max_results=100&start=0&sortOrder=descending"
+                     "&sortBy=submittedDate&id_list=&search_query=cat%3Acs.NE++")
+        self.assertEqual(cache.cache_key(URL), cache.cache_key(reordered))
+        next_page = URL.replace("start=0", "start=100")
+        self.assertEqual(cache.cache_key(URL)[0], cache.cache_key(next_page)[0])
+        self.assertNotEqual(cache.cache_key(URL)[1], cache.cache_key(next_page)[1])
+
+    def test_fresh_hit_and_revalidation(self):
+        network = ETagSession()
+        session = CachedSession(ResponseCache(self.tmp_dir.name, ttl=60), network)
+        self.assertEqual(session.get(URL).content, b"<feed/>")
+        self.assertEqual(session.get(URL).content, b"<feed/>")
+        self.assertEqual(len(network.requests), 1)
+
+        # 过期后发送条件请求，304 时复用缓存内容
+        session.cache.ttl = 0
+        response = session.get(URL)
+        self.assertEqual(response.content, b"<feed/>")
+        self.assertEqual(network.requests[-1].get('If-None-Match'), '"v1"')
+        self.assertEqual(len(network.requests), 2)
+
+    def test_empty_page_is_not_cached(self):
+        pages = [b"<feed/>", b"<feed><entry/></feed>"]
+
+        class FlakySession:
+            requests = 0
+
+            def get(self, url, headers=None, **kwargs):
+                FlakySession.requests += 1
+                return FakeResponse(pages[min(FlakySession.requests, 2) - 1])
+
+        session = CachedSession(ResponseCache(self.tmp_dir.name, ttl=60), FlakySession())
+        next_page = URL.replace("start=0", "start=100")
+        # 非首页的空响应不写入缓存，重试时重新请求
+        self.assertEqual(session.get(next_page).content, b"<feed/>")
+        self.assertEqual(session.get(next_page).content, b"<feed><entry/></feed>")
+        self.assertEqual(session.get(next_page).content, b"<feed><entry/></feed>")
+        self.assertEqual(FlakySession.requests, 2)
+
+    def test_offline_miss(self):
+        session = CachedSession(ResponseCache(self.tmp_dir.name, mode='offline'), ETagSession())
+        with self.assertRaises(CacheMissError):
+            session.get(URL)
+
+    def test_offline_replay_of_search(self):
+        categories = ["cs.NE", "cs.AI"]
+        corpus = make_corpus(categories, papers_per_category=30)
+        config = dict(SEARCH_CONFIG, max_total_results=500, page_size=20, delay_seconds=0,
+                      split_by='category', cache_dir=self.tmp_dir.name)
+        online = ArxivClient(config, session=ReplaySession(corpus))
+        expected = online.search_papers(categories=categories, query="")
+
+        network = ReplaySession(corpus)
+        offline = ArxivClient(dict(config, cache_mode='offline', delay_seconds=5), session=network)
+        start = time.perf_counter()
+        results = offline.search_papers(categories=categories, query="")
+        self.assertLess(time.perf_counter() - start, 1)
+        self.assertEqual(results, expected)
+        self.assertEqual(network.requests, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,10 +2,16 @@
 ArxivClient 测试模块
 """
 import unittest
+import tempfile
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 import json
+import requests
+from urllib.parse import unquote
 from src.arxiv_client import ArxivClient
+from src.paper_store import PaperStore
 from config.settings import CATEGORIES, QUERY, SEARCH_CONFIG
+from benchmarks.atom_fixtures import make_corpus, FakeResponse, ReplaySession
 
 class TestArxivClient(unittest.TestCase):
     def setUp(self):
@@ -60,5 +66,206 @@ class TestArxivClient(unittest.TestCase):
         output_path.unlink()
         Path(self.test_output_dir).rmdir()
 
+class TestConcurrentSearch(unittest.TestCase):
+    """使用回放的 Atom 响应测试按分类拆分的并发查询"""
+
+    def setUp(self):
+        self.categories = ["cs.NE", "cs.AI", "q-bio.NC"]
+        self.corpus = make_corpus(self.categories, papers_per_category=40)
+
+    def _search(self, split_by, **overrides):
+        config = dict(SEARCH_CONFIG, max_total_results=500, page_size=25,
+                      delay_seconds=0, split_by=split_by)
+        config.update(overrides)
+        client = ArxivClient(config, session=ReplaySession(self.corpus))
+        return client.search_papers(categories=self.categories, query="Spiking OR SNN OR Event")
+
+    def test_split_matches_serial(self):
+        serial = self._search(None)
+        by_category = self._search('category')
+        by_keyword = self._search('keyword')
+
+        self.assertTrue(serial)
+        self.assertEqual([p['entry_id'] for p in by_category], [p['entry_id'] for p in serial])
+        self.assertEqual([p['entry_id'] for p in by_keyword], [p['entry_id'] for p in serial])
+
+    def test_split_dedupes_and_keeps_order(self):
+        results = self._search('category')
+        entry_ids = [p['entry_id'] for p in results]
+        self.assertEqual(len(entry_ids), len(set(entry_ids)))
+        published = [p['published'] for p in results]
+        self.assertEqual(published, sorted(published, reverse=True))
+
+    def test_split_respects_max_results(self):
+        results = self._search('category', max_total_results=30)
+        self.assertEqual(len(results), 30)
+
+    def test_failed_sub_query_is_reported(self):
+        class FailingSession(ReplaySession):
+            def get(self, url, headers=None, **kwargs):
+                if "cs.AI" in unquote(url):
+                    raise ConnectionError("connection reset")
+                return super().get(url, headers, **kwargs)
+
+        config = dict(SEARCH_CONFIG, max_total_results=500, page_size=25, delay_seconds=0, split_by='category',
+                      num_retries=0)
+        client = ArxivClient(config, session=FailingSession(self.corpus))
+        results = client.search_papers(categories=self.categories, query="")
+        # 其他子查询的结果仍然返回，出错的子查询记录在 failed_queries 和运行指标中
+        self.assertTrue(results)
+        self.assertEqual(len(client.failed_queries), 1)
+        self.assertIn("cs.AI", client.failed_queries[0])
+        self.assertEqual(client.metrics.counters['arxiv.failed_queries'], 1)
+
+    def test_timeouts_and_broken_streams_are_retried(self):
+        closed = []
+
+        class TrackedResponse(FakeResponse):
+            broken = False
+
+            def iter_content(self, chunk_size=65536):
+                if self.broken:
+                    yield self.content[:100]
+                    raise requests.exceptions.ChunkedEncodingError("connection broken")
+                yield from super().iter_content(chunk_size)
+
+            def close(self):
+                closed.append(self)
+
+        class FlakySession(ReplaySession):
+            """第一次请求超时，第二次响应中途断开，之后正常返回"""
+
+            def __init__(self, corpus):
+                super().__init__(corpus)
+                self.timeouts = []
+
+            def get(self, url, headers=None, **kwargs):
+                self.timeouts.append(kwargs.get('timeout'))
+                if len(self.timeouts) == 1:
+                    raise requests.Timeout("read timed out")
+                response = TrackedResponse(super().get(url, headers, **kwargs).content)
+                response.broken = len(self.timeouts) == 2
+                return response
+
+        session = FlakySession(self.corpus)
+        config = dict(SEARCH_CONFIG, max_total_results=20, page_size=20, delay_seconds=0, backend='direct',
+                      connect_timeout=5, read_timeout=30)
+        client = ArxivClient(config, session=session)
+        results = client.search_papers(categories=self.categories, query="")
+        self.assertEqual(len(results), 20)
+        self.assertEqual(client.metrics.counters['arxiv.retries'], 2)
+        self.assertEqual(session.timeouts, [(5, 30)] * 3)
+        # 中途断开的响应同样被关闭
+        self.assertEqual(len(closed), 2)
+
+    def test_skewed_split_matches_serial_newest(self):
+        # 最新的论文集中在一个分类中时，拆分后的归并结果仍是单个查询的最新 max_total_results 篇
+        corpus = make_corpus(self.categories, papers_per_category=40)
+        for paper in corpus[:60]:
+            paper.update(primary_category="cs.NE", categories=["cs.NE"])
+        config = dict(SEARCH_CONFIG, max_total_results=60, page_size=10, delay_seconds=0)
+        results = {}
+        for split_by in (None, 'category'):
+            client = ArxivClient(dict(config, split_by=split_by), session=ReplaySession(corpus))
+            results[split_by] = [p['entry_id'] for p in client.search_papers(categories=self.categories, query="")]
+        self.assertEqual(len(results[None]), 60)
+        self.assertEqual(results['category'], results[None])
+
+    def test_split_stops_at_last_entry(self):
+        serial = self._search(None)
+        last_entry_id = serial[20]['entry_id']
+        with open("test_last_run.json", 'w') as f:
+            json.dump({'latest_entry_id': last_entry_id}, f)
+        try:
+            config = dict(SEARCH_CONFIG, max_total_results=500, page_size=25,
+                          delay_seconds=0, split_by='category')
+            client = ArxivClient(config, session=ReplaySession(self.corpus))
+            results = client.search_papers(categories=self.categories, query="Spiking OR SNN OR Event",
+                                           last_run_file="test_last_run.json")
+        finally:
+            Path("test_last_run.json").unlink()
+        self.assertEqual([p['entry_id'] for p in results], [p['entry_id'] for p in serial[:20]])
+
+    def test_empty_store_falls_back_to_last_run(self):
+        # 升级后首次运行：已见论文存储为空，仍以上次运行记录的最新文章作为检索终点
+        serial = self._search(None)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            last_run_file = str(Path(tmp_dir) / "last_run.json")
+            with open(last_run_file, 'w') as f:
+                json.dump({'latest_entry_id': serial[20]['entry_id']}, f)
+            config = dict(SEARCH_CONFIG, max_total_results=500, page_size=25, delay_seconds=0, split_by=None)
+            with PaperStore(str(Path(tmp_dir) / "seen.db")) as store:
+                client = ArxivClient(config, session=ReplaySession(self.corpus))
+                results = client.search_papers(categories=self.categories, query="Spiking OR SNN OR Event",
+                                               last_run_file=last_run_file, store=store)
+                self.assertEqual(len(store), 20)
+        self.assertEqual([p['entry_id'] for p in results], [p['entry_id'] for p in serial[:20]])
+
+class TestDateWindow(unittest.TestCase):
+    """测试按提交时间窗口的增量检索"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.last_run_file = str(Path(self.tmp_dir.name) / "last_run.json")
+        self.config = dict(SEARCH_CONFIG, max_total_results=500, page_size=25, delay_seconds=0,
+                           window_overlap_hours=2, initial_window_days=1)
+        self.now = datetime(2025, 1, 31, 18, 0, tzinfo=timezone.utc)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_window_from_last_run(self):
+        client = ArxivClient(self.config)
+        start, end = client.get_date_window(self.last_run_file, now=self.now)
+        self.assertEqual((start, end), (self.now - timedelta(days=1), self.now))
+
+        client.save_last_run_info("http://arxiv.org/abs/2501.00001v1", self.last_run_file,
+                                  window_end=self.now - timedelta(hours=10))
+        start, end = client.get_date_window(self.last_run_file, now=self.now)
+        self.assertEqual(start, self.now - timedelta(hours=12))
+        self.assertEqual(end, self.now)
+
+        # 窗口终点取整到整点，同一小时内的重跑生成相同的查询
+        _, end = client.get_date_window(self.last_run_file, now=self.now + timedelta(minutes=42, seconds=5))
+        self.assertEqual(end, self.now)
+
+    def test_date_clause(self):
+        client = ArxivClient(self.config)
+        query = client._create_search_query("Spiking", ["cs.NE"],
+                                            date_range=(self.now - timedelta(hours=3), self.now))
+        self.assertEqual(query, "Spiking AND (cat:cs.NE) AND submittedDate:[202501311500 TO 202501311800]")
+
+    def test_search_within_window(self):
+        corpus = make_corpus(["cs.NE", "cs.AI"], papers_per_category=100)
+        session = ReplaySession(corpus)
+        client = ArxivClient(dict(self.config, split_by='category'), session=session)
+        date_range = (self.now - timedelta(hours=2), self.now)
+        results = client.search_papers(categories=["cs.NE", "cs.AI"], query="", date_range=date_range)
+
+        expected = [p for p in corpus if date_range[0] <= p['published'] <= date_range[1]]
+        self.assertEqual(len(results), len(expected))
+        self.assertEqual(len(session.requests), 2)
+
+    def test_late_announced_paper_is_fetched(self):
+        # 提交 7 小时后才公布的论文在下一次运行的重叠窗口内检索到，已总结的论文由存储跳过
+        corpus = make_corpus(["cs.NE", "cs.AI"], papers_per_category=100)
+        late = corpus.pop(60)
+        config = dict(self.config, window_overlap_hours=SEARCH_CONFIG['window_overlap_hours'])
+        with PaperStore(str(Path(self.tmp_dir.name) / "seen.db")) as store:
+            client = ArxivClient(config, session=ReplaySession(corpus))
+            date_range = client.get_date_window(self.last_run_file, now=self.now)
+            first = client.search_papers(categories=["cs.NE", "cs.AI"], query="", store=store, date_range=date_range)
+            store.mark_summarized(first)
+            client.save_last_run_info(first[0]['entry_id'], self.last_run_file, window_end=date_range[1])
+
+            corpus.insert(60, late)
+            client = ArxivClient(config, session=ReplaySession(corpus))
+            date_range = client.get_date_window(self.last_run_file, now=self.now + timedelta(days=1))
+            second = client.search_papers(categories=["cs.NE", "cs.AI"], query="", store=store,
+                                          date_range=date_range)
+
+        self.assertEqual(len(first), len(corpus) - 1)
+        self.assertEqual([p['entry_id'] for p in second], [f"http://arxiv.org/abs/{late['arxiv_id']}"])
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,45 @@
+"""
+Atom 流式解析测试模块
+"""
+import unittest
+from src.arxiv_client import ArxivClient
+from src.atom_parser import AtomFeedParser, iter_feed
+from config.settings import SEARCH_CONFIG
+from benchmarks.atom_fixtures import make_corpus, render_feed, ReplaySession
+
+
+class TestAtomParser(unittest.TestCase):
+    def setUp(self):
+        self.corpus = make_corpus(["cs.NE", "q-bio.NC"], papers_per_category=5)
+        self.page = render_feed(self.corpus, total=42, start=10, page_size=10)
+
+    def test_parse_in_small_chunks(self):
+        parser = AtomFeedParser()
+        chunks = [self.page[i:i + 97] for i in range(0, len(self.page), 97)]
+        records = list(iter_feed(chunks, parser))
+
+        self.assertEqual(len(records), 10)
+        self.assertEqual((parser.total_results, parser.start_index), (42, 10))
+        first, paper = records[0], self.corpus[0]
+        self.assertEqual(first['entry_id'], f"http://arxiv.org/abs/{paper['arxiv_id']}")
+        self.assertEqual(first['title'], paper['title'])
+        self.assertEqual(first['published'], paper['published'].isoformat())
+        self.assertEqual(first['categories'], tuple(paper['categories']))
+        self.assertEqual(first['primary_category'], paper['primary_category'])
+        self.assertEqual(first['pdf_url'], f"https://arxiv.org/pdf/{paper['arxiv_id']}")
+        self.assertEqual(list(first['authors']), paper['authors'])
+
+    def test_direct_backend_matches_arxiv_backend(self):
+        results = {}
+        for backend in ('arxiv', 'direct'):
+            config = dict(SEARCH_CONFIG, max_total_results=8, page_size=3,
+                          delay_seconds=0, backend=backend)
+            session = ReplaySession(self.corpus)
+            client = ArxivClient(config, session=session)
+            results[backend] = client.search_papers(categories=["cs.NE", "q-bio.NC"], query="")
+        self.assertEqual(len(results['direct']), 8)
+        self.assertEqual(results['direct'], results['arxiv'])
+
+
+if __name__ == '__main__':
+    unittest.main()
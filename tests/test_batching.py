@@ -0,0 +1,60 @@
+"""
+批次打包测试模块
+"""
+import tempfile
+import unittest
+from pathlib import Path
+from src.batching import TokenEstimator, BatchPacker
+
+
+class TestTokenEstimator(unittest.TestCase):
+    def test_calibration_from_usage_metadata(self):
+        estimator = TokenEstimator("model-a", chars_per_token=4.0, output_tokens_per_paper=450, smoothing=0.5)
+        # 第一次观测直接采用观测值，思考 token 计入输出
+        estimator.observe(3000, 5, {'promptTokenCount': 1000, 'candidatesTokenCount': 1500,
+                                    'thoughtsTokenCount': 500})
+        self.assertAlmostEqual(estimator.chars_per_token, 3.0)
+        self.assertAlmostEqual(estimator.output_tokens_per_paper, 400)
+        estimator.observe(2000, 2, {'promptTokenCount': 1000, 'candidatesTokenCount': 1000})
+        self.assertAlmostEqual(estimator.chars_per_token, 2.5)
+        self.assertAlmostEqual(estimator.output_tokens_per_paper, 450)
+        # 缺少 usageMetadata 时不更新
+        estimator.observe(2000, 2, {})
+        self.assertEqual(estimator.samples, 2)
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = str(Path(tmp_dir) / "calibration.json")
+            estimator = TokenEstimator("model-a")
+            estimator.observe(3000, 5, {'promptTokenCount': 1000, 'candidatesTokenCount': 2000})
+            estimator.save(path)
+            TokenEstimator("model-b").save(path)
+
+            loaded = TokenEstimator.from_config("model-a", {}, path)
+            self.assertAlmostEqual(loaded.chars_per_token, 3.0)
+            self.assertAlmostEqual(loaded.output_tokens_per_paper, 400)
+            self.assertEqual(TokenEstimator.from_config("model-c", {}, path).samples, 0)
+
+
+class TestBatchPacker(unittest.TestCase):
+    def setUp(self):
+        self.estimator = TokenEstimator("model-a", chars_per_token=1.0, output_tokens_per_paper=100)
+
+    def pack(self, sizes, **kwargs):
+        packer = BatchPacker(self.estimator, paper_chars=lambda paper: paper, **kwargs)
+        return list(packer.pack(sizes))
+
+    def test_input_budget(self):
+        self.assertEqual(self.pack([40, 40, 40, 10, 90, 500, 5], prompt_overhead_chars=10,
+                                   max_input_tokens=100, max_output_tokens=10000),
+                         [[40, 40], [40, 10], [90], [500], [5]])
+
+    def test_output_budget_and_paper_cap(self):
+        self.assertEqual(self.pack([1] * 7, max_input_tokens=1000, max_output_tokens=350),
+                         [[1, 1, 1], [1, 1, 1], [1]])
+        self.assertEqual(self.pack([1] * 5, max_input_tokens=1000, max_output_tokens=10000, max_papers=2),
+                         [[1, 1], [1, 1], [1]])
+
+
+if __name__ == '__main__':
+    unittest.main()
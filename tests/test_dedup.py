@@ -0,0 +1,65 @@
+"""
+近似重复检测测试模块
+"""
+import tempfile
+import unittest
+from pathlib import Path
+from src.dedup import DedupIndex, MinHasher, optimal_bands, normalize_text
+
+ABSTRACT = (
+    "Spiking neural networks offer an energy efficient alternative to conventional deep networks. "
+    "We propose a surrogate gradient method with learnable membrane time constants that trains "
+    "deep spiking networks directly and reaches competitive accuracy on event based vision benchmarks "
+    "while requiring far fewer synaptic operations than previous approaches."
+)
+
+
+def paper(arxiv_id, title, summary):
+    return {'entry_id': f"http://arxiv.org/abs/{arxiv_id}v1", 'title': title, 'summary': summary}
+
+
+class TestMinHash(unittest.TestCase):
+    def test_signature_is_deterministic(self):
+        a, b = MinHasher(64), MinHasher(64)
+        self.assertEqual(a.signature(ABSTRACT), b.signature(ABSTRACT))
+        self.assertEqual(normalize_text("A \\textbf{Spiking}-Net, v2!"), "a spiking net v2")
+
+    def test_optimal_bands(self):
+        bands, rows = optimal_bands(128, 0.7)
+        self.assertEqual(bands * rows, 128)
+        self.assertAlmostEqual((1 / bands) ** (1 / rows), 0.7, delta=0.05)
+
+
+class TestDedupIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmp_dir.name) / "dedup.db"
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_near_duplicates_across_runs(self):
+        with DedupIndex(self.db_path) as index:
+            index.add([paper("2501.00001", "Learnable Time Constants for Deep SNNs", ABSTRACT)],
+                      report="summary_20250101_080000.md")
+
+        resubmitted = paper("2503.00002", "Learnable Membrane Time Constants for Deep SNNs",
+                            ABSTRACT.replace("far fewer", "significantly fewer"))
+        unrelated = paper("2503.00003", "Retrieval Augmented Generation at Scale",
+                          "We study retrieval augmented language models and their scaling behaviour "
+                          "on open domain question answering benchmarks with billions of documents.")
+        new_version = paper("2501.00001", "Learnable Time Constants for Deep SNNs", ABSTRACT)
+
+        with DedupIndex(self.db_path) as index:
+            self.assertEqual(len(index), 1)
+            kept = list(index.filter([resubmitted, unrelated, new_version]))
+            self.assertEqual(kept, [unrelated, new_version])
+            (dup_paper, match), = index.duplicates
+            self.assertIs(dup_paper, resubmitted)
+            self.assertEqual(match.arxiv_id, "2501.00001")
+            self.assertEqual(match.report, "summary_20250101_080000.md")
+            self.assertGreaterEqual(match.similarity, 0.7)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+"""
+本地模拟 Gemini 服务与流水线基准测试的测试模块
+"""
+import re
+import tempfile
+import unittest
+from unittest import mock
+from benchmarks.bench_pipeline import run_pipeline, percentile
+from benchmarks.fake_gemini import FakeGeminiServer
+from config.settings import LLM_CONFIG
+from src.paper_summarizer import PaperSummarizer
+from tests.test_streaming import make_paper
+
+
+class TestFakeGemini(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.dict(LLM_CONFIG, {'retry_delay': 0.01, 'retry_count': 5})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def summarize(self, server, papers, output_format='markdown', stream=True):
+        summarizer = PaperSummarizer("fake-key", "fake-model")
+        summarizer.client.api_url = server.model_url("fake-model")
+        summarizer.client.stream = stream
+        summarizer.output_format = output_format
+        summarizer.max_papers_per_batch = 4
+        return summarizer._generate_batch_summary(papers)
+
+    def test_injected_faults_are_recovered(self):
+        papers = [make_paper(i) for i in range(12)]
+        for output_format in ('markdown', 'json'):
+            with FakeGeminiServer(error_rate=0.2, rate_limit_rate=0.2, truncate_rate=0.3,
+                                  malformed_rate=0.3, seed=3) as server:
+                summaries, count = self.summarize(server, papers, output_format)
+            self.assertEqual(count, 12)
+            links = re.findall(r'^### \[.*?\]\((\S+)\)', summaries, re.MULTILINE)
+            self.assertEqual(links, [paper['entry_id'] for paper in papers])
+            self.assertNotIn("**错误信息**", summaries)
+            fake = server.fake
+            self.assertGreater(fake.statuses[429], 0)
+            self.assertGreater(fake.statuses[500], 0)
+            self.assertGreater(fake.truncated + fake.malformed, 0)
+
+    def test_fallback_model_is_recorded_in_report(self):
+        papers = [make_paper(i) for i in range(6)]
+        with mock.patch.dict(LLM_CONFIG, {'fallback_models': ['backup-model'], 'route_cooldown': 60}), \
+                FakeGeminiServer(unavailable_models=('fake-model',)) as server, \
+                tempfile.TemporaryDirectory() as tmp_dir:
+            summarizer = PaperSummarizer("fake-key", "fake-model")
+            summarizer.client.api_url = server.model_url("fake-model")
+            summarizer.max_papers_per_batch = 3
+            output_file = f"{tmp_dir}/summary_1.md"
+            self.assertTrue(summarizer.summarize_papers(iter(papers), output_file))
+            with open(output_file, encoding='utf-8') as f:
+                report = f.read()
+        # 两个批次同时发出时都可能先请求主模型，之后主模型在冷却时间内被跳过
+        self.assertLessEqual(server.fake.models['fake-model'], 2)
+        self.assertEqual(server.fake.models['backup-model'], 2)
+        self.assertRegex(report, r"- 使用模型: backup-model 6 篇 *\n")
+        self.assertEqual(report.count("<!-- model: backup-model -->"), 6)
+
+    def test_responses_are_deterministic(self):
+        papers = [make_paper(i) for i in range(8)]
+        runs = []
+        for _ in range(2):
+            with FakeGeminiServer(truncate_rate=0.5, malformed_rate=0.5, seed=7) as server:
+                runs.append((self.summarize(server, papers, stream=False)[0], server.fake.requests))
+        self.assertEqual(runs[0], runs[1])
+
+    def test_pipeline_benchmark(self):
+        self.assertEqual(percentile([3, 1, 2, 4], 50), 2)
+        self.assertEqual(percentile([3, 1, 2, 4], 95), 4)
+        with FakeGeminiServer(latency="uniform:0.0:0.01") as server, tempfile.TemporaryDirectory() as tmp_dir:
+            result = run_pipeline(25, server, tmp_dir, concurrency=2, max_papers=10)
+        self.assertEqual(result['papers'], 25)
+        self.assertTrue(result['success'])
+        self.assertEqual(result['calls'], 3)
+        self.assertAlmostEqual(result['calls_per_paper'], 3 / 25)
+        self.assertEqual(result['fallback_rate'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,14 +1,20 @@
 """
 测试 Gemini API 连接
+
+需要在 LLM_CONFIG['api_key'] 中配置真实的 API 密钥，未配置时跳过；
+离线测试和基准测试使用本地模拟服务 benchmarks.fake_gemini。
 """
 import sys
 import os
 import json
+import unittest
 import requests
 from typing import Dict, Any, List, Optional
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config.settings import GEMINI_API_KEY
+from config.settings import LLM_CONFIG
+
+GEMINI_API_KEY = LLM_CONFIG.get('api_key')
 
 class GeminiClient:
     """使用 OpenAI 风格的 API 格式调用 Gemini"""
@@ -96,6 +102,8 @@ class GeminiClient:
 
 def test_gemini_connection():
     """测试 Gemini API 的连接性"""
+    if not GEMINI_API_KEY or GEMINI_API_KEY == "YOUR_API_HERE":
+        raise unittest.SkipTest("未配置 LLM_CONFIG['api_key']，跳过在线 API 测试")
     print("开始测试 Gemini API 连接...")
     
     try:
@@ -0,0 +1,97 @@
+"""
+运行指标测试模块
+"""
+import json
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+from benchmarks.fake_gemini import FakeGeminiServer
+from config.settings import LLM_CONFIG
+from src.metrics import RunMetrics
+from src.paper_summarizer import PaperSummarizer
+from src.site_manager import SiteManager
+from tests.test_streaming import make_paper
+
+
+class TestRunMetrics(unittest.TestCase):
+    def test_to_dict_and_prometheus(self):
+        metrics = RunMetrics()
+        with metrics.stage('fetch'):
+            pass
+        metrics.add_time('fetch', 1.5)
+        metrics.incr('llm.retries')
+        metrics.incr('llm.retries', 2)
+        metrics.record_usage({'promptTokenCount': 100, 'candidatesTokenCount': 40, 'thoughtsTokenCount': 10})
+        metrics.record_usage({'promptTokenCount': 50, 'candidatesTokenCount': 20})
+        for seconds in (0.3, 0.1, 0.2, 0.4):
+            metrics.observe('llm.request', seconds)
+        metrics.set_info(model="model-a")
+
+        data = metrics.to_dict()
+        self.assertGreaterEqual(data['stages']['fetch'], 1.5)
+        self.assertEqual(data['counters'], {'llm.output_tokens': 60, 'llm.prompt_tokens': 150,
+                                            'llm.retries': 3, 'llm.thought_tokens': 10})
+        self.assertEqual(data['latencies']['llm.request']['count'], 4)
+        self.assertEqual(data['latencies']['llm.request']['p50'], 0.2)
+        self.assertEqual(data['latencies']['llm.request']['p95'], 0.4)
+        self.assertEqual(data['info'], {'model': "model-a"})
+
+        text = metrics.to_prometheus()
+        self.assertIn('arxivsummary_run_info{model="model-a"} 1', text)
+        self.assertIn('arxivsummary_stage_seconds{stage="fetch"}', text)
+        self.assertIn("arxivsummary_llm_prompt_tokens_total 150", text)
+        self.assertIn('arxivsummary_llm_request_seconds{quantile="0.5"} 0.200000', text)
+        self.assertIn("arxivsummary_llm_request_seconds_count 4", text)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "summary_1.metrics.json"
+            metrics.write_json(path)
+            with open(path, encoding='utf-8') as f:
+                self.assertEqual(json.load(f)['counters']['llm.retries'], 3)
+
+
+class TestInstrumentation(unittest.TestCase):
+    def test_summarizer_records_calls_tokens_and_retries(self):
+        metrics = RunMetrics()
+        papers = [make_paper(i) for i in range(8)]
+        with mock.patch.dict(LLM_CONFIG, {'retry_delay': 0.01, 'retry_count': 5}), \
+                FakeGeminiServer(error_rate=0.3, seed=0) as server, \
+                tempfile.TemporaryDirectory() as tmp_dir:
+            summarizer = PaperSummarizer("fake-key", "fake-model", metrics=metrics)
+            summarizer.client.api_url = server.model_url("fake-model")
+            summarizer.max_papers_per_batch = 4
+            self.assertTrue(summarizer.summarize_papers(iter(papers), os.path.join(tmp_dir, "summary_1.md")))
+
+        data = metrics.to_dict()
+        counters = data['counters']
+        fake = server.fake
+        self.assertEqual(counters['summary.papers'], 8)
+        self.assertEqual(counters['summary.batches'], 2)
+        self.assertEqual(counters['llm.requests'], fake.requests)
+        self.assertGreater(fake.statuses[500], 0)
+        self.assertEqual(counters['llm.retries'], fake.statuses[500])
+        self.assertEqual(data['latencies']['llm.call']['count'], counters['llm.calls'])
+        self.assertGreater(counters['llm.prompt_tokens'], 0)
+        self.assertGreater(counters['llm.output_tokens'], 0)
+        self.assertIn('summarize', data['stages'])
+
+    def test_site_manager_removes_old_metrics_files(self):
+        metrics = RunMetrics()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            old = time.time() - 40 * 86400
+            for name in ("summary_1.md", "summary_1.metrics.json", "summary_2.md"):
+                path = Path(tmp_dir) / name
+                path.write_text("# 报告", encoding='utf-8')
+                if name.startswith("summary_1"):
+                    os.utime(path, (old, old))
+            site = SiteManager(tmp_dir, metrics=metrics)
+            self.assertEqual(site.clean_old_files(30), 2)
+            self.assertEqual(sorted(p.name for p in Path(tmp_dir).iterdir()), ["summary_2.md"])
+        self.assertEqual(metrics.counters['site.removed_files'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
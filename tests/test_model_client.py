@@ -0,0 +1,198 @@
+"""
+语言模型客户端测试模块，使用本地 HTTP 服务模拟 generateContent / streamGenerateContent 接口
+"""
+import gzip
+import json
+import threading
+import unittest
+from unittest import mock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from config.settings import LLM_CONFIG
+from src.paper_summarizer import ModelClient
+from src.rate_limit import TokenBucketLimiter
+
+
+class FakeGeminiHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 才会保持长连接
+    protocol_version = "HTTP/1.1"
+    requests_seen = []
+    paths_seen = []
+    # 在返回正常结果之前先返回多少次 429
+    rate_limited = 0
+    # 流式响应在两个片段之间停顿的秒数，只生效一次
+    stall = 0
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        if self.headers.get('Content-Encoding') == 'gzip':
+            body = gzip.decompress(body)
+        prompt = json.loads(body)["contents"][0]["parts"][0]["text"]
+        FakeGeminiHandler.requests_seen.append(dict(self.headers))
+        FakeGeminiHandler.paths_seen.append(self.path.split('?')[0])
+
+        if FakeGeminiHandler.rate_limited > 0:
+            FakeGeminiHandler.rate_limited -= 1
+            self._send_json(429, {"error": {"code": 429, "status": "RESOURCE_EXHAUSTED", "details": [
+                {"@type": "type.googleapis.com/google.rpc.RetryInfo", "retryDelay": "0.01s"}]}})
+            return
+
+        if ':streamGenerateContent' in self.path:
+            self._send_stream(f"echo: {prompt}")
+            return
+
+        payload = json.dumps({
+            "candidates": [{"content": {"parts": [{"text": f"echo: {prompt}"}]}, "finishReason": "STOP"}],
+            "usageMetadata": {"promptTokenCount": 3, "candidatesTokenCount": 2},
+        }).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        if 'gzip' in self.headers.get('Accept-Encoding', '') and 'gzip' in self.headers.get('User-Agent', ''):
+            payload = gzip.compress(payload)
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_stream(self, text):
+        middle = len(text) // 2
+        events = [
+            {"candidates": [{"content": {"parts": [{"text": "思考中", "thought": True}], "role": "model"}}]},
+            {"candidates": [{"content": {"parts": [{"text": text[:middle]}], "role": "model"}}]},
+            {"candidates": [{"content": {"parts": [{"text": text[middle:]}], "role": "model"},
+                             "finishReason": "STOP"}],
+             "usageMetadata": {"promptTokenCount": 3, "candidatesTokenCount": 2}},
+        ]
+        chunks = [f"data: {json.dumps(event, ensure_ascii=False)}\r\n\r\n".encode('utf-8') for event in events]
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Content-Length', str(sum(len(chunk) for chunk in chunks)))
+        self.end_headers()
+        for i, chunk in enumerate(chunks):
+            self.wfile.write(chunk)
+            self.wfile.flush()
+            if i == 1 and FakeGeminiHandler.stall:
+                stall, FakeGeminiHandler.stall = FakeGeminiHandler.stall, 0
+                # 不使用 time.sleep：测试中会被 mock 替换
+                threading.Event().wait(stall)
+
+    def _send_json(self, status, data):
+        payload = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeServerTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeGeminiHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}/v1beta/models"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        FakeGeminiHandler.requests_seen = []
+        FakeGeminiHandler.paths_seen = []
+        FakeGeminiHandler.rate_limited = 0
+        FakeGeminiHandler.stall = 0
+        self.client = ModelClient("test-key", "fake-model")
+        self.client.stream = False
+        self.client.api_url = f"{self.base_url}/fake-model:generateContent"
+        self.client.session.limiter.min_interval = 0
+
+
+class TestModelClient(FakeServerTestCase):
+    def test_keep_alive_connection_is_reused(self):
+        for i in range(3):
+            response = self.client.chat_completion([{"role": "user", "content": f"hello {i}"}])
+            self.assertEqual(response["choices"][0]["message"]["content"], f"echo: hello {i}")
+
+        self.assertEqual(self.client.connection_stats(), {'connections': 1, 'requests': 3, 'reused': 2})
+        self.assertIn('gzip', FakeGeminiHandler.requests_seen[0]['User-Agent'])
+
+    def test_gzip_request_body(self):
+        self.client.gzip_requests = True
+        response = self.client.chat_completion([{"role": "user", "content": "压缩请求"}])
+        self.assertEqual(response["choices"][0]["message"]["content"], "echo: 压缩请求")
+        self.assertEqual(FakeGeminiHandler.requests_seen[0]['Content-Encoding'], 'gzip')
+
+    def test_rate_limit_waits_do_not_consume_retries(self):
+        # 429 次数超过 retry_count，但按 RetryInfo 等待后仍然成功
+        FakeGeminiHandler.rate_limited = 4
+        self.client.rate_limiter = TokenBucketLimiter(requests_per_minute=600, tokens_per_minute=100000)
+        response = self.client.chat_completion([{"role": "user", "content": "限流"}])
+        self.assertEqual(response["choices"][0]["message"]["content"], "echo: 限流")
+        self.assertEqual(len(FakeGeminiHandler.requests_seen), 5)
+
+    def test_long_retry_after_gives_up_without_pausing_limiter(self):
+        # 服务器要求的等待时间超过 max_retry_after：放弃本次调用，其他调用方不受影响
+        FakeGeminiHandler.rate_limited = 1
+        limiter = self.client.rate_limiter = TokenBucketLimiter(requests_per_minute=600, tokens_per_minute=100000)
+        with mock.patch.dict(LLM_CONFIG, {'max_retry_after': 0.001}):
+            with self.assertRaises(Exception):
+                self.client.chat_completion([{"role": "user", "content": "配额用尽"}])
+        self.assertEqual(len(FakeGeminiHandler.requests_seen), 1)
+        self.assertEqual(limiter._paused_until, 0.0)
+
+    def test_streaming_response_is_merged(self):
+        self.client.stream = True
+        response = self.client.chat_completion([{"role": "user", "content": "流式生成"}])
+        self.assertEqual(response["choices"][0]["message"]["content"], "echo: 流式生成")
+        self.assertEqual(response["usage"]["promptTokenCount"], 3)
+
+    def test_streaming_idle_timeout_is_retried(self):
+        self.client.stream = True
+        self.client.idle_timeout = 0.2
+        FakeGeminiHandler.stall = 1.0
+        with mock.patch('src.paper_summarizer.time.sleep'):
+            response = self.client.chat_completion([{"role": "user", "content": "停顿"}])
+        self.assertEqual(response["choices"][0]["message"]["content"], "echo: 停顿")
+        self.assertEqual(len(FakeGeminiHandler.requests_seen), 2)
+
+
+
+class TestModelRouting(FakeServerTestCase):
+    def setUp(self):
+        patcher = mock.patch.dict(LLM_CONFIG, {
+            'fallback_models': ['backup-model'],
+            'model_budgets': {'fake-model': {'max_input_tokens': 100, 'max_latency': None}},
+            'route_cooldown': 60,
+        })
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        super().setUp()
+
+    def models_seen(self):
+        return [path.split('/')[-1].split(':')[0] for path in FakeGeminiHandler.paths_seen]
+
+    def test_rate_limit_spills_over_to_fallback_model(self):
+        FakeGeminiHandler.rate_limited = 1
+        response = self.client.chat_completion([{"role": "user", "content": "限流"}])
+        self.assertEqual(response["model"], "backup-model")
+        # 主模型在冷却时间内被跳过
+        self.client.chat_completion([{"role": "user", "content": "冷却"}])
+        self.assertEqual(self.models_seen(), ["fake-model", "backup-model", "backup-model"])
+
+    def test_requests_over_input_budget_use_next_model(self):
+        self.assertEqual(self.client.chat_completion([{"role": "user", "content": "短"}])["model"], "fake-model")
+        self.assertEqual(self.client.chat_completion([{"role": "user", "content": "长" * 1000}])["model"],
+                         "backup-model")
+
+    def test_slow_model_is_skipped(self):
+        self.client.routes[0].max_latency = 1e-6
+        self.client.chat_completion([{"role": "user", "content": "慢"}])
+        self.client.chat_completion([{"role": "user", "content": "换模型"}])
+        self.assertEqual(self.models_seen(), ["fake-model", "backup-model"])
+
+
+if __name__ == '__main__':
+    unittest.main()
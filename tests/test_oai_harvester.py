@@ -0,0 +1,158 @@
+"""
+OAI-PMH 收割测试模块，使用本地 HTTP 服务模拟 OAI-PMH 接口
+"""
+import json
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+from urllib.parse import urlparse, parse_qs
+from src import oai_harvester
+from src.oai_harvester import OAIHarvester, category_to_set
+
+
+def oai_record(arxiv_id, categories, deleted=False):
+    if deleted:
+        return f"""<record><header status="deleted"><identifier>oai:arXiv.org:{arxiv_id}</identifier></header></record>"""
+    return f"""
+    <record>
+      <header><identifier>oai:arXiv.org:{arxiv_id}</identifier><datestamp>2024-03-02</datestamp></header>
+      <metadata>
+        <arXiv xmlns="http://arxiv.org/OAI/arXiv/">
+          <id>{arxiv_id}</id><created>2024-03-01</created>
+          <authors>
+            <author><keyname>Doe</keyname><forenames>Jane</forenames></author>
+            <author><keyname>Roe</keyname><forenames>R.</forenames><suffix>Jr</suffix></author>
+          </authors>
+          <title>Paper {arxiv_id}:
+            a study</title>
+          <categories>{categories}</categories>
+          <comments>10 pages</comments>
+          <abstract>  Abstract of {arxiv_id}.
+          </abstract>
+        </arXiv>
+      </metadata>
+    </record>"""
+
+
+def oai_page(records, token=None, size=5):
+    token_xml = f'<resumptionToken completeListSize="{size}">{token or ""}</resumptionToken>'
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<OAI-PMH xmlns="http://www.openarchives.org/OAI/2.0/">
+  <responseDate>2024-03-03T00:00:00Z</responseDate>
+  <ListRecords>{"".join(records)}{token_xml}</ListRecords>
+</OAI-PMH>""".encode('utf-8')
+
+
+# 以 resumptionToken 为键的分页，None 表示第一页
+PAGES = {
+    None: oai_page([oai_record("2403.00001", "cs.NE cs.LG"), oai_record("2403.00002", "cs.CV")], "t1"),
+    "t1": oai_page([oai_record("2403.00003", "cs.CV cs.NE"), oai_record("2403.00004", "x", deleted=True)], "t2"),
+    "t2": oai_page([oai_record("2403.00005", "cs.NE")]),
+}
+
+
+class OAIHandler(BaseHTTPRequestHandler):
+    requests_seen = []
+    fail_next = 0
+
+    def do_GET(self):
+        params = {key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()}
+        OAIHandler.requests_seen.append(params)
+        if OAIHandler.fail_next:
+            OAIHandler.fail_next -= 1
+            self.send_response(503)
+            self.send_header('Retry-After', '1')
+            self.end_headers()
+            return
+        body = PAGES[params.get('resumptionToken')]
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/xml')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestOAIHarvester(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), OAIHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.config = {
+            'base_url': f"http://127.0.0.1:{cls.server.server_address[1]}/oai",
+            'delay_seconds': 0,
+            'num_retries': 2,
+            'timeout': 5,
+        }
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        OAIHandler.requests_seen = []
+        OAIHandler.fail_next = 0
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.checkpoint = str(Path(self.tmp_dir.name) / "checkpoint.json")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_category_to_set(self):
+        self.assertEqual(category_to_set("cs.NE"), "cs")
+        self.assertEqual(category_to_set("q-bio.NC"), "q-bio")
+        self.assertEqual(category_to_set("hep-th"), "physics:hep-th")
+
+    def test_harvest_filters_and_parses_records(self):
+        harvester = OAIHarvester(self.config)
+        records = list(harvester.iter_records(["cs.NE"], "2024-03-01", "2024-03-02"))
+
+        self.assertEqual([r['entry_id'] for r in records],
+                         ["http://arxiv.org/abs/2403.00001", "http://arxiv.org/abs/2403.00003",
+                          "http://arxiv.org/abs/2403.00005"])
+        first = records[0]
+        self.assertEqual(first['title'], "Paper 2403.00001: a study")
+        self.assertEqual(list(first['authors']), ["Jane Doe", "R. Roe Jr"])
+        self.assertEqual(first['published'], "2024-03-01T00:00:00+00:00")
+        self.assertEqual(first['primary_category'], "cs.NE")
+        self.assertEqual(first['summary'], "Abstract of 2403.00001.")
+        self.assertEqual(first['comment'], "10 pages")
+        self.assertEqual(OAIHandler.requests_seen[0],
+                         {'verb': 'ListRecords', 'metadataPrefix': 'arXiv', 'set': 'cs',
+                          'from': '2024-03-01', 'until': '2024-03-02'})
+        self.assertEqual(OAIHandler.requests_seen[1], {'verb': 'ListRecords', 'resumptionToken': 't1'})
+
+    def test_resume_from_checkpoint(self):
+        harvester = OAIHarvester(self.config)
+        pages = harvester.iter_pages(["cs.NE"], checkpoint_file=self.checkpoint)
+        next(pages)
+        next(pages)
+        pages.close()
+        # 取第二页时第一页已处理完，检查点指向第二页
+        with open(self.checkpoint, encoding='utf-8') as f:
+            self.assertEqual(json.load(f)['resumption_token'], "t1")
+
+        OAIHandler.requests_seen = []
+        resumed = list(harvester.iter_records(["cs.NE"], checkpoint_file=self.checkpoint))
+        self.assertEqual([r['entry_id'][-5:] for r in resumed], ["00003", "00005"])
+        self.assertEqual(OAIHandler.requests_seen[0], {'verb': 'ListRecords', 'resumptionToken': 't1'})
+        self.assertFalse(Path(self.checkpoint).exists())
+
+    def test_retry_after_on_503(self):
+        OAIHandler.fail_next = 1
+        harvester = OAIHarvester(self.config)
+        with mock.patch.object(oai_harvester.time, 'sleep') as sleep:
+            records = list(harvester.iter_records(["cs.NE"]))
+        sleep.assert_called_once_with(1.0)
+        self.assertEqual(len(records), 3)
+        self.assertEqual(len(OAIHandler.requests_seen), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+"""
+PaperStore 测试模块
+"""
+import os
+import tempfile
+import unittest
+from src.arxiv_client import ArxivClient
+from src.paper_store import PaperStore, split_arxiv_id
+from config.settings import SEARCH_CONFIG
+from benchmarks.atom_fixtures import make_corpus, ReplaySession
+
+
+def make_paper(entry_id, title="Test Paper"):
+    return {'entry_id': entry_id, 'title': title, 'published': '2025-01-01T00:00:00+00:00'}
+
+
+class TestSplitArxivId(unittest.TestCase):
+    def test_split_arxiv_id(self):
+        self.assertEqual(split_arxiv_id("http://arxiv.org/abs/2401.12345v2"), ("2401.12345", 2))
+        self.assertEqual(split_arxiv_id("https://arxiv.org/abs/2401.12345"), ("2401.12345", None))
+        self.assertEqual(split_arxiv_id("http://arxiv.org/abs/hep-th/9901001v1"), ("hep-th/9901001", 1))
+        self.assertEqual(split_arxiv_id("2401.12345v3"), ("2401.12345", 3))
+
+
+class TestPaperStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "seen.db")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_versions_share_membership(self):
+        with PaperStore(self.db_path) as store:
+            store.mark_summarized([make_paper("http://arxiv.org/abs/2401.00001v1")])
+            store.mark_seen([make_paper("http://arxiv.org/abs/2401.00002v1")])
+
+            self.assertIn("http://arxiv.org/abs/2401.00001v2", store)
+            self.assertTrue(store.is_summarized("http://arxiv.org/abs/2401.00001v2"))
+            self.assertIn("http://arxiv.org/abs/2401.00002v1", store)
+            self.assertFalse(store.is_summarized("http://arxiv.org/abs/2401.00002v1"))
+
+    def test_persists_and_records_versions(self):
+        with PaperStore(self.db_path) as store:
+            store.mark_summarized([make_paper("http://arxiv.org/abs/2401.00001v1")])
+            store.mark_seen([make_paper("http://arxiv.org/abs/2401.00001v3")])
+            store.mark_seen([make_paper("http://arxiv.org/abs/2401.00001v2")])
+
+        with PaperStore(self.db_path) as store:
+            self.assertEqual(len(store), 1)
+            records = store.lookup(["http://arxiv.org/abs/2401.00001v1", "2402.99999"])
+            self.assertEqual(list(records), ["2401.00001"])
+            record = records["2401.00001"]
+            self.assertEqual(record['version'], 3)
+            self.assertEqual(record['entry_id'], "http://arxiv.org/abs/2401.00001v3")
+            self.assertEqual(record['summarized_version'], 1)
+
+    def test_search_skips_summarized_papers(self):
+        categories = ["cs.NE", "cs.AI"]
+        corpus = make_corpus(categories, papers_per_category=30)
+        config = dict(SEARCH_CONFIG, max_total_results=500, page_size=20,
+                      delay_seconds=0, stop_after_known=5)
+
+        with PaperStore(self.db_path) as store:
+            client = ArxivClient(config, session=ReplaySession(corpus))
+            first_run = client.search_papers(categories=categories, query="", store=store)
+            self.assertEqual(len(first_run), 60)
+            store.mark_summarized(first_run[10:])
+
+            # 新版本的论文同样视为已总结，只返回未总结的前10篇
+            session = ReplaySession(corpus)
+            client = ArxivClient(config, session=session)
+            second_run = client.search_papers(categories=categories, query="", store=store)
+            self.assertEqual([p['entry_id'] for p in second_run], [p['entry_id'] for p in first_run[:10]])
+            self.assertEqual(len(session.requests), 1)
+
+    def test_rejected_papers_are_refetched_but_end_the_search(self):
+        categories = ["cs.NE", "cs.AI"]
+        corpus = make_corpus(categories, papers_per_category=30)
+        config = dict(SEARCH_CONFIG, max_total_results=500, page_size=20,
+                      delay_seconds=0, stop_after_known=5)
+
+        with PaperStore(self.db_path) as store:
+            first_run = ArxivClient(config, session=ReplaySession(corpus)).search_papers(
+                categories=categories, query="", store=store)
+            store.mark_summarized(first_run[:3])
+            store.mark_rejected(first_run[3:], 'relevance')
+            self.assertTrue(store.is_rejected(first_run[3]['entry_id']))
+            self.assertFalse(store.is_rejected(first_run[0]['entry_id']))
+
+        # 被过滤的论文重新产出供下游重新过滤，同时计入连续已处理的篇数
+        with PaperStore(self.db_path) as store:
+            self.assertTrue(store.is_rejected(first_run[3]['entry_id']))
+            second_run = ArxivClient(config, session=ReplaySession(corpus)).search_papers(
+                categories=categories, query="", store=store)
+            self.assertEqual([p['entry_id'] for p in second_run], [p['entry_id'] for p in first_run[3:4]])
+
+            # 之后生成了摘要的论文不再是被过滤状态
+            store.mark_summarized(first_run[3:4])
+            self.assertFalse(store.is_rejected(first_run[3]['entry_id']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,189 @@
+"""
+运行流水线测试模块
+"""
+import json
+import tempfile
+import unittest
+from collections import deque
+from pathlib import Path
+from unittest import mock
+from config.settings import BATCH_CONFIG, DEDUP_CONFIG, RELEVANCE_CONFIG, SUMMARY_CACHE_CONFIG
+from src.arxiv_client import ArxivClient
+from src.dedup import DedupIndex
+from src.paper_store import PaperStore
+from src.pipeline import Pipeline
+from tests.test_streaming import StubModelClient, make_paper
+
+
+class StubArxivClient(ArxivClient):
+    """
+    按给定列表产出论文的检索客户端，与真实检索一样跳过已总结的论文
+
+    wait_for 给出时，产出最后一篇前等待该事件；failed_query 给出时，产出所有论文后将其记录为出错的子查询
+    """
+
+    def __init__(self, papers, wait_for=None, failed_query=None):
+        super().__init__()
+        self.papers = papers
+        self.wait_for = wait_for
+        self.failed_query = failed_query
+        self.overlapped = None
+
+    def iter_papers(self, categories=None, query="", last_run_file=None, store=None, date_range=None):
+        for i, paper in enumerate(self.papers):
+            if self.wait_for is not None and i == len(self.papers) - 1:
+                self.overlapped = self.wait_for.wait(timeout=5)
+            if store is None or not store.is_summarized(paper['entry_id']):
+                yield paper
+        if self.failed_query is not None:
+            self.failed_queries.append(self.failed_query)
+
+
+class TestPipeline(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.output_dir = Path(self.tmp_dir.name) / "data"
+        self.state_dir = Path(self.tmp_dir.name) / "state"
+        patchers = [
+            mock.patch.dict(RELEVANCE_CONFIG, {'enabled': False}),
+            mock.patch.dict(DEDUP_CONFIG, {'enabled': True}),
+            mock.patch.dict(SUMMARY_CACHE_CONFIG, {'enabled': False}),
+            mock.patch.dict(BATCH_CONFIG, {'max_papers': 2}),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def run_pipeline(self, papers, wait_for_model=False, failed_query=None, model_client=None, **kwargs):
+        model_client = model_client or StubModelClient()
+        arxiv_client = StubArxivClient(papers, wait_for=model_client.called if wait_for_model else None,
+                                       failed_query=failed_query)
+        config = {'fetch_queue': 2, 'filter_queue': 2, 'render_queue': 1, 'github_dir': None}
+        pipeline = Pipeline(output_dir=str(self.output_dir), state_dir=str(self.state_dir), arxiv_client=arxiv_client,
+                            model_client=model_client, config=config, **kwargs)
+        return pipeline, pipeline.run(), model_client, arxiv_client
+
+    def test_stages_overlap_and_run_completes(self):
+        papers = [make_paper(i) for i in range(7)]
+        pipeline, success, model_client, arxiv_client = self.run_pipeline(papers, wait_for_model=True,
+                                                                          update_site=True)
+        self.assertTrue(success)
+        # 最后一篇论文检索之前第一批摘要已经开始生成
+        self.assertTrue(arxiv_client.overlapped)
+        self.assertEqual(sum(len(links) for links in model_client.calls), 7)
+
+        report = Path(pipeline.output_file).read_text(encoding='utf-8')
+        self.assertEqual(report.count("研究目的"), 7)
+        self.assertIn("论文数量: 7 篇", report)
+        with open(self.state_dir / "last_run.json", encoding='utf-8') as f:
+            self.assertEqual(json.load(f)['latest_entry_id'], papers[0]['entry_id'])
+        with PaperStore(str(self.state_dir / "seen_papers.db")) as store:
+            self.assertTrue(all(store.is_summarized(paper['entry_id']) for paper in papers))
+        self.assertFalse((self.state_dir / "run_journal.jsonl").exists())
+        # 章节写入时加入近似重复索引，运行中只保留检索数量和第一篇论文的ID
+        with DedupIndex(str(self.state_dir / "dedup_index.db")) as index:
+            self.assertEqual(len(index), 7)
+        self.assertEqual((pipeline.fetch_count, pipeline.latest_entry_id), (7, papers[0]['entry_id']))
+        self.assertEqual(pipeline.in_flight, deque())
+
+        # 网站更新阶段：首页为本次报告，阶段耗时写入运行指标
+        self.assertIn("论文数量: 7 篇", (self.output_dir / "index.md").read_text(encoding='utf-8'))
+        with open(Path(pipeline.output_file).with_suffix('.metrics.json'), encoding='utf-8') as f:
+            metrics = json.load(f)
+        self.assertIn('site.index', metrics['stages'])
+        self.assertEqual(metrics['counters']['summary.papers'], 7)
+
+    def test_state_is_kept_out_of_the_published_output(self):
+        # 旧版本写在输出目录中的状态文件在运行时移动到状态目录
+        self.output_dir.mkdir()
+        legacy = {'latest_entry_id': "http://arxiv.org/abs/2401.00001v1"}
+        (self.output_dir / "last_run.json").write_text(json.dumps(legacy), encoding='utf-8')
+        pipeline, success, _, _ = self.run_pipeline([make_paper(i) for i in range(2)])
+        self.assertTrue(success)
+        published = {path.name for path in self.output_dir.iterdir()}
+        self.assertEqual(published, {Path(pipeline.output_file).name,
+                                     Path(pipeline.output_file).with_suffix('.metrics.json').name})
+        self.assertTrue({"last_run.json", "seen_papers.db", "dedup_index.db", "metadata.jsonl.gz"}
+                        <= {path.name for path in self.state_dir.iterdir()})
+
+    def test_failed_sub_query_fails_the_run(self):
+        papers = [make_paper(i) for i in range(3)]
+        pipeline, success, model_client, _ = self.run_pipeline(papers, failed_query="cat:cs.AI")
+        self.assertFalse(success)
+        self.assertEqual(sum(len(links) for links in model_client.calls), 3)
+        # 检索不完整：不更新运行记录，保留运行日志以便恢复
+        self.assertFalse((self.state_dir / "last_run.json").exists())
+        self.assertTrue((self.state_dir / "run_journal.jsonl").exists())
+        with open(Path(pipeline.output_file).with_suffix('.metrics.json'), encoding='utf-8') as f:
+            self.assertFalse(json.load(f)['info']['success'])
+
+    def test_failed_summary_fails_the_run(self):
+        papers = [make_paper(i) for i in range(3)]
+
+        class FailingModelClient(StubModelClient):
+            def chat_completion(self, messages, temperature=None, max_tokens=None):
+                if papers[1]['entry_id'] in messages[-1]["content"]:
+                    raise ConnectionError("connection reset")
+                return super().chat_completion(messages, temperature, max_tokens)
+
+        with mock.patch('src.paper_summarizer.time.sleep'):
+            _, success, _, _ = self.run_pipeline(papers, model_client=FailingModelClient())
+        # 有论文摘要生成失败：不更新运行记录，保留运行日志，恢复时只重新生成失败的论文
+        self.assertFalse(success)
+        self.assertFalse((self.state_dir / "last_run.json").exists())
+        self.assertTrue((self.state_dir / "run_journal.jsonl").exists())
+
+        _, success, model_client, _ = self.run_pipeline([], resume=True)
+        self.assertTrue(success)
+        self.assertEqual(model_client.calls, [[papers[1]['entry_id']]])
+        self.assertTrue((self.state_dir / "last_run.json").exists())
+
+    def test_duplicates_of_previous_run_are_skipped(self):
+        self.run_pipeline([make_paper(i) for i in range(3)])
+        # 摘要原文相同，第二次运行中的论文均视为此前已总结论文的重复
+        duplicate = dict(make_paper(10), title="Paper 0")
+        pipeline, success, model_client, _ = self.run_pipeline([duplicate])
+        self.assertTrue(success)
+        self.assertEqual(model_client.calls, [])
+        self.assertIsNone(pipeline.output_file)
+        with PaperStore(str(self.state_dir / "seen_papers.db")) as store:
+            self.assertFalse(store.is_summarized(duplicate['entry_id']))
+            self.assertTrue(store.is_rejected(duplicate['entry_id']))
+
+    def test_duplicates_section_precedes_footer(self):
+        self.run_pipeline([make_paper(0)])
+        duplicate = dict(make_paper(10), title="Paper 0")
+        fresh = dict(make_paper(11), summary="A different abstract about event cameras")
+        pipeline, success, model_client, _ = self.run_pipeline([duplicate, fresh])
+        self.assertTrue(success)
+        self.assertEqual(model_client.calls, [[fresh['entry_id']]])
+        report = Path(pipeline.output_file).read_text(encoding='utf-8')
+        self.assertIn(duplicate['entry_id'], report)
+        self.assertLess(report.index("## 疑似重复论文"), report.index("## 生成说明"))
+        self.assertTrue(report.rstrip().endswith("请以原始论文为准。"))
+
+    def test_filtered_papers_are_refiltered_after_config_change(self):
+        papers = [dict(make_paper(i), title=f"Spiking paper {i}" if i < 2 else f"Paper {i}") for i in range(4)]
+        relevance = {'enabled': True, 'keywords': {'spiking': 1.0}, 'min_score': 1.0, 'top_n': 1}
+        with mock.patch.dict(RELEVANCE_CONFIG, relevance):
+            _, success, model_client, _ = self.run_pipeline(papers)
+        self.assertTrue(success)
+        self.assertEqual(model_client.calls, [[papers[0]['entry_id']]])
+        with PaperStore(str(self.state_dir / "seen_papers.db")) as store:
+            self.assertTrue(store.is_summarized(papers[0]['entry_id']))
+            # 超出 top_n 和低于阈值的论文只记录为被过滤
+            self.assertFalse(any(store.is_summarized(paper['entry_id']) for paper in papers[1:]))
+            self.assertTrue(all(store.is_rejected(paper['entry_id']) for paper in papers[1:]))
+
+        # 放宽 top_n 后，上次被过滤的论文重新入选
+        with mock.patch.dict(RELEVANCE_CONFIG, dict(relevance, top_n=None)):
+            _, success, model_client, _ = self.run_pipeline(papers)
+        self.assertTrue(success)
+        self.assertEqual(model_client.calls, [[papers[1]['entry_id']]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+"""
+多主题测试模块
+"""
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+from config.settings import BATCH_CONFIG, DEDUP_CONFIG, RELEVANCE_CONFIG, SUMMARY_CACHE_CONFIG
+from src.pipeline import Pipeline
+from src.profiles import Profile, load_profiles, union_categories, union_keywords, union_query
+from tests.test_pipeline import StubArxivClient
+from tests.test_streaming import StubModelClient, make_paper
+
+PROFILES = {
+    'snn': {'title': "脉冲神经网络", 'categories': ["cs.NE", "cs.LG"], 'query': "Spiking OR SNN"},
+    'event': {'title': "事件相机", 'categories': ["cs.CV"], 'query': '"event camera" OR Spiking'},
+}
+
+
+def make_topic_paper(i, title, categories):
+    return dict(make_paper(i), title=title, categories=categories)
+
+
+class TestProfiles(unittest.TestCase):
+    def test_union_of_queries_and_categories(self):
+        profiles = load_profiles(PROFILES)
+        self.assertEqual(union_query(profiles), 'Spiking OR SNN OR "event camera"')
+        self.assertEqual(union_categories(profiles), ["cs.NE", "cs.LG", "cs.CV"])
+        self.assertEqual(union_query(profiles + [Profile('x', query="(A AND B)")]),
+                         '(Spiking OR SNN) OR ("event camera" OR Spiking) OR ((A AND B))')
+        # 任一主题不限分类或查询时，并集同样不限
+        self.assertEqual(union_categories(profiles + [Profile('all', query="X")]), [])
+        self.assertEqual(union_query(profiles + [Profile('all', ["cs.AI"])]), "")
+        self.assertEqual(union_keywords(profiles, {'SNN': 2.0}), {'SNN': 2.0, 'Spiking': 1.0, 'event camera': 1.0})
+        self.assertEqual([profile.name for profile in load_profiles(PROFILES, ['event'])], ['event'])
+        with self.assertRaises(ValueError):
+            load_profiles(PROFILES, ['missing'])
+
+    def test_matches_requires_category_and_keyword(self):
+        snn = Profile.from_config('snn', PROFILES['snn'])
+        self.assertTrue(snn.matches(make_topic_paper(0, "Spiking transformers", ["cs.LG"])))
+        self.assertFalse(snn.matches(make_topic_paper(1, "Spiking transformers", ["cs.CV"])))
+        self.assertFalse(snn.matches(make_topic_paper(2, "Vision transformers", ["cs.LG"])))
+        self.assertTrue(Profile('all', ["cs.LG"]).matches(make_topic_paper(3, "Anything", ["cs.LG"])))
+
+
+class TestMultiProfileRun(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.output_dir = Path(self.tmp_dir.name)
+        patchers = [
+            mock.patch.dict(RELEVANCE_CONFIG, {'enabled': True, 'keywords': {'neuromorphic': 1.0},
+                                               'min_score': 1.0, 'rank': False, 'top_n': None}),
+            mock.patch.dict(DEDUP_CONFIG, {'enabled': False}),
+            mock.patch.dict(SUMMARY_CACHE_CONFIG, {'enabled': False}),
+            mock.patch.dict(BATCH_CONFIG, {'max_papers': 2}),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_shared_fetch_and_summaries_fan_out_to_profiles(self):
+        papers = [
+            make_topic_paper(0, "Spiking neural networks", ["cs.NE"]),
+            make_topic_paper(1, "Spiking event camera tracking", ["cs.CV", "cs.NE"]),
+            make_topic_paper(2, "SNN compression", ["cs.LG"]),
+            make_topic_paper(3, "Event camera deblurring", ["cs.CV"]),
+            make_topic_paper(4, "Protein folding", ["cs.LG"]),
+        ]
+        arxiv_client = StubArxivClient(papers)
+        model_client = StubModelClient()
+        with mock.patch.object(StubArxivClient, 'iter_papers', wraps=arxiv_client.iter_papers) as iter_papers:
+            pipeline = Pipeline(output_dir=str(self.output_dir), state_dir=str(self.output_dir / "state"),
+                                arxiv_client=arxiv_client, model_client=model_client,
+                                profiles=load_profiles(PROFILES), update_site=True, config={'github_dir': None})
+            self.assertTrue(pipeline.run())
+
+        # 只检索一次所有主题的并集
+        iter_papers.assert_called_once()
+        self.assertEqual(iter_papers.call_args.kwargs['query'], 'Spiking OR SNN OR "event camera"')
+        self.assertEqual(iter_papers.call_args.kwargs['categories'], ["cs.NE", "cs.LG", "cs.CV"])
+        # 不属于任何主题的论文被过滤，同时属于两个主题的论文只生成一次摘要
+        summarized = sorted(link for links in model_client.calls for link in links)
+        self.assertEqual(summarized, sorted(paper['entry_id'] for paper in papers[:4]))
+
+        report_name = Path(pipeline.output_file).name
+        snn = (self.output_dir / "snn" / report_name).read_text(encoding='utf-8')
+        event = (self.output_dir / "event" / report_name).read_text(encoding='utf-8')
+        self.assertIn("# Arxiv论文总结报告 - 脉冲神经网络", snn)
+        self.assertIn("论文数量: 3 篇", snn)
+        self.assertIn("论文数量: 2 篇", event)
+        self.assertIn(papers[1]['entry_id'], snn)
+        self.assertIn(papers[1]['entry_id'], event)
+        self.assertNotIn(papers[3]['entry_id'], snn)
+        self.assertEqual(pipeline.metrics.counters['profile.snn.papers'], 3)
+
+        # 网站栏目：各主题有自己的首页，总首页链接到各栏目
+        index = (self.output_dir / "index.md").read_text(encoding='utf-8')
+        self.assertIn("[脉冲神经网络](snn/index.md) | [事件相机](event/index.md)", index)
+        self.assertIn("论文数量: 2 篇", (self.output_dir / "event" / "index.md").read_text(encoding='utf-8'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+"""
+提示词模板与系统指令缓存测试模块
+"""
+import os
+import tempfile
+import unittest
+from unittest import mock
+from benchmarks.fake_gemini import FakeGeminiServer
+from config.settings import LLM_CONFIG
+from src.metrics import RunMetrics
+from src.paper_summarizer import PaperSummarizer
+from src.prompts import system_instruction
+from tests.test_streaming import make_paper
+
+
+class TestPromptTemplates(unittest.TestCase):
+    def test_rules_are_sent_as_system_instruction(self):
+        summarizer = PaperSummarizer("fake-key", "fake-model")
+        messages = summarizer._build_messages([make_paper(0), make_paper(1)], 1)
+        self.assertEqual(messages[0], {"role": "system", "content": system_instruction('markdown')})
+        self.assertNotIn("关键指令", messages[1]["content"])
+        self.assertIn("arXiv链接: http://arxiv.org/abs/2501.00001v1", messages[1]["content"])
+
+        client = summarizer.client
+        body = client._create_request_body(messages)
+        self.assertEqual(body["systemInstruction"]["parts"][0]["text"], system_instruction('markdown'))
+        self.assertEqual(body["contents"][-1]["parts"][0]["text"], messages[1]["content"])
+        body = client._create_request_body(messages, cached_content="cachedContents/abc")
+        self.assertEqual(body["cachedContent"], "cachedContents/abc")
+        self.assertNotIn("systemInstruction", body)
+
+
+class TestContextCache(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.dict(LLM_CONFIG, {'context_cache': True, 'retry_delay': 0.01})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def summarize(self, server, papers):
+        metrics = RunMetrics()
+        summarizer = PaperSummarizer("fake-key", "fake-model", metrics=metrics)
+        summarizer.client.api_url = server.model_url("fake-model")
+        summarizer.max_papers_per_batch = 3
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self.assertTrue(summarizer.summarize_papers(iter(papers), os.path.join(tmp_dir, "summary_1.md")))
+        return metrics.counters
+
+    def test_shared_prefix_is_cached_once_per_run(self):
+        with FakeGeminiServer() as server:
+            counters = self.summarize(server, [make_paper(i) for i in range(9)])
+        self.assertEqual(counters['llm.context_caches'], 1)
+        self.assertEqual(server.fake.cache_hits, 3)
+        self.assertGreater(counters['llm.cached_tokens'], 0)
+        # 运行结束时删除缓存上下文
+        self.assertEqual(server.fake.caches, {})
+
+    def test_rejected_cache_falls_back_to_inline_instruction(self):
+        with FakeGeminiServer(min_cache_tokens=100000) as server:
+            counters = self.summarize(server, [make_paper(i) for i in range(6)])
+        self.assertNotIn('llm.context_caches', counters)
+        self.assertEqual(server.fake.cache_hits, 0)
+        self.assertEqual(server.fake.statuses[200], 2)
+
+    def test_expired_cache_is_dropped(self):
+        papers = [make_paper(0)]
+        with FakeGeminiServer() as server:
+            summarizer = PaperSummarizer("fake-key", "fake-model")
+            summarizer.client.api_url = server.model_url("fake-model")
+            summarizer._generate_batch_summaries(papers, 1)
+            server.fake.caches.clear()
+            summary = summarizer._generate_batch_summaries(papers, 1)
+        self.assertIn("主要发现", summary)
+        self.assertEqual(server.fake.statuses[404], 1)
+        self.assertEqual(server.fake.statuses[200], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+"""
+限速工具测试模块
+"""
+import io
+import json
+import unittest
+import requests
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from src.rate_limit import IntervalRateLimiter, ThrottledSession, TokenBucketLimiter, retry_after_seconds
+
+
+class FakeClock:
+    """可控时钟，sleep 只推进时间"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class FakeResponse:
+    def __init__(self, headers=None, body=None):
+        self.headers = headers or {}
+        self.text = json.dumps(body) if body is not None else ""
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class TestTokenBucketLimiter(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def limiter(self, rpm=None, tpm=None):
+        return TokenBucketLimiter(rpm, tpm, clock=self.clock, sleep=self.clock.sleep)
+
+    def test_requests_per_minute(self):
+        limiter = self.limiter(rpm=2)
+        self.assertEqual(limiter.acquire(), 0)
+        self.assertEqual(limiter.acquire(), 0)
+        # 桶已空，下一个请求要等一个请求的补充时间（30秒）
+        self.assertAlmostEqual(limiter.acquire(), 30)
+        self.assertAlmostEqual(self.clock.now, 30)
+
+    def test_tokens_per_minute_and_adjust(self):
+        limiter = self.limiter(tpm=600)
+        self.assertEqual(limiter.acquire(500), 0)
+        # 实际只用了 200 个 token，返还预估多扣的部分
+        limiter.adjust(-300)
+        self.assertEqual(limiter.acquire(400), 0)
+        self.assertAlmostEqual(limiter.acquire(100), 10)
+        # 超过整个桶容量的请求按满桶等待而不是永远阻塞
+        self.assertAlmostEqual(limiter.acquire(10000), 60)
+
+    def test_pause_blocks_all_callers(self):
+        limiter = self.limiter(rpm=60)
+        limiter.pause(5)
+        limiter.pause(2)
+        self.assertAlmostEqual(limiter.acquire(), 5)
+        unlimited = self.limiter()
+        unlimited.pause(3)
+        self.assertAlmostEqual(unlimited.acquire(1000), 3)
+
+
+class TestRetryAfter(unittest.TestCase):
+    def test_retry_after_header(self):
+        self.assertEqual(retry_after_seconds(FakeResponse({'Retry-After': '7'})), 7.0)
+        later = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+        self.assertAlmostEqual(retry_after_seconds(FakeResponse({'Retry-After': later})), 30, delta=2)
+
+    def test_google_retry_info(self):
+        body = {"error": {"code": 429, "status": "RESOURCE_EXHAUSTED", "details": [
+            {"@type": "type.googleapis.com/google.rpc.QuotaFailure", "violations": []},
+            {"@type": "type.googleapis.com/google.rpc.RetryInfo", "retryDelay": "23s"},
+        ]}}
+        self.assertEqual(retry_after_seconds(FakeResponse(body=body)), 23.0)
+        self.assertIsNone(retry_after_seconds(FakeResponse(body={"error": {"code": 503}})))
+        self.assertIsNone(retry_after_seconds(FakeResponse()))
+
+
+class BodySession:
+    """返回响应体尚未读取的响应，模拟 stream=True 的请求"""
+
+    def get(self, url, **kwargs):
+        response = requests.Response()
+        response.status_code = 200
+        response.raw = io.BytesIO(b"body")
+        return response
+
+
+class TestThrottledSession(unittest.TestCase):
+    def setUp(self):
+        self.session = ThrottledSession(BodySession(), IntervalRateLimiter(0), max_concurrent=1)
+
+    def slot_free(self):
+        if self.session._slots.acquire(blocking=False):
+            self.session._slots.release()
+            return True
+        return False
+
+    def test_stream_holds_slot_until_read_or_closed(self):
+        response = self.session.get("http://example.org", stream=True)
+        self.assertFalse(self.slot_free())
+        self.assertEqual(response.content, b"body")
+        self.assertTrue(self.slot_free())
+
+        response = self.session.get("http://example.org", stream=True)
+        self.assertFalse(self.slot_free())
+        response.close()
+        self.assertTrue(self.slot_free())
+        # 重复关闭不会多释放名额
+        response.close()
+        self.assertEqual(self.session._slots._value, 1)
+
+        # 未读完也未关闭的响应被回收时释放
+        response = self.session.get("http://example.org", stream=True)
+        self.assertFalse(self.slot_free())
+        del response
+        self.assertTrue(self.slot_free())
+
+    def test_non_stream_releases_slot_on_return(self):
+        self.session.get("http://example.org")
+        self.assertTrue(self.slot_free())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+"""
+PaperRecord 与 JSONL 读写测试模块
+"""
+import gzip
+import pickle
+import tempfile
+import unittest
+from pathlib import Path
+from src.records import PaperRecord, JsonlWriter, iter_jsonl
+
+
+def make_record(i):
+    return PaperRecord(
+        title=f"Paper {i}",
+        authors=["Alice", "Bob"],
+        published="2025-01-01T00:00:00+00:00",
+        updated="2025-01-02T00:00:00+00:00",
+        summary="Abstract",
+        primary_category="cs.NE",
+        categories=["cs.NE", "cs.AI"],
+        links=[f"https://arxiv.org/abs/2501.{i:05d}v1"],
+        entry_id=f"http://arxiv.org/abs/2501.{i:05d}v1",
+    )
+
+
+class TestPaperRecord(unittest.TestCase):
+    def test_mapping_access(self):
+        record = make_record(1)
+        self.assertEqual(record['title'], "Paper 1")
+        self.assertEqual(record.get('doi'), None)
+        self.assertEqual(record.get('missing', 'x'), 'x')
+        self.assertEqual(', '.join(record['authors']), "Alice, Bob")
+        self.assertFalse(hasattr(record, '__dict__'))
+        with self.assertRaises(KeyError):
+            record['missing']
+
+    def test_dict_round_trip(self):
+        record = make_record(2)
+        data = record.to_dict()
+        self.assertEqual(data['categories'], ["cs.NE", "cs.AI"])
+        self.assertEqual(PaperRecord.from_dict(dict(data, extra=1)), record)
+        self.assertEqual(pickle.loads(pickle.dumps(record)), record)
+
+
+class TestJsonl(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_append_and_lazy_read(self):
+        for name in ("papers.jsonl", "papers.jsonl.gz"):
+            path = Path(self.tmp_dir.name) / name
+            with JsonlWriter(path) as writer:
+                written = list(writer.tee(make_record(i) for i in range(3)))
+            with JsonlWriter(path) as writer:
+                writer.write({'title': "Plain dict", 'entry_id': "http://arxiv.org/abs/2501.99999v1"})
+
+            records = list(iter_jsonl(path))
+            self.assertEqual(records[:3], written)
+            self.assertEqual(records[3]['title'], "Plain dict")
+            self.assertEqual(records[3]['authors'], ())
+
+    def test_truncated_tail_is_skipped(self):
+        path = Path(self.tmp_dir.name) / "papers.jsonl"
+        with JsonlWriter(path) as writer:
+            writer.write(make_record(1))
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write('{"title": "broken')
+        self.assertEqual([r['title'] for r in iter_jsonl(path)], ["Paper 1"])
+
+        gz_path = Path(self.tmp_dir.name) / "papers.jsonl.gz"
+        with JsonlWriter(gz_path) as writer:
+            writer.write(make_record(1))
+        data = gz_path.read_bytes()
+        gz_path.write_bytes(data + gzip.compress(b'{"title": "x"}\n')[:12])
+        self.assertEqual([r['title'] for r in iter_jsonl(gz_path)], ["Paper 1"])
+
+
+if __name__ == '__main__':
+    unittest.main()
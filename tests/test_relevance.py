@@ -0,0 +1,57 @@
+"""
+相关性评分测试模块
+"""
+import unittest
+from src.relevance import RelevanceScorer, keywords_from_query
+
+
+def paper(title, summary=""):
+    return {'title': title, 'summary': summary, 'entry_id': title}
+
+
+class TestRelevanceScorer(unittest.TestCase):
+    def setUp(self):
+        self.scorer = RelevanceScorer(
+            {'spiking neural network*': 3.0, 'spiking': 2.0, 'neuromorph*': 3.0, 'event-based': 1.0},
+            title_weight=3.0, abstract_weight=1.0,
+        )
+
+    def test_score_weights_title_and_phrases(self):
+        # 标题中的短语按最长关键词匹配，只计 "spiking neural network" 而不重复计 "spiking"
+        self.assertEqual(self.scorer.score(paper("Spiking Neural Networks for Vision")), 9.0)
+        self.assertEqual(self.scorer.score(paper("A study", "spiking neural network")), 3.0)
+        # 空白与连字符可互换，前缀匹配 neuromorphic / neuromorphics
+        self.assertEqual(self.scorer.score(paper("Event based Neuromorphic chips")), 12.0)
+        self.assertEqual(self.scorer.score(paper("Large Language Models", "transformers")), 0.0)
+        # 摘要中重复命中按对数递减计分
+        repeated = self.scorer.score(paper("A study", "spiking " * 4))
+        self.assertGreater(repeated, 2.0)
+        self.assertLess(repeated, 8.0)
+
+    def test_rank_threshold_and_top_n(self):
+        papers = [
+            paper("LLM agents"),
+            paper("Event-based optical flow"),
+            paper("Neuromorphic hardware", "spiking"),
+            paper("Spiking transformers"),
+        ]
+        self.scorer.min_score = 1.0
+        ranked = self.scorer.rank(papers)
+        self.assertEqual([p['title'] for _, p in ranked],
+                         ["Neuromorphic hardware", "Spiking transformers", "Event-based optical flow"])
+
+        self.scorer.top_n = 2
+        self.assertEqual([p['title'] for _, p in self.scorer.rank(papers)],
+                         ["Neuromorphic hardware", "Spiking transformers"])
+        self.assertEqual([p['title'] for p in self.scorer.filter(papers)],
+                         ["Event-based optical flow", "Neuromorphic hardware", "Spiking transformers"])
+
+    def test_keywords_from_query(self):
+        self.assertEqual(list(keywords_from_query('ti:"spiking neuron" OR (SNN AND Event)')),
+                         ["spiking neuron", "SNN", "Event"])
+        scorer = RelevanceScorer.from_config({'keywords': None}, 'Spiking OR SNN')
+        self.assertEqual(scorer.score(paper("SNN training")), 3.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
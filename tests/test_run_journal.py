@@ -0,0 +1,94 @@
+"""
+运行日志测试模块
+"""
+import re
+import tempfile
+import unittest
+from pathlib import Path
+from src.paper_summarizer import PaperSummarizer
+from src.run_journal import RunJournal, load_journal
+from tests.test_streaming import StubModelClient, make_paper
+
+
+class SimulatedCrash(BaseException):
+    """模拟进程被中断（不会被摘要生成的异常处理捕获）"""
+
+
+class CrashingModelClient(StubModelClient):
+    """第 crash_on 次调用时中断运行"""
+
+    def __init__(self, crash_on):
+        super().__init__()
+        self.crash_on = crash_on
+
+    def chat_completion(self, messages, temperature=None, max_tokens=None):
+        if len(self.calls) + 1 == self.crash_on:
+            raise SimulatedCrash()
+        return super().chat_completion(messages, temperature, max_tokens)
+
+
+class TestRunJournal(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp_dir.name) / "run_journal.jsonl"
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_load_skips_truncated_record(self):
+        papers = [make_paper(i) for i in range(3)]
+        with RunJournal(self.path) as journal:
+            journal.start(output_file="summary.md", latest_entry_id=papers[0]['entry_id'])
+            for paper in papers:
+                journal.add_paper(paper)
+            journal.add_paper(dict(papers[0], entry_id=papers[0]['entry_id'].replace('v1', 'v2')))
+            journal.add_results([(papers[0], "section 0"), (papers[1], "section 1")])
+            # 写入时不在内存中保留论文和摘要章节
+            self.assertEqual((journal.papers, journal.results), ([], {}))
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write('{"type": "result", "id": "2501.00002", "sec')
+
+        state = load_journal(self.path)
+        self.assertTrue(state.resumable)
+        self.assertFalse(state.fetch_complete)
+        self.assertEqual(state.run['output_file'], "summary.md")
+        self.assertEqual([paper['title'] for paper in state.papers], ["Paper 0", "Paper 1", "Paper 2"])
+        self.assertEqual(state.completed(papers[1]), "section 1")
+        self.assertIsNone(state.completed(papers[2]))
+        # 新的运行清空原有日志
+        RunJournal(self.path).close()
+        self.assertFalse(load_journal(self.path).resumable)
+
+    def test_resume_after_crash_only_summarizes_remaining_papers(self):
+        papers = [make_paper(i) for i in range(6)]
+        output_file = str(Path(self.tmp_dir.name) / "summary.md")
+
+        journal = RunJournal(self.path)
+        journal.start(output_file=output_file, latest_entry_id=papers[0]['entry_id'])
+        summarizer = PaperSummarizer("test-key", journal=journal)
+        summarizer.max_papers_per_batch = 2
+        summarizer.concurrency = 1
+        summarizer.client = CrashingModelClient(crash_on=3)
+        with self.assertRaises(SimulatedCrash):
+            summarizer.summarize_papers(iter(papers), output_file)
+        journal.close()
+        # 报告增量写入，中断时只有头部和已完成的章节
+        self.assertNotIn("生成说明", Path(output_file).read_text(encoding='utf-8'))
+
+        journal = RunJournal(self.path, resume=True)
+        self.assertEqual(len(journal.papers), 6)
+        self.assertEqual(len(journal.results), 4)
+        summarizer = PaperSummarizer("test-key", journal=journal)
+        summarizer.client = StubModelClient()
+        self.assertTrue(summarizer.summarize_papers(list(journal.papers), journal.run['output_file']))
+        journal.discard()
+
+        self.assertEqual(summarizer.client.calls, [[paper['entry_id'] for paper in papers[4:]]])
+        report = Path(output_file).read_text(encoding='utf-8')
+        links = re.findall(r'^### .*?\]\((\S+)\)', report, re.MULTILINE)
+        self.assertEqual(links, [paper['entry_id'] for paper in papers])
+        self.assertFalse(self.path.exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,215 @@
+"""
+流式检索与摘要生成测试模块
+"""
+import re
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+from src.streaming import background_iter, iter_batches
+from src.paper_summarizer import PaperSummarizer
+
+
+class StubModelClient:
+    """按提示词中的论文数量返回对应数量摘要的模型客户端"""
+
+    model = "stub-model"
+
+    def __init__(self):
+        self.calls = []
+        self.called = threading.Event()
+
+    def chat_completion(self, messages, temperature=None, max_tokens=None):
+        prompt = messages[-1]["content"]
+        links = re.findall(r'arXiv链接: (\S+)', prompt)
+        self.calls.append(links)
+        self.called.set()
+        content = "\n".join(f"### [Paper]({link})\n* **🎯 研究目的**: ...\n* **⭐ 主要发现**: ...\n---"
+                            for link in links)
+        return {"choices": [{"message": {"role": "assistant", "content": content}}], "usage": {}}
+
+
+def make_paper(i):
+    return {
+        'title': f"Paper {i}",
+        'authors': ["Author"],
+        'published': "2025-01-01T00:00:00+00:00",
+        'entry_id': f"http://arxiv.org/abs/2501.{i:05d}v1",
+        'summary': "Abstract",
+    }
+
+
+class TestStreamingUtils(unittest.TestCase):
+    def test_iter_batches(self):
+        self.assertEqual(list(iter_batches(range(5), 2)), [[0, 1], [2, 3], [4]])
+        self.assertEqual(list(iter_batches([], 2)), [])
+
+    def test_background_iter_prefetches_and_propagates_errors(self):
+        produced = []
+
+        def source():
+            for i in range(3):
+                produced.append(i)
+                yield i
+            raise RuntimeError("boom")
+
+        stream = background_iter(source(), maxsize=10)
+        time.sleep(0.2)
+        # 调用方取元素之前，生产者已经在后台开始预取
+        self.assertEqual(produced, [0, 1, 2])
+        with self.assertRaises(RuntimeError):
+            list(stream)
+
+    def test_background_iter_is_bounded(self):
+        produced = []
+
+        def source():
+            for i in range(100):
+                produced.append(i)
+                yield i
+
+        stream = background_iter(source(), maxsize=5)
+        time.sleep(0.2)
+        self.assertLessEqual(len(produced), 6)
+        self.assertEqual(list(stream), list(range(100)))
+
+
+class TestStreamingSummarizer(unittest.TestCase):
+    def test_summarization_starts_before_fetch_finishes(self):
+        summarizer = PaperSummarizer("test-key")
+        summarizer.client = StubModelClient()
+        summarizer.max_papers_per_batch = 3
+        fetch_done = threading.Event()
+        first_call_before_done = []
+
+        def slow_papers():
+            for i in range(7):
+                if i == 3:
+                    # 第一批交出后等待，检查摘要生成是否已经开始
+                    first_call_before_done.append(summarizer.client.called.wait(timeout=2))
+                yield make_paper(i)
+            fetch_done.set()
+
+        with tempfile.TemporaryDirectory() as tmp_dir, mock.patch('src.paper_summarizer.time.sleep'):
+            output_file = Path(tmp_dir) / "out.md"
+            success = summarizer.summarize_papers(background_iter(slow_papers(), maxsize=2), str(output_file))
+            report = output_file.read_text(encoding='utf-8')
+
+        self.assertTrue(success)
+        self.assertTrue(fetch_done.is_set())
+        self.assertEqual(first_call_before_done, [True])
+        self.assertEqual(sorted(len(call) for call in summarizer.client.calls), [1, 3, 3])
+        self.assertIn("论文数量: 7 篇", report)
+        self.assertEqual(report.count("研究目的"), 7)
+
+
+class SlowModelClient(StubModelClient):
+    """越靠前的批次响应越慢，并记录同时进行中的请求数"""
+
+    def __init__(self):
+        super().__init__()
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def chat_completion(self, messages, temperature=None, max_tokens=None):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        first = int(re.search(r'2501\.(\d{5})', messages[-1]["content"]).group(1))
+        time.sleep(0.05 * (10 - first) / 10)
+        try:
+            return super().chat_completion(messages, temperature, max_tokens)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+class PartialModelClient(StubModelClient):
+    """第一次批量响应漏掉一篇论文并截断另一篇论文的摘要"""
+
+    def chat_completion(self, messages, temperature=None, max_tokens=None):
+        response = super().chat_completion(messages, temperature, max_tokens)
+        if len(self.calls) == 1:
+            sections = response["choices"][0]["message"]["content"].split("\n---")
+            sections[3] = sections[3].split("* **⭐")[0]
+            del sections[1]
+            response["choices"][0]["message"]["content"] = "\n---".join(sections)
+        return response
+
+
+class TestBatchSalvage(unittest.TestCase):
+    def test_only_missing_papers_are_rebatched(self):
+        summarizer = PaperSummarizer("test-key")
+        summarizer.client = PartialModelClient()
+        summarizer.max_papers_per_batch = 5
+        papers = [make_paper(i) for i in range(5)]
+
+        summaries, count = summarizer._generate_batch_summary(papers)
+
+        self.assertEqual(count, 5)
+        self.assertEqual(summarizer.client.calls,
+                         [[paper['entry_id'] for paper in papers],
+                          [papers[1]['entry_id'], papers[3]['entry_id']]])
+        links = re.findall(r'^### .*?\]\((\S+)\)', summaries, re.MULTILINE)
+        self.assertEqual(links, [paper['entry_id'] for paper in papers])
+        self.assertEqual(summaries.count("主要发现"), 5)
+
+
+class TestConcurrentSummarizer(unittest.TestCase):
+    def test_concurrent_batches_keep_input_order(self):
+        summarizer = PaperSummarizer("test-key")
+        summarizer.client = SlowModelClient()
+        summarizer.max_papers_per_batch = 2
+        summarizer.concurrency = 3
+
+        summaries, count = summarizer._generate_batch_summary(make_paper(i) for i in range(10))
+
+        self.assertEqual(count, 10)
+        links = re.findall(r'\((http://arxiv.org/abs/\S+)\)', summaries)
+        self.assertEqual(links, [make_paper(i)['entry_id'] for i in range(10)])
+        self.assertEqual(summarizer.client.max_in_flight, 3)
+
+    def test_outstanding_batches_are_bounded(self):
+        summarizer = PaperSummarizer("test-key")
+        summarizer.max_papers_per_batch = 2
+        summarizer.concurrency = 1
+        pulled = []
+        pulled_at_first_return = []
+
+        class RecordingClient(StubModelClient):
+            def chat_completion(self, messages, temperature=None, max_tokens=None):
+                time.sleep(0.2)
+                if not pulled_at_first_return:
+                    pulled_at_first_return.append(len(pulled))
+                return super().chat_completion(messages, temperature, max_tokens)
+
+        def papers():
+            for i in range(40):
+                pulled.append(i)
+                yield make_paper(i)
+
+        summarizer.client = RecordingClient()
+        summaries, count = summarizer._generate_batch_summary(papers())
+
+        self.assertEqual(count, 40)
+        # 最多 2 个未完成批次加上装批时预读的论文，而不是在第一次调用返回前读完全部输入
+        self.assertLessEqual(pulled_at_first_return[0], 6)
+
+    def test_individual_fallback_keeps_order(self):
+        summarizer = PaperSummarizer("test-key")
+        summarizer.client = SlowModelClient()
+        summarizer.concurrency = 4
+        papers = [make_paper(i) for i in range(6)]
+
+        summaries = summarizer._generate_individual_summaries(papers)
+
+        links = re.findall(r'\((http://arxiv.org/abs/\S+)\)', summaries)
+        self.assertEqual(links, [paper['entry_id'] for paper in papers])
+        self.assertGreater(summarizer.client.max_in_flight, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
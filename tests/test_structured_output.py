@@ -0,0 +1,73 @@
+"""
+结构化JSON输出模式测试模块
+"""
+import json
+import re
+import unittest
+from src.paper_summarizer import PaperSummarizer, SUMMARY_RESPONSE_SCHEMA
+from tests.test_streaming import make_paper
+
+
+class JsonModelClient:
+    """按提示词中的论文ID返回JSON摘要，可以截断第一次响应"""
+
+    model = "stub-model"
+
+    def __init__(self, truncate_first=False):
+        self.calls = []
+        self.truncate_first = truncate_first
+
+    def chat_completion(self, messages, temperature=None, max_tokens=None, response_schema=None):
+        prompt = messages[-1]["content"]
+        ids = re.findall(r'- ID: (\S+)', prompt)
+        self.calls.append((ids, response_schema))
+        items = [{"id": arxiv_id, "purpose": f"目的 {arxiv_id}", "findings": f"发现 {arxiv_id}"} for arxiv_id in ids]
+        if len(ids) > 1:
+            # 无效对象：未知ID、空字段
+            items += [{"id": "9999.99999", "purpose": "x", "findings": "y"}, {"id": ids[0], "purpose": ""}]
+        content = json.dumps(items, ensure_ascii=False)
+        if self.truncate_first and len(self.calls) == 1:
+            # 输出在第三个对象中间被截断
+            content = content[:content.index(f'"id": "{ids[2]}"') + 20]
+        return {"choices": [{"message": {"role": "assistant", "content": content}}], "usage": {}}
+
+
+class TestStructuredOutput(unittest.TestCase):
+    def setUp(self):
+        self.summarizer = PaperSummarizer("test-key")
+        self.summarizer.output_format = 'json'
+        self.summarizer.max_papers_per_batch = 5
+        self.papers = [make_paper(i) for i in range(5)]
+
+    def test_sections_rendered_from_metadata(self):
+        self.summarizer.client = JsonModelClient()
+        summaries, count = self.summarizer._generate_batch_summary(self.papers)
+
+        self.assertEqual(count, 5)
+        self.assertEqual(len(self.summarizer.client.calls), 1)
+        self.assertIs(self.summarizer.client.calls[0][1], SUMMARY_RESPONSE_SCHEMA)
+        links = re.findall(r'^### \[Paper \d\]\((\S+)\)$', summaries, re.MULTILINE)
+        self.assertEqual(links, [paper['entry_id'] for paper in self.papers])
+        self.assertIn("* **🎯 研究目的**: 目的 2501.00003", summaries)
+        self.assertIn("**📅 发布日期**: 2025-01-01", summaries)
+        self.assertNotIn("9999.99999", summaries)
+        # 提示词中不再包含由本地渲染的作者和链接
+        self.assertNotIn("arXiv链接", self.summarizer._build_batch_prompt(self.papers, 1))
+
+    def test_truncated_json_keeps_complete_objects(self):
+        self.summarizer.client = JsonModelClient(truncate_first=True)
+        summaries, count = self.summarizer._generate_batch_summary(self.papers)
+
+        calls = [ids for ids, _ in self.summarizer.client.calls]
+        self.assertEqual(calls, [["2501.%05d" % i for i in range(5)], ["2501.%05d" % i for i in range(2, 5)]])
+        self.assertEqual(summaries.count("主要发现"), 5)
+        self.assertNotIn("**错误信息**", summaries)
+
+    def test_cache_key_depends_on_output_format(self):
+        json_key = self.summarizer._cache_key(self.papers[0])
+        self.summarizer.output_format = 'markdown'
+        self.assertNotEqual(json_key, self.summarizer._cache_key(self.papers[0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
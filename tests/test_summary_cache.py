@@ -0,0 +1,105 @@
+"""
+摘要缓存测试模块
+"""
+import re
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from src.paper_summarizer import ModelRoute, PaperSummarizer, PROMPT_VERSION
+from src.summary_cache import SummaryCache, summary_cache_key
+from tests.test_streaming import StubModelClient, make_paper
+
+
+class FlakyModelClient(StubModelClient):
+    """批量请求总是失败，单篇请求对指定论文失败"""
+
+    def __init__(self, failing_links=()):
+        super().__init__()
+        self.failing_links = set(failing_links)
+
+    def chat_completion(self, messages, temperature=None, max_tokens=None):
+        links = re.findall(r'arXiv链接: (\S+)', messages[-1]["content"])
+        if len(links) > 1 or self.failing_links.intersection(links):
+            self.calls.append(links)
+            raise RuntimeError("quota exceeded")
+        return super().chat_completion(messages, temperature, max_tokens)
+
+
+class FallbackModelClient(StubModelClient):
+    """启用模型路由、所有摘要都由备用模型生成的模型客户端"""
+
+    routes = [ModelRoute("stub-model"), ModelRoute("backup-model")]
+
+    def chat_completion(self, messages, temperature=None, max_tokens=None):
+        return dict(super().chat_completion(messages, temperature, max_tokens), model="backup-model")
+
+
+class TestSummaryCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = SummaryCache(Path(self.tmp_dir.name) / "cache.db")
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp_dir.cleanup()
+
+    def test_key_depends_on_content_model_and_prompt(self):
+        paper = make_paper(1)
+        key = summary_cache_key(paper, "model-a", "1", {'temperature': 0.5})
+        new_version = dict(paper, entry_id=paper['entry_id'].replace('v1', 'v2'))
+        self.assertEqual(key, summary_cache_key(new_version, "model-a", "1", {'temperature': 0.5}))
+        for other in (summary_cache_key(dict(paper, summary="Edited"), "model-a", "1", {'temperature': 0.5}),
+                      summary_cache_key(paper, "model-b", "1", {'temperature': 0.5}),
+                      summary_cache_key(paper, "model-a", "2", {'temperature': 0.5}),
+                      summary_cache_key(paper, "model-a", "1", {'temperature': 0.7})):
+            self.assertNotEqual(key, other)
+
+    def test_eviction_and_invalidation(self):
+        self.cache.put_many([(f"k{i}", f"id{i}", "m", "1" if i < 3 else "0", f"s{i}") for i in range(5)])
+        self.assertEqual(self.cache.invalidate(keep_prompt_version="1"), 2)
+
+        self.cache.max_entries = 2
+        time.sleep(0.01)
+        self.assertEqual(self.cache.get("k0"), "s0")
+        self.assertEqual(self.cache.evict(), 1)
+        self.assertEqual(self.cache.get("k0"), "s0")
+        self.assertEqual(len(self.cache), 2)
+        self.assertEqual(self.cache.invalidate(), 2)
+
+    def test_rerun_only_sends_cache_misses(self):
+        papers = [make_paper(i) for i in range(4)]
+        summarizer = PaperSummarizer("test-key", cache=self.cache)
+        summarizer.max_papers_per_batch = 4
+        summarizer.client = FlakyModelClient(failing_links=[papers[2]['entry_id']])
+        summaries, _ = summarizer._generate_batch_summary(papers)
+        self.assertIn("**错误信息**", summaries)
+        self.assertEqual(len(self.cache), 3)
+
+        summarizer.client = StubModelClient()
+        summaries, count = summarizer._generate_batch_summary(papers)
+        self.assertEqual(count, 4)
+        self.assertEqual(summarizer.client.calls, [[papers[2]['entry_id']]])
+        links = re.findall(r'^### .*?\]\((\S+)\)', summaries, re.MULTILINE)
+        self.assertEqual(links, [paper['entry_id'] for paper in papers])
+        self.assertNotIn("**错误信息**", summaries)
+        self.assertEqual(self.cache.invalidate(prompt_version=PROMPT_VERSION), 4)
+
+    def test_entries_are_keyed_by_generating_model(self):
+        papers = [make_paper(i) for i in range(2)]
+        summarizer = PaperSummarizer("test-key", cache=self.cache)
+        summarizer.client = FallbackModelClient()
+        summarizer._generate_batch_summary(papers)
+        self.assertEqual(self.cache.invalidate(model="stub-model"), 0)
+        self.assertIsNotNone(self.cache.get(summarizer._cache_key(papers[0], "backup-model")))
+
+        # 重新运行时命中备用模型生成的摘要
+        summarizer.client = FallbackModelClient()
+        summaries, count = summarizer._generate_batch_summary(papers)
+        self.assertEqual((count, summarizer.client.calls), (2, []))
+        self.assertIn("<!-- model: backup-model -->", summaries)
+        self.assertEqual(self.cache.invalidate(model="backup-model"), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()